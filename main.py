@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 import os
 
@@ -41,4 +42,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # 并行解析使用多进程，打包为可执行文件时需要
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,244 @@
+from bisect import bisect_right
+import numpy as np
+import pandas as pd
+from lovelyform.models.dtype_optimizer import unify_categories, prepare_assignment, prepare_column_assignment
+from lovelyform.models.type_inference import get_display_formats, set_display_formats, demote_column
+
+
+def concat_chunks(chunks):
+    """拼接多个数据块为一个连续的DataFrame"""
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    result = pd.concat(unify_categories(chunks), ignore_index=True)
+    set_display_formats(result, get_display_formats(chunks[0]))
+    return result
+
+
+class ChunkedStore:
+    """分块数据存储
+
+    数据以数据块列表保存，并维护累计行偏移索引（_offsets[i] 为第i块的起始行）。
+    追加数据只记录新块而不复制已有数据，只有在确实需要连续DataFrame时才合并一次。
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """清空所有数据块"""
+        self._chunks = []
+        self._offsets = [0]
+
+    def __len__(self):
+        return self._offsets[-1]
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def columns(self):
+        if not self._chunks:
+            return pd.Index([])
+        return self._chunks[0].columns
+
+    @property
+    def chunk_count(self):
+        return len(self._chunks)
+
+    @property
+    def display_formats(self):
+        """原生类型列的显示格式 {列名: DisplayFormat}"""
+        if not self._chunks:
+            return {}
+        return get_display_formats(self._chunks[0])
+
+    def append(self, chunk: pd.DataFrame):
+        """追加一个数据块，已有数据块不会被复制"""
+        if self._chunks and len(chunk) == 0:
+            return
+        if self._chunks and len(self._chunks[-1]) == 0:
+            # 只有表头的空块不再保留
+            self.clear()
+        if self._chunks and not chunk.columns.equals(self.columns):
+            chunk = self._align_columns(chunk)
+        if self._chunks:
+            chunk = self._reconcile_formats(chunk)
+        self._chunks.append(chunk)
+        self._offsets.append(self._offsets[-1] + len(chunk))
+
+    def _align_columns(self, chunk):
+        """各数据块的列可能不同（如JSON记录的字段逐块增加），统一为出现过的所有列"""
+        current = self.columns
+        columns = current.append(chunk.columns.difference(current, sort=False))
+        if len(columns) != len(current):
+            self._chunks = [old.reindex(columns=columns) for old in self._chunks]
+        return chunk.reindex(columns=columns)
+
+    def _reconcile_formats(self, chunk):
+        """统一各数据块的原生类型列
+
+        只要有一个数据块中的某列没有转换为原生类型，所有数据块中的该列都还原为文本。
+
+        Returns:
+            DataFrame: 调整后的新数据块
+        """
+        current = self.display_formats
+        incoming = get_display_formats(chunk)
+        kept = {name: fmt for name, fmt in current.items() if name in incoming}
+        if len(kept) != len(current):
+            chunks = []
+            for old in self._chunks:
+                new = old.copy(deep=False)
+                for name, fmt in current.items():
+                    if name not in kept:
+                        new[name] = fmt.to_text(old[name])
+                set_display_formats(new, kept)
+                chunks.append(new)
+            self._chunks = chunks
+        if len(kept) != len(incoming):
+            new = chunk.copy(deep=False)
+            for name, fmt in incoming.items():
+                if name not in kept:
+                    new[name] = fmt.to_text(chunk[name])
+            set_display_formats(new, kept)
+            chunk = new
+        return chunk
+
+    def truncate(self, length):
+        """只保留前 length 行"""
+        while self._chunks and self._offsets[-2] >= length and len(self._chunks) > 1:
+            self._chunks.pop()
+            self._offsets.pop()
+        if self._chunks and self._offsets[-1] > length:
+            last = self._chunks[-1]
+            self._chunks[-1] = last.iloc[:max(length - self._offsets[-2], 0)]
+            self._offsets[-1] = self._offsets[-2] + len(self._chunks[-1])
+
+    def set_value(self, row, col, value):
+        """修改一个单元格
+
+        写时复制：后台线程持有的数据块不会被修改，被修改的数据块替换为只复制了该列的新数据块。
+
+        Returns:
+            bool: 该列是否因新值无法解析而还原为文本（所有数据块一起还原）
+        """
+        i = bisect_right(self._offsets, row) - 1
+        chunk = self._chunks[i].copy(deep=False)
+        chunk.isetitem(col, chunk.iloc[:, col].copy())
+        self._chunks[i] = chunk
+        name = chunk.columns[col]
+        had_format = name in get_display_formats(chunk)
+        value = prepare_assignment(chunk, col, value)
+        chunk.iloc[row - self._offsets[i], col] = value
+        if had_format and name not in get_display_formats(chunk):
+            for j, other in enumerate(self._chunks):
+                if other is not chunk:
+                    other = other.copy(deep=False)
+                    demote_column(other, col)
+                    self._chunks[j] = other
+            return True
+        return False
+
+    def set_values(self, col, rows, values):
+        """批量修改一列中的若干单元格，每个涉及的数据块只复制一次该列（写时复制）
+
+        :param rows: 数据集中的行号数组
+        :param values: 与 rows 对应的新值，原生类型列为显示文本
+        Returns:
+            bool: 该列是否因新值无法解析而还原为文本（所有数据块一起还原）
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        values = np.asarray(values, dtype=object)
+        if len(rows) == 0:
+            return False
+        name = self.columns[col]
+        had_format = name in self.display_formats
+        which = np.searchsorted(self._offsets, rows, side='right') - 1
+        for i in np.unique(which):
+            mask = which == i
+            chunk = self._chunks[i].copy(deep=False)
+            chunk.isetitem(col, chunk.iloc[:, col].copy())
+            self._chunks[i] = chunk
+            new = prepare_column_assignment(chunk, col, values[mask])
+            chunk.iloc[rows[mask] - self._offsets[i], col] = new
+            if had_format and name not in get_display_formats(chunk):
+                # 该列已还原为文本，其余数据块也一起还原（写时复制）
+                for j, other in enumerate(self._chunks):
+                    if other is not chunk and name in get_display_formats(other):
+                        other = other.copy(deep=False)
+                        demote_column(other, col)
+                        self._chunks[j] = other
+        return had_format and name not in self.display_formats
+
+    def set_frame(self, df: pd.DataFrame):
+        """用单个DataFrame替换全部数据"""
+        self.clear()
+        if df is None:
+            df = pd.DataFrame()
+        self._chunks.append(df)
+        self._offsets.append(len(df))
+
+    def iter_chunks(self):
+        """按顺序遍历数据块，返回 (起始行, 数据块)"""
+        for i, chunk in enumerate(self._chunks):
+            yield self._offsets[i], chunk
+
+    def slice(self, start, end):
+        """获取 [start, end) 范围内的行，只拼接涉及到的数据块"""
+        total = len(self)
+        start = max(0, min(start, total))
+        end = max(start, min(end, total))
+        if not self._chunks:
+            return pd.DataFrame()
+
+        pieces = []
+        i = bisect_right(self._offsets, start) - 1
+        i = min(i, len(self._chunks) - 1)
+        while i < len(self._chunks) and self._offsets[i] < end:
+            chunk_start = self._offsets[i]
+            a = max(start - chunk_start, 0)
+            b = min(end - chunk_start, len(self._chunks[i]))
+            pieces.append(self._chunks[i].iloc[a:b])
+            i += 1
+
+        if not pieces:
+            result = self._chunks[0].iloc[0:0]
+        elif len(pieces) == 1:
+            result = pieces[0]
+        else:
+            result = concat_chunks(pieces)
+        result.index = pd.RangeIndex(start, end)
+        return result
+
+    def take(self, rows):
+        """按行号数组取行（行号可以无序），结果的索引为原始行号"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if not self._chunks:
+            return pd.DataFrame()
+        if len(self._chunks) == 1:
+            result = self._chunks[0].iloc[rows]
+        else:
+            # 按所在数据块分组取行，拼接后再恢复请求的顺序
+            which = np.searchsorted(self._offsets, rows, side='right') - 1
+            order = np.argsort(which, kind='stable')
+            pieces = []
+            for i in np.unique(which):
+                pieces.append(self._chunks[i].iloc[rows[which == i] - self._offsets[i]])
+            result = concat_chunks(pieces)
+            if len(pieces) > 1:
+                result = result.iloc[np.argsort(order)]
+        result.index = pd.Index(rows)
+        return result
+
+    def consolidate(self):
+        """合并所有数据块为一个连续的DataFrame并替换原有数据块"""
+        if not self._chunks:
+            return pd.DataFrame()
+        if len(self._chunks) > 1:
+            frame = concat_chunks(self._chunks)
+            self._chunks = [frame]
+            self._offsets = [0, len(frame)]
+        return self._chunks[0]
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from lovelyform.models.type_inference import DisplayFormat, get_display_formats, set_display_formats
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow 为可选依赖，缺失时退回 pickle 格式
+    pa = feather = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.lovelyform', 'cache')
+DEFAULT_MAX_BYTES = 8 * 1024 ** 3
+CACHE_EXTENSIONS = ('.feather', '.pkl')
+SIDECAR_EXTENSIONS = ('.npz', '.json')  # 与缓存一起保存的附属文件（如文本索引、列宽）
+FORMATS_METADATA_KEY = b'lovelyform.display_formats'
+
+
+def file_signature(file_path):
+    """文件的 (大小, 修改时间)，文件不存在时返回None"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class ColumnarCache:
+    """二进制列式缓存
+
+    首次解析CSV后把结果写为 Feather（无 pyarrow 时为 pickle）文件，以
+    (绝对路径, 文件大小, 修改时间, 解析参数) 作为键，之后再次打开同一文件时
+    直接读取缓存。缓存目录按最近使用时间淘汰，总大小不超过 max_bytes。
+    文件的大小和修改时间应在开始读取文件之前取得（signature），否则读取期间
+    文件被修改时，旧内容会以新文件的键保存。
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def _path_hash(file_path):
+        return hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+
+    def make_key(self, file_path, options=None, signature=None):
+        """生成缓存键，文件不存在时返回None
+
+        :param signature: 读取文件之前取得的 file_signature，不指定时使用文件当前的状态
+        """
+        if signature is None:
+            signature = file_signature(file_path)
+        if signature is None:
+            return None
+        size, mtime_ns = signature
+        signature = json.dumps([size, mtime_ns, options or {}], sort_keys=True, default=str)
+        return f"{self._path_hash(file_path)}_{hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]}"
+
+    def lookup(self, file_path, options=None, signature=None):
+        """查找有效的缓存文件，返回其路径或None"""
+        key = self.make_key(file_path, options, signature)
+        if key is None:
+            return None
+        for ext in CACHE_EXTENSIONS:
+            path = os.path.join(self.cache_dir, key + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def sidecar_path(self, file_path, options=None, suffix='.npz', signature=None):
+        """与文件缓存使用相同键的附属文件路径，文件不存在时返回None"""
+        key = self.make_key(file_path, options, signature)
+        if key is None:
+            return None
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def load(self, cache_path):
+        """读取缓存文件，Feather 格式使用内存映射读取"""
+        try:
+            os.utime(cache_path)  # 更新最近使用时间
+        except OSError:
+            pass
+        if cache_path.endswith('.feather'):
+            if feather is None:
+                raise ImportError("读取 Feather 缓存需要安装 pyarrow")
+            table = feather.read_table(cache_path, memory_map=True)
+            df = table.to_pandas()
+            metadata = table.schema.metadata or {}
+            if FORMATS_METADATA_KEY in metadata:
+                formats = json.loads(metadata[FORMATS_METADATA_KEY])
+                set_display_formats(df, {name: DisplayFormat.from_dict(d) for name, d in formats.items()})
+            return df
+        return pd.read_pickle(cache_path)
+
+    def store(self, file_path, options, df, signature=None):
+        """写入缓存，同一文件的旧缓存会被替换"""
+        key = self.make_key(file_path, options, signature)
+        if key is None:
+            return None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.invalidate(file_path, keep=key)
+
+        df = df.reset_index(drop=True)
+        path = None
+        if feather is not None:
+            path = os.path.join(self.cache_dir, key + '.feather')
+            try:
+                table = self._to_table(df)
+                self._write_atomic(path, lambda tmp: feather.write_feather(table, tmp, compression='uncompressed'))
+            except Exception:
+                # 混合类型等 Arrow 无法表示的列退回 pickle
+                path = None
+        if path is None:
+            path = os.path.join(self.cache_dir, key + '.pkl')
+            self._write_atomic(path, lambda tmp: df.to_pickle(tmp))
+
+        self._enforce_limit()
+        return path
+
+    @staticmethod
+    def _to_table(df):
+        """转换为 Arrow 表，显示格式以JSON保存在 schema 元数据中"""
+        formats = get_display_formats(df)
+        frame = df.copy(deep=False)
+        frame.attrs = {}
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if formats:
+            metadata = dict(table.schema.metadata or {})
+            metadata[FORMATS_METADATA_KEY] = json.dumps({name: fmt.to_dict() for name, fmt in formats.items()})
+            table = table.replace_schema_metadata(metadata)
+        return table
+
+    @staticmethod
+    def _write_atomic(path, writer):
+        tmp = path + '.tmp'
+        try:
+            writer(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _entries(self):
+        """列出缓存文件，返回 [(路径, 大小, 修改时间)]"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(CACHE_EXTENSIONS + SIDECAR_EXTENSIONS):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _enforce_limit(self):
+        """按最近使用时间淘汰缓存，直到总大小不超过上限"""
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def invalidate(self, file_path=None, keep=None):
+        """删除指定文件的缓存（包括附属文件），不指定文件时清空整个缓存目录
+
+        :param keep: 保留该键的缓存，用于替换同一文件过期的缓存
+        Returns:
+            int: 删除的缓存文件数
+        """
+        prefix = self._path_hash(file_path) + '_' if file_path else ''
+        removed = 0
+        for path, _, _ in self._entries():
+            name = os.path.basename(path)
+            if name.startswith(prefix) and not (keep and name.startswith(keep)):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
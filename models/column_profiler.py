@@ -0,0 +1,245 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_bool_dtype, is_string_dtype, is_datetime64_any_dtype
+from lovelyform.models.dtype_optimizer import is_text_column
+from lovelyform.models.type_inference import get_display_formats
+from lovelyform.models.parallel_loader import default_workers
+
+QUANTILES = (0.25, 0.5, 0.75)
+TOP_VALUES = 5  # 统计结果中列出的高频值个数
+
+# 统计结果的行名，与 DataFrame.describe() 的行对应
+INDEX_NAMES = {
+    'count': '计数',
+    'mean': '平均值',
+    'std': '标准差',
+    'min': '最小值',
+    '25%': '25%分位数',
+    '50%': '中位数',
+    '75%': '75%分位数',
+    'max': '最大值',
+}
+
+
+def column_kind(series, fmt=None):
+    """'number' 数值列，'datetime' 时间列，'text' 字符串列，其余类型不统计时为None
+
+    以整数保存的十六进制地址和ID（显示格式为 hex / int）按字符串列统计，均值和方差对它们没有意义。
+    """
+    dtype = series.dtype
+    if fmt is not None and fmt.kind in ('hex', 'int'):
+        return 'text'
+    if is_datetime64_any_dtype(dtype):
+        return 'datetime'
+    if is_numeric_dtype(dtype) and not is_bool_dtype(dtype):
+        return 'number'
+    if is_text_column(series) or is_string_dtype(dtype):
+        return 'text'
+    return None
+
+
+def column_values(chunks, col):
+    """按顺序拼接各数据块中的一列"""
+    if len(chunks) == 1:
+        return chunks[0].iloc[:, col]
+    return pd.concat([chunk.iloc[:, col] for chunk in chunks], ignore_index=True)
+
+
+def _mode(uniques, counts):
+    """出现次数最多的值，次数相同时与 Series.mode() 一样取最小的值"""
+    candidates = pd.Series(uniques[np.flatnonzero(counts == counts.max())])
+    try:
+        return candidates.min()
+    except TypeError:
+        return candidates.iloc[0]
+
+
+def top_values(uniques, counts, count=TOP_VALUES):
+    """出现次数最多的几个值 [(值, 次数)]"""
+    order = np.arange(len(counts))
+    if len(counts) > count:
+        order = np.argpartition(-counts, count)[:count]
+    order = order[np.lexsort((order, -counts[order]))]
+    return [(uniques[i], int(counts[i])) for i in order]
+
+
+def display_value(value, kind, fmt=None):
+    """统计结果中显示的值：有显示格式时还原为原始文本，时间列没有格式时显示为时间戳"""
+    if fmt is not None:
+        return fmt.render_value(value)
+    if kind == 'datetime' and not pd.isna(value):
+        return str(pd.Timestamp(value))
+    return value
+
+
+def _weighted_quantile(values, cumulative, q):
+    """按出现次数展开后的线性插值分位数，values 已排序"""
+    pos = q * (cumulative[-1] - 1)
+    lo = values[np.searchsorted(cumulative, np.floor(pos), side='right')]
+    hi = values[np.searchsorted(cumulative, np.ceil(pos), side='right')]
+    return lo + (hi - lo) * (pos - np.floor(pos))
+
+
+def profile_column(series, fmt=None):
+    """一列的全部统计量
+
+    只对整列做一次 factorize，计数、唯一值、众数、分位数、均值、标准差和字符串长度
+    都由不重复的值及其出现次数算出，不再逐项遍历整列。
+    有显示格式的列，众数、高频值、最值和分位数通过格式还原为原始文本。
+    """
+    kind = column_kind(series, fmt)
+    if kind is None:
+        return None
+    codes, uniques = pd.factorize(series)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    non_null = int(counts.sum())
+    profile = {
+        'kind': kind,
+        'rows': len(series),
+        'non_null': non_null,
+        'unique': len(uniques),
+        'mode': display_value(_mode(uniques, counts), kind, fmt) if non_null else None,
+        'mode_count': int(counts.max()) if non_null else 0,
+        'top': [(display_value(value, kind, fmt), count) for value, count in top_values(uniques, counts)],
+    }
+    if kind == 'number':
+        values = np.asarray(uniques, dtype=np.float64)
+        order = np.argsort(values, kind='stable')
+        values, weights = values[order], counts[order]
+        if non_null:
+            cumulative = np.cumsum(weights)
+            mean = float((values * weights).sum() / non_null)
+            profile.update(
+                mean=mean,
+                std=float(np.sqrt((weights * (values - mean) ** 2).sum() / (non_null - 1))) if non_null > 1 else np.nan,
+                min=float(values[0]),
+                max=float(values[-1]),
+                quantiles=[float(_weighted_quantile(values, cumulative, q)) for q in QUANTILES],
+            )
+        else:
+            profile.update(mean=np.nan, std=np.nan, min=np.nan, max=np.nan, quantiles=[np.nan] * len(QUANTILES))
+    elif kind == 'datetime':
+        # 按纳秒整数排序和插值，结果再还原为时间
+        values = np.asarray(uniques, dtype='datetime64[ns]').view(np.int64)
+        order = np.argsort(values, kind='stable')
+        values, weights = values[order], counts[order]
+        if non_null:
+            cumulative = np.cumsum(weights)
+            quantiles = [int(round(_weighted_quantile(values.astype(np.float64), cumulative, q))) for q in QUANTILES]
+            profile.update(
+                min=display_value(np.datetime64(int(values[0]), 'ns'), kind, fmt),
+                max=display_value(np.datetime64(int(values[-1]), 'ns'), kind, fmt),
+                quantiles=[display_value(np.datetime64(q, 'ns'), kind, fmt) for q in quantiles],
+            )
+        else:
+            profile.update(min=None, max=None, quantiles=[None] * len(QUANTILES))
+    elif fmt is not None or is_text_column(series):
+        # 只计算不重复的值的长度，非字符串的值不参与
+        texts = fmt.render(pd.Series(uniques)) if fmt is not None else np.asarray(uniques, dtype=object)
+        lengths = pd.Series(texts, dtype=object).str.len().to_numpy(dtype=np.float64)
+        valid = ~np.isnan(lengths)
+        if valid.any():
+            profile.update(
+                max_length=lengths[valid].max(),
+                min_length=lengths[valid].min(),
+                mean_length=(lengths[valid] * counts[valid]).sum() / counts[valid].sum(),
+            )
+        else:
+            profile.update(max_length=np.nan, min_length=np.nan, mean_length=np.nan)
+    return profile
+
+
+def profile_chunks(chunks, workers=None, cancelled=None):
+    """统计整个数据集的各列，各列在线程池中并行计算
+
+    :param chunks: 数据块列表，显示格式取自第一个数据块
+    :return: [(列名, 统计量)]，不统计的列为None；中止时返回None
+    """
+    chunks = [chunk for chunk in chunks if len(chunk)] or chunks[:1]
+    if not chunks:
+        return []
+    columns = chunks[0].columns
+    formats = get_display_formats(chunks[0])
+
+    def run(col):
+        if cancelled is not None and cancelled():
+            return None
+        return profile_column(column_values(chunks, col), formats.get(columns[col]))
+
+    with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+        profiles = list(pool.map(run, range(len(columns))))
+    if cancelled is not None and cancelled():
+        return None
+    return list(zip(columns, profiles))
+
+
+def _percent(part, total):
+    return f"{(part / total * 100):.2f}%" if total else "0.00%"
+
+
+def _format_top(top):
+    return "; ".join(f"{value} ({count})" for value, count in top)
+
+
+def statistics_table(profiles):
+    """由各列统计量生成统计结果表，行为统计项，列为数据列
+
+    统计量来自流式摘要（approximate）时，统计类型标注为估计值。
+    """
+    numeric = {}
+    times = {}
+    strings = {}
+    approximate = False
+    for name, profile in profiles:
+        if profile is None:
+            continue
+        approximate = approximate or profile.get('approximate', False)
+        nulls = profile['rows'] - profile['non_null']
+        common = {
+            '非空值数': profile['non_null'],
+            '空值数': nulls,
+            '空值比例': _percent(nulls, profile['rows']),
+            '唯一值数': profile['unique'],
+        }
+        if profile['kind'] == 'number':
+            mean = profile['mean']
+            stats = {'count': float(profile['non_null']), 'mean': mean, 'std': profile['std'], 'min': profile['min']}
+            stats.update({f"{int(q * 100)}%": value for q, value in zip(QUANTILES, profile['quantiles'])})
+            stats['max'] = profile['max']
+            stats.update(common)
+            stats['众数'] = profile['mode']
+            stats['高频值'] = _format_top(profile['top'])
+            stats['变异系数'] = f"{(profile['std'] / mean * 100):.2f}%" if mean != 0 else "N/A"
+            numeric[name] = stats
+        elif profile['kind'] == 'datetime':
+            stats = {'min': profile['min']}
+            stats.update({f"{int(q * 100)}%": value for q, value in zip(QUANTILES, profile['quantiles'])})
+            stats['max'] = profile['max']
+            stats.update(common)
+            stats['最常见值'] = profile['mode']
+            stats['最常见值出现次数'] = profile['mode_count']
+            stats['高频值'] = _format_top(profile['top'])
+            times[name] = stats
+        else:
+            stats = dict(common)
+            stats['最常见值'] = profile['mode']
+            stats['最常见值出现次数'] = profile['mode_count']
+            stats['高频值'] = _format_top(profile['top'])
+            has_lengths = 'max_length' in profile
+            stats['最长字符串长度'] = profile['max_length'] if has_lengths else None
+            stats['最短字符串长度'] = profile['min_length'] if has_lengths else None
+            stats['平均字符串长度'] = f"{profile['mean_length']:.1f}" if has_lengths else None
+            strings[name] = stats
+
+    result_dfs = []
+    for stats, label in ((numeric, '数值统计'), (times, '时间统计'), (strings, '字符串统计')):
+        if stats:
+            frame = pd.DataFrame(stats)
+            frame.insert(0, '统计类型', f"{label}（估计）" if approximate else label)
+            result_dfs.append(frame)
+    if not result_dfs:
+        return pd.DataFrame({"消息": ["没有找到可以统计的列"]})
+    final_stats = pd.concat(result_dfs)
+    final_stats.index = final_stats.index.map(lambda x: INDEX_NAMES.get(x, x))
+    return final_stats
@@ -0,0 +1,324 @@
+import numpy as np
+import pandas as pd
+from lovelyform.models.column_profiler import column_kind, display_value, QUANTILES, TOP_VALUES
+from lovelyform.models.type_inference import get_display_formats
+
+HLL_PRECISION = 12       # HyperLogLog 的寄存器数为 2**12，相对误差约 1.6%
+TOP_CAPACITY = 64        # 高频值保留的计数器数
+QUANTILE_CAPACITY = 200  # 分位数草图最高层的容量，其余各层按 2/3 递减
+
+
+def hash_values(values, numeric):
+    """不重复值的 64 位哈希
+
+    数值统一按 float64 的位模式计算（不同数据块中整数列的位宽可能不同）；其他值使用
+    Python 的哈希，factorize 时已经计算并缓存在字符串对象中。最后经过 splitmix64
+    的混合步骤，使各位分布均匀。
+    """
+    if numeric:
+        hashes = np.asarray(values, dtype=np.float64).view(np.uint64).copy()
+    else:
+        hashes = np.fromiter(map(hash, values), dtype=np.int64, count=len(values)).view(np.uint64)
+    hashes ^= hashes >> np.uint64(30)
+    hashes *= np.uint64(0xbf58476d1ce4e5b9)
+    hashes ^= hashes >> np.uint64(27)
+    hashes *= np.uint64(0x94d049bb133111eb)
+    hashes ^= hashes >> np.uint64(31)
+    return hashes
+
+
+class HyperLogLog:
+    """不重复值个数的估计，寄存器数固定，可以合并"""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes):
+        """加入一批 64 位哈希值"""
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # 剩余位中第一个1的位置（从高位数起）
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest == 0, bits + 1, bits - exponent + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # 基数较小时改用线性计数
+        return int(round(estimate))
+
+
+class SpaceSaving:
+    """高频值及其出现次数的估计（Space-Saving），计数器数固定，可以合并
+
+    估计的次数不小于实际次数，最多多出 errors 中记录的误差。
+    """
+
+    def __init__(self, capacity=TOP_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.floor = 0  # 未记录的值可能的最大次数
+
+    @classmethod
+    def of(cls, values, counts, capacity=TOP_CAPACITY):
+        """由一批数据的精确计数建立摘要，只保留次数最多的 capacity 个值"""
+        summary = cls(capacity)
+        counts = np.asarray(counts, dtype=np.int64)
+        if len(counts) > capacity:
+            order = np.argpartition(-counts, capacity)
+            summary.floor = int(counts[order[capacity:]].max())
+            order = order[:capacity]
+            values, counts = values[order], counts[order]
+        summary.counts = dict(zip(np.asarray(values, dtype=object).tolist(), counts.tolist()))
+        summary.errors = dict.fromkeys(summary.counts, 0)
+        return summary
+
+    def merge(self, other):
+        # 只在一方记录的值按另一方未记录值的最大次数补足
+        counts = {}
+        errors = {}
+        for value in self.counts.keys() | other.counts.keys():
+            counts[value] = self.counts.get(value, self.floor) + other.counts.get(value, other.floor)
+            errors[value] = self.errors.get(value, self.floor) + other.errors.get(value, other.floor)
+        self.floor += other.floor
+        if len(counts) > self.capacity:
+            ranked = sorted(counts, key=counts.get, reverse=True)
+            self.floor = max(self.floor, counts[ranked[self.capacity]])
+            counts = {value: counts[value] for value in ranked[:self.capacity]}
+        self.counts = counts
+        self.errors = {value: errors[value] for value in counts}
+
+    def top(self, count):
+        """次数最多的几个值 [(值, 保证次数)]
+
+        保证次数为估计次数减去误差，是实际次数的下界；只列出保证次数超过未记录值
+        可能的最大次数（floor）的值，没有这样的值时返回空列表。
+        """
+        guaranteed = {value: self.counts[value] - self.errors[value] for value in self.counts}
+        heavy = [(value, n) for value, n in guaranteed.items() if n > 0 and n > self.floor]
+        return sorted(heavy, key=lambda item: item[1], reverse=True)[:count]
+
+
+class QuantileSketch:
+    """流式分位数估计（KLL 草图），保存的样本数与数据量无关，可以合并
+
+    第 h 层的每个样本代表 2**h 个值；某层超出容量时排序后隔一个取一个提升到上一层。
+    """
+
+    def __init__(self, capacity=QUANTILE_CAPACITY, seed=0):
+        self.capacity = capacity
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _level_capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.capacity * (2 / 3) ** depth)))
+
+    def update(self, values):
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=np.float64)])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._level_capacity(level):
+                level += 1
+                continue
+            if level == len(self.levels) - 1:
+                self.levels.append(np.empty(0, dtype=np.float64))
+            items = np.sort(items)
+            # 个数为奇数时留下一个，其余的隔一个取一个提升到上一层
+            keep = items[:len(items) % 2]
+            items = items[len(items) % 2:]
+            promoted = items[self._rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level = 0  # 层数增加后各层的容量也随之变化
+
+    def quantile(self, q):
+        values = np.concatenate(self.levels)
+        if len(values) == 0:
+            return np.nan
+        weights = np.concatenate([np.full(len(items), 1 << level, dtype=np.int64)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        position = q * (cumulative[-1] - 1)
+        return float(values[order][np.searchsorted(cumulative, position, side='right')])
+
+
+class ColumnSketch:
+    """一列的流式摘要：计数、不重复值个数、高频值，数值列和时间列还有最值和分位数，数值列还有均值和方差"""
+
+    def __init__(self, kind, fmt=None):
+        self.kind = kind
+        self.fmt = fmt
+        self.rows = 0
+        self.non_null = 0
+        self.distinct = HyperLogLog()
+        self.frequent = SpaceSaving()
+        if kind in ('number', 'datetime'):
+            # 时间列按纳秒整数统计；最值精确
+            self.min = np.inf
+            self.max = -np.inf
+            self.quantiles = QuantileSketch()
+        if kind == 'number':
+            # 数值列的均值和方差按 Chan 的合并公式累加
+            self.moment_count = 0
+            self.mean = 0.0
+            self.m2 = 0.0
+
+    @classmethod
+    def of(cls, series, fmt=None):
+        """一批数据的摘要，不统计的列类型返回None"""
+        kind = column_kind(series, fmt)
+        if kind is None:
+            return None
+        sketch = cls(kind, fmt)
+        sketch.update(series)
+        return sketch
+
+    @property
+    def format_key(self):
+        """显示格式的比较键，格式不同的摘要不能合并"""
+        return self.fmt.to_dict() if self.fmt is not None else None
+
+    def update(self, series):
+        """加入一批数据，与 column_profiler 一样先 factorize，只对不重复的值取哈希"""
+        if self.kind == 'datetime':
+            values = series.to_numpy(dtype='datetime64[ns]')
+            series = pd.Series(pd.arrays.IntegerArray(values.view(np.int64), np.isnat(values)))
+        codes, uniques = pd.factorize(series)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        self.rows += len(series)
+        self.non_null += int(counts.sum())
+        if len(uniques) == 0:
+            return
+        self.distinct.update(hash_values(uniques, self.kind != 'text'))
+        self.frequent.merge(SpaceSaving.of(uniques, counts))
+        if self.kind != 'text':
+            numbers = series.dropna().to_numpy(dtype=np.float64 if self.kind == 'number' else np.int64)
+            self.min = min(self.min, numbers.min().item())
+            self.max = max(self.max, numbers.max().item())
+            self.quantiles.update(numbers)
+        if self.kind == 'number':
+            mean = float(numbers.mean())
+            self._add_moments(len(numbers), mean, float(((numbers - mean) ** 2).sum()))
+
+    def _add_moments(self, count, mean, m2):
+        total = self.moment_count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.moment_count * count / total
+        self.moment_count = total
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.non_null += other.non_null
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+        if self.kind == 'number' and other.moment_count:
+            self._add_moments(other.moment_count, other.mean, other.m2)
+        if self.kind != 'text':
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.quantiles.merge(other.quantiles)
+
+    def profile(self, top=TOP_VALUES):
+        """与 column_profiler.profile_column 相同格式的统计量，不重复值个数、高频值和分位数为估计值"""
+        frequent = [(self._display(value), count) for value, count in self.frequent.top(top)]
+        profile = {
+            'kind': self.kind,
+            'approximate': True,
+            'rows': self.rows,
+            'non_null': self.non_null,
+            'unique': min(self.distinct.estimate(), self.non_null),
+            'mode': frequent[0][0] if frequent else None,
+            'mode_count': frequent[0][1] if frequent else 0,
+            'top': frequent,
+        }
+        if self.kind == 'number':
+            count = self.moment_count
+            profile.update(
+                mean=self.mean if count else np.nan,
+                std=float(np.sqrt(self.m2 / (count - 1))) if count > 1 else np.nan,
+                min=self.min if count else np.nan,
+                max=self.max if count else np.nan,
+                quantiles=[self.quantiles.quantile(q) for q in QUANTILES],
+            )
+        elif self.kind == 'datetime':
+            count = self.non_null
+            profile.update(
+                min=self._display(self.min) if count else None,
+                max=self._display(self.max) if count else None,
+                quantiles=[self._display(int(round(self.quantiles.quantile(q)))) if count else None
+                           for q in QUANTILES],
+            )
+        return profile
+
+    def _display(self, value):
+        """统计结果中显示的值，时间列的纳秒整数先还原为时间"""
+        if self.kind == 'datetime':
+            value = np.datetime64(int(value), 'ns')
+        return display_value(value, self.kind, self.fmt)
+
+
+class TableSketch:
+    """各列的流式摘要，按数据块累加，内存占用与行数无关"""
+
+    def __init__(self):
+        self.columns = []
+        self.sketches = []
+
+    @classmethod
+    def of(cls, frame):
+        sketch = cls()
+        sketch.columns = list(frame.columns)
+        formats = get_display_formats(frame)
+        sketch.sketches = [ColumnSketch.of(frame.iloc[:, col], formats.get(name))
+                           for col, name in enumerate(sketch.columns)]
+        return sketch
+
+    def append(self, frame):
+        self.merge(TableSketch.of(frame))
+
+    def merge(self, other):
+        """合并另一批数据的摘要，列不一致时以新的列为准重新开始"""
+        if self.columns != other.columns:
+            self.columns, self.sketches = other.columns, other.sketches
+            return
+        for col, sketch in enumerate(other.sketches):
+            mine = self.sketches[col]
+            if sketch is None or mine is None or mine.kind != sketch.kind or mine.format_key != sketch.format_key:
+                # 列类型或显示格式在加载过程中发生变化（如整数列还原为文本），该列从这批数据重新开始
+                self.sketches[col] = sketch
+            else:
+                mine.merge(sketch)
+
+    def profiles(self):
+        """[(列名, 统计量)]"""
+        return [(name, sketch.profile() if sketch is not None else None)
+                for name, sketch in zip(self.columns, self.sketches)]
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_datetime64_any_dtype, is_timedelta64_dtype
+
+
+def _is_text(series):
+    dtype = series.dtype
+    return not (is_numeric_dtype(dtype) or is_datetime64_any_dtype(dtype) or is_timedelta64_dtype(dtype))
+
+
+def nonblank_counts(frame, formats=None):
+    """各列显示文本不为空白的单元格数
+
+    与表格显示一致，缺失值和只含空白字符的文本都算空白。原生类型列的显示文本
+    只有缺失值为空，只需计数；文本列只检查不重复的值。
+    """
+    formats = formats or {}
+    counts = np.zeros(len(frame.columns), dtype=np.int64)
+    for col, name in enumerate(frame.columns):
+        series = frame.iloc[:, col]
+        if name in formats or not _is_text(series):
+            counts[col] = int(series.notna().sum())
+            continue
+        codes, uniques = pd.factorize(series)
+        filled = pd.Series(uniques, dtype=object).astype(str).str.strip().to_numpy() != ''
+        counts[col] = int(np.count_nonzero(filled[codes[codes >= 0]]))
+    return counts
+
+
+def is_blank(text):
+    return not str(text).strip()
+
+
+class EmptyColumnIndex:
+    """整个数据集中各列非空白单元格数的汇总
+
+    按数据块累加，追加行和修改单元格时增量更新，计数为0的列即整列空白。
+    """
+
+    def __init__(self):
+        self.columns = []
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.rows = 0
+
+    @classmethod
+    def build(cls, chunks, formats=None, cancelled=None):
+        """按 (起始行, 数据块) 的顺序建立汇总，中止时返回None"""
+        index = cls()
+        for _, chunk in chunks:
+            if cancelled is not None and cancelled():
+                return None
+            index.append(chunk, formats)
+        return index
+
+    def append(self, frame, formats=None):
+        """追加一批行"""
+        counts = nonblank_counts(frame, formats)
+        if self.rows == 0:
+            self.columns = list(frame.columns)
+            self.counts = counts
+        else:
+            self.counts += counts
+        self.rows += len(frame)
+
+    def update_cell(self, col, old_text, new_text):
+        """单元格的显示文本由 old_text 改为 new_text"""
+        self.counts[col] += int(is_blank(old_text)) - int(is_blank(new_text))
+
+    def empty_columns(self):
+        """整列空白的列号"""
+        return [int(col) for col in np.flatnonzero(self.counts == 0)]
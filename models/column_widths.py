@@ -0,0 +1,59 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from lovelyform.models.display_cache import render_column
+
+SAMPLE_ROWS = 10000      # 估计列宽时抽样的行数
+LENGTH_PERCENTILE = 95   # 按该百分位的文本长度确定列宽，个别超长的文本不会撑宽整列
+CANDIDATES = 8           # 每列实际测量像素宽度的文本数
+
+
+def sample_rows(total, size=SAMPLE_ROWS):
+    """均匀分布在整个数据集中的抽样行号"""
+    if total <= size:
+        return np.arange(total)
+    return np.unique(np.linspace(0, total - 1, size).astype(np.int64))
+
+
+def width_candidates(series, fmt=None, count=CANDIDATES, percentile=LENGTH_PERCENTILE):
+    """一列中长度不超过指定百分位的最长的几个显示文本
+
+    字符数只是像素宽度的近似，取几个长度相近的文本交给界面按字体测量。
+    """
+    texts = pd.Series(render_column(series, fmt), dtype=object)
+    if texts.empty:
+        return []
+    lengths = texts.str.len().to_numpy()
+    texts = texts[lengths <= np.percentile(lengths, percentile)].drop_duplicates()
+    order = np.argsort(-texts.str.len().to_numpy(), kind='stable')[:count]
+    return [str(text) for text in texts.iloc[order]]
+
+
+def sample_width_candidates(frame, formats=None):
+    """抽样行中各列的候选文本 {列名: [文本]}"""
+    formats = formats or {}
+    return {str(name): width_candidates(frame.iloc[:, col], formats.get(name))
+            for col, name in enumerate(frame.columns)}
+
+
+def load_width_samples(path):
+    """读取保存的候选文本，文件不存在或损坏时返回None"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            samples = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"读取列宽缓存失败: {str(e)}")
+        return None
+    return samples if isinstance(samples, dict) else None
+
+
+def save_width_samples(path, samples):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(samples, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"保存列宽缓存失败: {str(e)}")
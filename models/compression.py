@@ -0,0 +1,77 @@
+import bz2
+import gzip
+import lzma
+import os
+import zipfile
+from contextlib import contextmanager
+
+# 文件头魔数 -> 压缩格式
+MAGIC_NUMBERS = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip'),
+]
+# 保存时可选的压缩格式 (扩展名, pandas compression 参数)
+COMPRESSION_EXTENSIONS = [('.gz', 'gzip'), ('.bz2', 'bz2'), ('.xz', 'xz'), ('.zip', 'zip')]
+
+
+def detect_compression(file_path):
+    """根据文件头魔数判断压缩格式，未压缩时返回None"""
+    with open(file_path, 'rb') as f:
+        head = f.read(8)
+    for magic, name in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def _zip_member(archive):
+    """压缩包中要读取的文件：优先选择第一个CSV文件"""
+    names = [info.filename for info in archive.infolist() if not info.is_dir()]
+    if not names:
+        raise ValueError("压缩包中没有文件")
+    for name in names:
+        if name.lower().endswith('.csv'):
+            return name
+    return names[0]
+
+
+@contextmanager
+def open_csv_stream(file_path):
+    """以流的方式打开可能被压缩的文件，不解压到临时文件
+
+    Yields:
+        tuple: (解压后的二进制数据流, 底层文件对象)，底层文件的 tell() 为已读取的压缩字节数
+    """
+    compression = detect_compression(file_path)
+    with open(file_path, 'rb') as raw:
+        if compression is None:
+            yield raw, raw
+        elif compression == 'zip':
+            with zipfile.ZipFile(raw) as archive, archive.open(_zip_member(archive)) as stream:
+                yield stream, raw
+        else:
+            openers = {
+                'gzip': lambda f: gzip.GzipFile(fileobj=f, mode='rb'),
+                'bz2': lambda f: bz2.BZ2File(f, 'rb'),
+                'xz': lambda f: lzma.LZMAFile(f, 'rb'),
+            }
+            with openers[compression](raw) as stream:
+                yield stream, raw
+
+
+def compression_for_path(file_path):
+    """根据保存路径的扩展名选择压缩格式，未压缩时返回None"""
+    lower = file_path.lower()
+    for ext, name in COMPRESSION_EXTENSIONS:
+        if lower.endswith(ext):
+            return name
+    return None
+
+
+def is_compressed(file_path):
+    try:
+        return os.path.getsize(file_path) > 0 and detect_compression(file_path) is not None
+    except OSError:
+        return False
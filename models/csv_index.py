@@ -0,0 +1,224 @@
+import io
+import mmap
+import os
+import numpy as np
+import pandas as pd
+
+INDEX_SUFFIX = '.lfidx.npz'
+SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+NEWLINE = 0x0A
+QUOTE = 0x22
+
+
+def scan_record_starts(buf, start, end, in_quotes=False):
+    """扫描 buf[start:end]，找出所有记录的起始偏移
+
+    只有位于引号外的换行符才是记录边界（字段内的换行不算），
+    双引号转义 "" 不改变引号状态。
+
+    Returns:
+        tuple: (记录起始偏移数组 int64, 扫描结束时是否位于引号内)
+    """
+    arr = np.frombuffer(buf, dtype=np.uint8, count=end - start, offset=start)
+    newlines = np.flatnonzero(arr == NEWLINE)
+    quotes = np.flatnonzero(arr == QUOTE)
+    del arr
+
+    if len(quotes) == 0:
+        starts = newlines if not in_quotes else newlines[:0]
+    else:
+        # 换行符之前的引号数量决定其是否位于引号内
+        quotes_before = np.searchsorted(quotes, newlines)
+        outside = (quotes_before + int(in_quotes)) % 2 == 0
+        starts = newlines[outside]
+        in_quotes = (len(quotes) + int(in_quotes)) % 2 == 1
+
+    return starts.astype(np.int64) + (start + 1), in_quotes
+
+
+def build_row_offsets(buf, size, progress_callback=None, should_stop=None):
+    """构建行起始偏移索引
+
+    Returns:
+        np.ndarray: 第一个元素为表头之后第一行的偏移，最后一个元素为文件大小，
+                    第i行数据位于 [offsets[i], offsets[i+1])
+    """
+    parts = []
+    in_quotes = False
+    pos = 0
+    while pos < size:
+        if should_stop is not None and should_stop():
+            return None
+        end = min(pos + SCAN_BLOCK_SIZE, size)
+        starts, in_quotes = scan_record_starts(buf, pos, end, in_quotes)
+        parts.append(starts)
+        pos = end
+        if progress_callback is not None:
+            progress_callback(int(pos * 100 / size))
+
+    offsets = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+    offsets = offsets[offsets < size]
+    if len(offsets) == 0:
+        # 只有表头
+        return np.array([size], dtype=np.int64)
+    return np.append(offsets, np.int64(size))
+
+
+class LazyCsvStore:
+    """基于内存映射的延迟加载CSV数据源
+
+    一次扫描建立行偏移索引（numpy int64），读取数据时只解析请求范围对应的字节，
+    常驻内存只有偏移索引和当前可见的页面。索引会保存在文件旁边以便下次直接复用。
+    """
+
+    def __init__(self, file_path, read_options=None):
+        self.file_path = file_path
+        self.read_options = dict(read_options or {})
+        self._file = None
+        self._mmap = None
+        self._offsets = np.array([0], dtype=np.int64)
+        self._columns = pd.Index([])
+        self._frame = None
+
+    @classmethod
+    def open(cls, file_path, read_options=None, progress_callback=None, should_stop=None):
+        """打开文件并加载或建立行偏移索引，被中止时返回None"""
+        store = cls(file_path, read_options)
+        size = os.path.getsize(file_path)
+        if size == 0:
+            raise ValueError("文件为空")
+
+        store._file = open(file_path, 'rb')
+        store._mmap = mmap.mmap(store._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        offsets = store._load_index()
+        if offsets is None:
+            offsets = build_row_offsets(store._mmap, size, progress_callback, should_stop)
+            if offsets is None:
+                store.close()
+                return None
+            store._save_index(offsets)
+        elif progress_callback is not None:
+            progress_callback(100)
+
+        store._offsets = offsets
+        header = pd.read_csv(io.BytesIO(store._mmap[:offsets[0]]), nrows=0, **store.read_options)
+        store._columns = header.columns
+        return store
+
+    def _index_path(self):
+        return self.file_path + INDEX_SUFFIX
+
+    def _file_signature(self):
+        stat = os.stat(self.file_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_index(self):
+        """读取保存的索引，文件已变化时返回None"""
+        try:
+            with np.load(self._index_path()) as data:
+                size, mtime = self._file_signature()
+                if int(data['size']) != size or int(data['mtime']) != mtime:
+                    return None
+                return data['offsets'].astype(np.int64)
+        except Exception:
+            return None
+
+    def _save_index(self, offsets):
+        """把索引保存在文件旁边，目录不可写时忽略"""
+        try:
+            size, mtime = self._file_signature()
+            with open(self._index_path(), 'wb') as f:
+                np.savez(f, offsets=offsets, size=size, mtime=mtime)
+        except Exception as e:
+            print(f"保存行索引失败: {str(e)}")
+
+    def close(self):
+        """释放内存映射和文件句柄"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        if self._frame is not None:
+            return len(self._frame)
+        return len(self._offsets) - 1
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def columns(self):
+        if self._frame is not None:
+            return self._frame.columns
+        return self._columns
+
+    @property
+    def chunk_count(self):
+        return 1
+
+    def _parse_rows(self, start, end, columns=None):
+        """只解析 [start, end) 行对应的字节范围
+
+        :param columns: 只解析这些列，None 表示全部列
+        """
+        data = self._mmap[self._offsets[start]:self._offsets[end]]
+        frame = pd.read_csv(io.BytesIO(data), header=None, names=list(self._columns), usecols=columns,
+                            skip_blank_lines=False, **self.read_options)
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        return frame
+
+    def slice(self, start, end):
+        """获取 [start, end) 范围内的行"""
+        if self._frame is not None:
+            result = self._frame.iloc[start:end]
+            result.index = pd.RangeIndex(start, start + len(result))
+            return result
+        total = len(self)
+        start = max(0, min(start, total))
+        end = max(start, min(end, total))
+        if start == end:
+            return pd.DataFrame(columns=self._columns)
+        return self._parse_rows(start, end)
+
+    def take(self, rows):
+        """按行号数组取行，只解析这些行对应的字节"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if self._frame is not None:
+            result = self._frame.iloc[rows]
+        elif len(rows) == 0:
+            result = pd.DataFrame(columns=self._columns)
+        else:
+            pieces = []
+            for row in rows:
+                piece = self._mmap[self._offsets[row]:self._offsets[row + 1]]
+                pieces.append(piece if piece.endswith(b'\n') else piece + b'\n')
+            result = pd.read_csv(io.BytesIO(b''.join(pieces)), header=None, names=list(self._columns),
+                                 skip_blank_lines=False, **self.read_options)
+        result.index = pd.Index(rows)
+        return result
+
+    def iter_chunks(self, rows_per_chunk=100000, columns=None):
+        """按顺序逐块解析数据，返回 (起始行, 数据块)
+
+        :param columns: 只解析这些列（如排序键），None 表示全部列
+        """
+        if self._frame is not None:
+            yield 0, self._frame if columns is None else self._frame[list(columns)]
+            return
+        total = len(self)
+        for start in range(0, total, rows_per_chunk):
+            yield start, self._parse_rows(start, min(start + rows_per_chunk, total), columns)
+
+    def consolidate(self):
+        """解析整个文件为连续的DataFrame（开销较大，仅在确实需要时调用）"""
+        if self._frame is None:
+            if self.empty:
+                self._frame = pd.DataFrame(columns=self._columns)
+            else:
+                self._frame = self._parse_rows(0, len(self))
+        return self._frame
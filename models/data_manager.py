@@ -1,143 +1,1363 @@
-from PySide6.QtCore import QObject, Signal, QThread
+from PySide6.QtCore import QObject, Signal, QThread, QTimer
+import os
 import pandas as pd
 import numpy as np
+from lovelyform.models.chunk_store import ChunkedStore, concat_chunks
+from lovelyform.models.csv_index import LazyCsvStore
+from lovelyform.models.column_cache import ColumnarCache, file_signature
+from lovelyform.models.dtype_optimizer import DtypeOptimizer
+from lovelyform.models.type_inference import TypeInferencer
+from lovelyform.models.compression import open_csv_stream, is_compressed
+from lovelyform.models.json_loader import json_format, iter_json_chunks
+from lovelyform.models.highlight_index import HighlightIndex
+from lovelyform.models.text_index import TextIndex
+from lovelyform.models.filter_engine import (evaluate_filters, filter_mask, narrow_rows, search_cells,
+                                             TextMatcher, RowVector, TAKE_BATCH)
+from lovelyform.models.sort_engine import SortIndex, compute_permutation
+from lovelyform.models.column_summary import EmptyColumnIndex
+from lovelyform.models.column_profiler import profile_chunks
+from lovelyform.models.column_sketch import TableSketch
+from lovelyform.models.column_widths import (sample_rows, sample_width_candidates, load_width_samples,
+                                             save_width_samples)
+from lovelyform.models.display_cache import render_column
+from lovelyform.models.file_follower import FileFollower, FileTruncatedError, last_record_end
+from lovelyform.models.parallel_loader import (parallel_read_csv, default_workers, supports_parallel,
+                                               PARALLEL_MIN_SIZE)
 
 class DataLoadThread(QThread):
     chunk_loaded = Signal(pd.DataFrame)
+    chunk_sketched = Signal(object)  # 刚发出的数据块的各列摘要 TableSketch
+    store_ready = Signal(object)  # 延迟加载模式下建立好索引的数据源
     finished = Signal()
     error = Signal(str)
     progress = Signal(int)
+    row_count = Signal(int)  # 解析完成后得到的精确行数
 
-    def __init__(self, file_path, chunk_size=10000):
+    def __init__(self, file_path, chunk_size=10000, lazy=False, read_options=None,
+                 cache=None, optimizer=None, inferencer=None, workers=1, sketch=False):
         super().__init__()
         self.file_path = file_path
         self.chunk_size = chunk_size
+        self.lazy = lazy
+        self.read_options = dict(read_options or {'encoding': 'utf-8'})
+        self.cache = cache
+        self.cache_path = None
+        # 在打开文件之前取得文件状态，缓存和附属文件都以此为键，读取期间文件被修改时不写缓存
+        self.signature = file_signature(file_path)
+        self.optimizer = optimizer
+        self.inferencer = inferencer
+        self.workers = workers
+        self.sketch = sketch
         self.is_running = True
+        self.total_rows = None
+        self.from_cache = False
+        self.end_offset = None  # 已解析到的文件字节偏移（未压缩的CSV文件）
 
     def run(self):
         try:
-            total_rows = sum(1 for _ in open(self.file_path, 'r', encoding='utf-8')) - 1
-            chunks = pd.read_csv(self.file_path, chunksize=self.chunk_size)
-            loaded_rows = 0
-
-            for chunk in chunks:
-                if not self.is_running:
-                    break
-                self.chunk_loaded.emit(chunk)
-                loaded_rows += len(chunk)
-                progress = int((loaded_rows / total_rows) * 100)
-                self.progress.emit(progress)
-
+            # 延迟加载模式不物化数据，也就不使用列式缓存
+            if self.cache is not None and not self.lazy and self.signature is not None:
+                self.cache_path = self.cache.lookup(self.file_path, self.read_options, self.signature)
+            if self.cache_path and self._load_cached():
+                pass
+            elif json_format(self.file_path):
+                self._load_json(json_format(self.file_path))
+            elif self.lazy:
+                self._load_lazy()
+            elif self.workers > 1:
+                self._load_parallel()
+            else:
+                self._load_chunks()
             self.finished.emit()
         except Exception as e:
             self.error.emit(str(e))
 
+    def _prepare_chunk(self, chunk):
+        """类型推断和类型优化"""
+        if self.inferencer is not None:
+            chunk = self.inferencer.apply(chunk)
+        if self.optimizer is not None:
+            chunk = self.optimizer.optimize(chunk)
+        return chunk
+
+    def _emit_chunks(self, chunks, file_size, prepared=False):
+        """逐块发出解析结果，chunks 产生 (数据块, 已读取的字节数)
+
+        :param prepared: 数据块是否已经完成类型推断和类型优化
+        """
+        loaded_rows = 0
+        last_progress = -1
+        for chunk, position in chunks:
+            if not self.is_running:
+                break
+            if not prepared:
+                chunk = self._prepare_chunk(chunk)
+            # 摘要在发出数据块之前计算，之后数据块归界面线程所有
+            sketch = TableSketch.of(chunk) if self.sketch else None
+            self.chunk_loaded.emit(chunk)
+            if sketch is not None:
+                self.chunk_sketched.emit(sketch)
+            loaded_rows += len(chunk)
+            progress = int(position * 100 / file_size) if file_size else 100
+            progress = min(progress, 100)
+            if progress != last_progress:
+                self.progress.emit(progress)
+                last_progress = progress
+            self.end_offset = position
+
+        if self.is_running:
+            if last_progress != 100:
+                self.progress.emit(100)
+            self.total_rows = loaded_rows
+            self.row_count.emit(loaded_rows)
+        return loaded_rows
+
+    def _load_chunks(self):
+        """逐块解析文件，压缩文件边解压边解析"""
+        file_size = os.path.getsize(self.file_path)
+
+        # 只解析一遍文件，进度按已读取的（压缩）字节数计算
+        with open_csv_stream(self.file_path) as (stream, raw):
+            chunks = pd.read_csv(stream, chunksize=self.chunk_size, **self.read_options)
+            self._emit_chunks(((chunk, raw.tell()) for chunk in chunks), file_size)
+
+    def _load_json(self, fmt):
+        """增量解析 JSON / JSON Lines 文件，数据块与CSV走相同的流程"""
+        file_size = os.path.getsize(self.file_path)
+        with open_csv_stream(self.file_path) as (stream, raw):
+            chunks = iter_json_chunks(stream, fmt, self.read_options.get('encoding'), self.chunk_size)
+            self._emit_chunks(((chunk, raw.tell()) for chunk in chunks), file_size)
+
+    def _load_parallel(self):
+        """多进程按字节范围并行解析"""
+        file_size = os.path.getsize(self.file_path)
+        chunks = parallel_read_csv(self.file_path, self.read_options, self.workers,
+                                   should_stop=lambda: not self.is_running,
+                                   inferencer=self.inferencer, optimizer=self.optimizer)
+        self._emit_chunks(chunks, file_size, prepared=True)
+
+    def _load_cached(self):
+        """从列式缓存读取，缓存损坏时返回False以重新解析"""
+        try:
+            df = self.cache.load(self.cache_path)
+        except Exception as e:
+            print(f"读取缓存失败: {str(e)}")
+            return False
+        self.from_cache = True
+        self.end_offset = os.path.getsize(self.file_path)
+        self.chunk_loaded.emit(df)
+        self.progress.emit(100)
+        self.total_rows = len(df)
+        self.row_count.emit(self.total_rows)
+        return True
+
+    def _load_lazy(self):
+        """只建立行偏移索引，数据在翻页时按需解析"""
+        store = LazyCsvStore.open(
+            self.file_path,
+            read_options=self.read_options,
+            progress_callback=self.progress.emit,
+            should_stop=lambda: not self.is_running,
+        )
+        if store is None:
+            return
+        self.total_rows = len(store)
+        self.store_ready.emit(store)
+        self.row_count.emit(self.total_rows)
+
     def stop(self):
         self.is_running = False
 
-class DataSorterThread(QThread):
-    progress = Signal(int)
-    finished = Signal(object, str)  # DataFrame, error message
+class CacheWriteThread(QThread):
+    """在后台把解析结果写入列式缓存"""
+
+    def __init__(self, cache, file_path, read_options, chunks, signature):
+        super().__init__()
+        self.cache = cache
+        self.file_path = file_path
+        self.read_options = read_options
+        self.chunks = chunks
+        self.signature = signature
+
+    def run(self):
+        try:
+            self.cache.store(self.file_path, self.read_options, concat_chunks(self.chunks), self.signature)
+        except Exception as e:
+            print(f"写入缓存失败: {str(e)}")
+        finally:
+            self.chunks = None
+
+class SortThread(QThread):
+    """在后台计算排序后的行号排列，不复制数据"""
+    result_ready = Signal(object, object)  # 线程, (行号排列, {列名: 名次数组})
 
-    def __init__(self, df, column, ascending=True):
+    def __init__(self, compute):
         super().__init__()
-        self.df = df.copy()
-        self.column = column
-        self.ascending = ascending
+        self.compute = compute
+        self.is_running = True
 
     def run(self):
         try:
-            # 执行排序
-            self.df.sort_values(by=self.column, ascending=self.ascending, inplace=True)
-            self.df.reset_index(drop=True, inplace=True)
-            self.finished.emit(self.df, "")
+            result = self.compute(lambda: not self.is_running)
         except Exception as e:
-            self.finished.emit(None, str(e))
+            print(f"排序错误: {str(e)}")
+            result = None
+        if self.is_running:
+            self.result_ready.emit(self, result)
+
+    def stop(self):
+        self.is_running = False
+
+class FilterThread(QThread):
+    """在后台计算筛选结果，可以随时中止"""
+    result_ready = Signal(object, object)  # 线程, 满足条件的行号（RowVector）
+
+    def __init__(self, evaluate):
+        super().__init__()
+        self.evaluate = evaluate
+        self.is_running = True
+
+    def run(self):
+        try:
+            result = self.evaluate(lambda: not self.is_running)
+        except Exception as e:
+            print(f"筛选失败: {str(e)}")
+            result = None
+        if self.is_running:
+            self.result_ready.emit(self, result)
+
+    def stop(self):
+        self.is_running = False
+
+class SearchThread(QThread):
+    """在后台逐块搜索匹配的单元格，分批发出结果，可以随时中止"""
+    results_found = Signal(object, object)  # 线程, (行号数组, 列号数组)
+    progress = Signal(object, int)
+    search_finished = Signal(object, int)  # 线程, 命中的单元格数
+
+    def __init__(self, matcher, chunks, total_rows, formats):
+        super().__init__()
+        self.matcher = matcher
+        self.chunks = chunks
+        self.total_rows = total_rows
+        self.formats = formats
+        self.is_running = True
+
+    def run(self):
+        found = 0
+        try:
+            for start, chunk in self.chunks:
+                for begin in range(0, len(chunk), TAKE_BATCH):
+                    if not self.is_running:
+                        return
+                    part = chunk.iloc[begin:begin + TAKE_BATCH]
+                    batch = search_cells(self.matcher, part, start + begin, self.formats)
+                    if len(batch[0]):
+                        found += len(batch[0])
+                        self.results_found.emit(self, batch)
+                    done = start + begin + len(part)
+                    self.progress.emit(self, int(done * 100 / max(self.total_rows, 1)))
+        except Exception as e:
+            print(f"搜索失败: {str(e)}")
+        finally:
+            self.chunks = None
+        if self.is_running:
+            self.search_finished.emit(self, found)
+
+    def stop(self):
+        self.is_running = False
+
+class TextIndexThread(QThread):
+    """在后台读取或建立文本索引，建立完成后保存到 path"""
+    index_ready = Signal(object, object)  # 线程, TextIndex
+
+    def __init__(self, chunks, formats, path=None):
+        super().__init__()
+        self.chunks = chunks
+        self.formats = formats
+        self.path = path
+        self.is_running = True
+
+    def run(self):
+        index = None
+        try:
+            index = self._load()
+            if index is None:
+                index = TextIndex.build(self.chunks, self.formats, lambda: not self.is_running)
+                if index is not None and self.path:
+                    index.save(self.path)
+        except Exception as e:
+            print(f"建立文本索引失败: {str(e)}")
+        finally:
+            self.chunks = None
+        if self.is_running and index is not None:
+            self.index_ready.emit(self, index)
+
+    def _load(self):
+        """读取与当前数据一致的索引缓存"""
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            index = TextIndex.load(self.path, self.formats)
+        except Exception as e:
+            print(f"读取文本索引失败: {str(e)}")
+            return None
+        rows = sum(len(chunk) for _, chunk in self.chunks)
+        names = [str(name) for name in self.chunks[0][1].columns] if self.chunks else []
+        if index.rows != rows or list(index.columns) != names:
+            return None
+        return index
+
+    def stop(self):
+        self.is_running = False
+
+class EmptyColumnsThread(QThread):
+    """在后台统计各列的非空白单元格数"""
+    index_ready = Signal(object, object)  # 线程, EmptyColumnIndex
+
+    def __init__(self, chunks, formats):
+        super().__init__()
+        self.chunks = chunks
+        self.formats = formats
+        self.is_running = True
+
+    def run(self):
+        index = None
+        try:
+            index = EmptyColumnIndex.build(self.chunks, self.formats, lambda: not self.is_running)
+        except Exception as e:
+            print(f"统计空白列失败: {str(e)}")
+        finally:
+            self.chunks = None
+        if self.is_running and index is not None:
+            self.index_ready.emit(self, index)
+
+    def stop(self):
+        self.is_running = False
+
+class ProfileThread(QThread):
+    """在后台统计各列的统计量"""
+    profile_ready = Signal(object, object)  # 线程, [(列名, 统计量)]
+
+    def __init__(self, chunks, version, workers):
+        super().__init__()
+        self.chunks = chunks
+        self.version = version
+        self.workers = workers
+        self.is_running = True
+
+    def run(self):
+        profiles = None
+        try:
+            profiles = profile_chunks(list(self.chunks), self.workers, lambda: not self.is_running)
+        except Exception as e:
+            print(f"统计数据失败: {str(e)}")
+        finally:
+            self.chunks = None
+        if self.is_running and profiles is not None:
+            self.profile_ready.emit(self, profiles)
+
+    def stop(self):
+        self.is_running = False
 
 class DataManager(QObject):
     data_changed = Signal()
     sort_changed = Signal()
     progress = Signal(int)
+    rows_appended = Signal(int, int)  # 加载或跟踪过程中追加的行 (起始行, 行数)
+    load_finished = Signal()
+    filter_finished = Signal(int)  # 后台筛选完成，参数为满足条件的行数
+    search_results = Signal(object)  # 全局搜索的一批结果 (行号数组, 列号数组)
+    search_progress = Signal(int)
+    search_finished = Signal(int)  # 全局搜索完成，参数为命中的单元格数
+    empty_columns_ready = Signal()  # 整个数据集的空白列统计完成
+    profile_ready = Signal()  # 各列统计完成
+
+    # 超过该大小的文件默认使用延迟加载（内存映射 + 行偏移索引）
+    LAZY_LOAD_THRESHOLD = 2 * 1024 ** 3
+    FOLLOW_INTERVAL = 1000  # 跟踪模式的轮询间隔（毫秒）
+    TEXT_INDEX_MIN_ROWS = 100000  # 行数达到该值才建立文本索引
+    TEXT_INDEX_SUFFIX = '.ngram.npz'
+    SORT_INLINE_ROWS = 100000  # 行数不超过该值时直接排序，否则在后台排序
+    WIDTH_SAMPLES_SUFFIX = '.widths.json'
 
     def __init__(self):
         super().__init__()
-        self.df = pd.DataFrame()
-        self.sort_column = None
-        self.sort_order = None
-        self.load_thread = None
+        self.store = ChunkedStore()
+        # 排序键 [(列名, 是否升序)]，排序只计算行号排列，不移动数据
+        self.sort_keys = []
+        self.sorter = SortIndex()
         self.sort_thread = None
+        self.sort_permutation = None  # 当前使用的行号排列，覆盖排序时的全部行
+        self.sort_rows = None         # 排序后显示的行号（经过筛选），排序之后追加的行在末尾
+        self.load_thread = None
+        self.file_path = None
+        self.read_options = {'encoding': 'utf-8'}
+        self.cache = ColumnarCache()
+        self.cache_thread = None
+        self.optimizer = None
+        self.loading = False
+        self.parallel_workers = default_workers()
+        self.inferencer = None
+        # 跟踪模式：定时解析文件新增的记录
+        self.follow_enabled = False
+        self.follower = None
+        self.follow_timer = QTimer(self)
+        self.follow_timer.setInterval(self.FOLLOW_INTERVAL)
+        self.follow_timer.timeout.connect(self._poll_follow)
+        # 关键词高亮的单元格颜色索引，随数据追加和修改增量更新
+        self.highlighter = HighlightIndex()
+        # 筛选条件 {键: 条件}（实时搜索框为 'search'，列筛选为列名）和满足条件的行号
+        self.filters = {}
+        self.view_rows = None
+        # view_rows 对应的筛选条件（后台筛选完成前与 filters 不同）和正在进行的后台筛选
+        self._view_filters = {}
+        self.filter_thread = None
+        self.search_thread = None
+        # 文本列的三元组索引，加载完成后在后台建立，用于搜索和筛选时快速找出候选单元格
+        self.text_index_enabled = True
+        self.text_index = None
+        self.text_index_thread = None
+        self._text_index_path = None   # 索引缓存文件，只有数据与文件内容一致时才使用
+        self._text_index_total = 0     # 后台建立索引时的行数
+        self._text_index_edits = []    # 后台建立索引期间修改的单元格
+        # 各列非空白单元格数的汇总，加载完成后在后台统计，之后随追加和修改增量更新
+        self.empty_columns_index = None
+        self.empty_columns_thread = None
+        self._empty_columns_total = 0
+        # 估计列宽用的各列候选文本，按文件缓存，数据与文件内容一致时保存到 _width_path
+        self._width_samples = None
+        self._width_path = None
+        # 数据版本，数据有任何修改时递增；各列统计结果按版本缓存
+        self.data_version = 0
+        self.profile = None            # (数据版本, [(列名, 统计量)])
+        self.profile_thread = None
+        self._profile_requested = False  # 加载过程中请求的统计推迟到加载完成后进行
+        # 加载过程中各列的流式摘要（不重复值个数、高频值、分位数的估计），内存占用与行数无关
+        self.sketch_enabled = True
+        self.sketch = None
+        self._retired_threads = []     # 已中止但尚未结束的线程
+
+    @property
+    def sort_column(self):
+        """主排序列，未排序时为None"""
+        return self.sort_keys[0][0] if self.sort_keys else None
+
+    @property
+    def sort_order(self):
+        if not self.sort_keys:
+            return None
+        return 'ascending' if self.sort_keys[0][1] else 'descending'
+
+    @property
+    def df(self):
+        """完整的连续DataFrame，需要时才合并数据块"""
+        return self.store.consolidate()
 
-    def load_csv(self, file_path):
-        if self.load_thread and self.load_thread.isRunning():
-            self.load_thread.stop()
-            self.load_thread.wait()
+    @df.setter
+    def df(self, value):
+        self._reset_store()
+        self.store.set_frame(value)
+        self._rebuild_indexes()
 
-        self.df = pd.DataFrame()
-        self.load_thread = DataLoadThread(file_path)
+    def _reset_store(self):
+        """丢弃当前数据源，延迟加载的数据源需要释放内存映射"""
+        self.data_version += 1
+        self._cancel_profile()
+        self.sketch = None
+        if hasattr(self.store, 'close'):
+            self.store.close()
+        self.store = ChunkedStore()
+
+    def load_csv(self, file_path, lazy=None):
+        """加载CSV文件
+
+        :param lazy: 是否使用延迟加载，None 表示按文件大小自动选择
+        """
+        if self.load_thread:
+            self.load_thread.chunk_loaded.disconnect(self.append_chunk)
+            self.load_thread.chunk_sketched.disconnect(self._on_chunk_sketched)
+            self.load_thread.store_ready.disconnect(self._on_store_ready)
+            self.load_thread.finished.disconnect(self._on_load_finished)
+            self.load_thread.error.disconnect(self._on_load_error)
+            if self.load_thread.isRunning():
+                self.load_thread.stop()
+                self.load_thread.wait()
+
+        self._stop_follow()
+        self.cancel_search()
+        self._reset_store()
+        self.highlighter.clear()
+        # 列筛选只对原文件有效，实时搜索条件保留并应用到新文件
+        self.filters = {key: value for key, value in self.filters.items() if key == 'search'}
+        self._rebuild_indexes()
+        self.file_path = file_path
+        self.loading = True
+        if is_compressed(file_path) or json_format(file_path):
+            lazy = False  # 压缩文件和JSON文件无法按行偏移随机读取，只能流式解析
+        elif lazy is None:
+            try:
+                lazy = os.path.getsize(file_path) > self.LAZY_LOAD_THRESHOLD
+            except OSError:
+                lazy = False
+        self.optimizer = DtypeOptimizer()
+        self.inferencer = TypeInferencer()
+        self.load_thread = DataLoadThread(file_path, lazy=lazy, read_options=self.read_options,
+                                          cache=self.cache,
+                                          optimizer=self.optimizer, inferencer=self.inferencer,
+                                          workers=self._choose_workers(file_path),
+                                          sketch=self.sketch_enabled)
         self.load_thread.chunk_loaded.connect(self.append_chunk)
+        self.load_thread.chunk_sketched.connect(self._on_chunk_sketched)
+        self.load_thread.store_ready.connect(self._on_store_ready)
+        self.load_thread.finished.connect(self._on_load_finished)
+        self.load_thread.error.connect(self._on_load_error)
         self.load_thread.progress.connect(lambda p: self.progress.emit(p))
         self.load_thread.start()  # 启动线程
         return self.load_thread
 
+    def _choose_workers(self, file_path):
+        """大文件使用多进程并行解析，返回工作进程数（1 表示单线程解析）"""
+        if self.parallel_workers <= 1 or not supports_parallel(self.read_options):
+            return 1
+        if is_compressed(file_path) or json_format(file_path):
+            return 1
+        try:
+            if os.path.getsize(file_path) < PARALLEL_MIN_SIZE:
+                return 1
+        except OSError:
+            return 1
+        return self.parallel_workers
+
     def load_file(self, file_path):
         """加载文件（CSV格式）
         这是load_csv方法的别名，为了保持API一致性
         """
         return self.load_csv(file_path)
 
-    def append_chunk(self, chunk):
-        if self.df.empty:
-            self.df = chunk
-        else:
-            self.df = pd.concat([self.df, chunk], ignore_index=True)
-        
-        if self.sort_column is not None:
-            self.sort_data(self.sort_column, self.sort_order, apply_immediately=True)
-        
+    def _on_store_ready(self, store):
+        """延迟加载的索引建立完成"""
+        self._reset_store()
+        self.store = store
+        self._rebuild_indexes()
         self.data_changed.emit()
 
-    def sort_data(self, column, order='ascending', apply_immediately=False):
+    def _on_load_finished(self):
+        """加载完成后执行推迟的整表操作，并在后台建立文本索引和写入列式缓存"""
+        if not self.loading:
+            return  # QThread 自身的 finished 信号也会触发，只处理一次
+        self.loading = False
+        thread = self.load_thread
+        # 读取期间文件被修改（如仍在写入的输出文件），已读取的数据与文件内容不一致，不写缓存
+        unchanged = (thread is not None and thread.signature is not None
+                     and file_signature(thread.file_path) == thread.signature)
+        # 排序不移动数据，数据与文件内容一致，文本索引可以和列式缓存一起保存和复用
+        if unchanged:
+            self._text_index_path = self.cache.sidecar_path(thread.file_path, self.read_options,
+                                                            self.TEXT_INDEX_SUFFIX, thread.signature)
+            self._width_path = self.cache.sidecar_path(thread.file_path, self.read_options,
+                                                       self.WIDTH_SAMPLES_SUFFIX, thread.signature)
+        self._start_text_index()
+        self._start_empty_columns()
+        self._start_sort()
+        if self._profile_requested:
+            self._start_profile()
+        self.data_changed.emit()
+        self.load_finished.emit()
+        if self.follow_enabled:
+            self._start_follow()
+
+        if (not unchanged or thread.total_rows is None or thread.from_cache or thread.lazy
+                or not isinstance(self.store, ChunkedStore)):
+            return
+        if self.cache_thread and self.cache_thread.isRunning():
+            self.cache_thread.wait()
+        chunks = [chunk for _, chunk in self.store.iter_chunks()]
+        self.cache_thread = CacheWriteThread(self.cache, thread.file_path, thread.read_options, chunks,
+                                             thread.signature)
+        self.cache_thread.start()
+
+    def set_follow(self, enabled):
+        """开启或关闭跟踪模式，加载中开启时在加载完成后生效
+
+        Returns:
+            bool: 当前文件是否支持跟踪（压缩文件、JSON文件和延迟加载的文件不支持）
         """
-        对数据进行排序
+        self.follow_enabled = enabled
+        if not enabled:
+            self._stop_follow()
+            return True
+        if self.loading:
+            return True
+        return self._start_follow()
+
+    def _start_follow(self):
+        """从已解析到的位置开始跟踪文件"""
+        self._stop_follow()
+        thread = self.load_thread
+        if (thread is None or thread.end_offset is None or not isinstance(self.store, ChunkedStore)
+                or is_compressed(self.file_path) or json_format(self.file_path)):
+            return False
+        try:
+            offset = last_record_end(self.file_path, thread.end_offset)
+            with open(self.file_path, 'rb') as f:
+                f.seek(offset)
+                tail = f.read(thread.end_offset - offset)
+        except OSError as e:
+            print(f"开启跟踪模式失败: {str(e)}")
+            return False
+        if tail.strip():
+            # 加载时最后一条记录还没有写完，丢弃后重新解析
+            self.store.truncate(self.get_total_rows() - 1)
+            self._rebuild_indexes()
+            self.data_changed.emit()
+        self.follower = FileFollower(self.file_path, self.get_columns(), offset, self.read_options)
+        self.follow_timer.start()
+        return True
+
+    def _stop_follow(self):
+        self.follow_timer.stop()
+        self.follower = None
+
+    def _poll_follow(self):
+        """解析文件新增的完整记录并追加到数据末尾"""
+        if self.follower is None or self.loading:
+            return
+        try:
+            chunk = self.follower.poll()
+        except FileTruncatedError:
+            # 文件被重新写入，重新加载整个文件（跟踪模式在加载完成后恢复）
+            self.load_csv(self.file_path)
+            return
+        except Exception as e:
+            print(f"跟踪文件失败: {str(e)}")
+            return
+        if chunk is None or len(chunk) == 0:
+            return
+        if self.inferencer is not None:
+            chunk = self.inferencer.apply(chunk)
+        if self.optimizer is not None:
+            chunk = self.optimizer.optimize(chunk)
+        self.append_chunk(chunk)
+
+    def _on_load_error(self, error):
+        """加载失败时结束加载状态，保留已经读取的数据"""
+        self.loading = False
+        self.data_changed.emit()
+
+    def get_memory_report(self):
+        """获取加载时类型优化节省的内存，返回 {列名: 字节数}"""
+        if self.optimizer is None:
+            return {}
+        return dict(self.optimizer.report)
+
+    def invalidate_cache(self, file_path=None):
+        """清除文件的列式缓存，默认为当前文件
+
+        Returns:
+            int: 删除的缓存文件数
+        """
+        return self.cache.invalidate(file_path or self.file_path)
+
+    def append_chunk(self, chunk):
+        # 只记录新数据块，避免每次都复制整个DataFrame
+        start = self.get_total_rows()
+        columns = self.get_columns()
+        self.store.append(chunk)
+        self.data_version += 1
+        if self.follower is not None and self.sketch is not None:
+            self.sketch.append(chunk)  # 跟踪模式追加的行不经过加载线程
+        if start and not columns.equals(self.get_columns()):
+            self._rebuild_indexes()
+        elif (self.highlighter.active or self._view_filters or self.text_index is not None
+              or self.sort_rows is not None or self.empty_columns_index is not None):
+            added = self.store.slice(start, self.get_total_rows())
+            formats = self.get_display_formats()
+            self.highlighter.append(added, formats)
+            if self.text_index is not None:
+                self.text_index.append(added)
+            if self.empty_columns_index is not None:
+                self.empty_columns_index.append(added, formats)
+            rows = np.arange(start, self.get_total_rows())
+            if self._view_filters:
+                rows = rows[filter_mask(self._view_filters.values(), added, formats)]
+                self.view_rows.extend(rows)
+            if self.sort_rows is not None:
+                # 排序之后追加的行显示在末尾
+                self.sort_rows.extend(rows)
+
+        # 第一个数据块到达时立即显示首页，之后只通知新增的行，
+        # 排序等整表操作推迟到加载完成后进行；跟踪模式下新增的行追加在末尾
+        if not (self.loading or self.follower is not None) or start == 0:
+            self.data_changed.emit()
+        elif len(chunk):
+            self.rows_appended.emit(start, len(chunk))
+
+    def sort_data(self, column, order='ascending'):
+        """
+        按一列对数据进行排序，column 为None时恢复原始顺序
         :param column: 排序列名
         :param order: 'ascending' 或 'descending'
-        :param apply_immediately: 是否立即应用排序
         """
-        self.sort_column = column
-        self.sort_order = order
-        
-        if apply_immediately and not self.df.empty:
+        self.set_sort([] if column is None else [(column, order == 'ascending')])
+
+    def set_sort(self, keys):
+        """设置排序键，keys 为空时恢复原始顺序
+
+        :param keys: [(列名, 是否升序)]，第一个为主排序键，之后的键用于主键相同的行
+        排序只改变显示顺序：已经计算过的排序结果立即生效，否则在后台计算，
+        生效后发出 sort_changed。加载过程中推迟到加载完成后。
+        """
+        self.sort_keys = [(name, bool(ascending)) for name, ascending in keys]
+        self._start_sort()
+
+    def set_natural_sort(self, enabled):
+        """文本列是否按自然顺序排序（数字部分按数值比较）"""
+        if enabled == self.sorter.natural:
+            return
+        self.sorter.natural = enabled
+        self.sorter.clear()
+        self._start_sort()
+
+    def is_sorting(self):
+        return self.sort_thread is not None
+
+    def _start_sort(self):
+        self._cancel_sort()
+        columns = self.get_columns()
+        keys = tuple((name, ascending) for name, ascending in self.sort_keys if name in columns)
+        if not keys:
+            if self.sort_permutation is not None:
+                self._set_permutation(None)
+            return
+        if self.loading or self.store.empty:
+            return
+        total = self.get_total_rows()
+        permutation = self.sorter.lookup(keys, total)
+        if permutation is not None:
+            self._set_permutation(permutation)
+            return
+        cached = self.sorter.cached_ranks(total)
+        natural = self.sorter.natural
+        chunked = isinstance(self.store, ChunkedStore)
+        if chunked:
+            chunks = list(self.store.iter_chunks())  # 只取数据块的引用，修改时写时复制
+        else:
+            store = self.store
+            names = [name for name, _ in keys if name not in cached]
+
+        def compute(cancelled):
+            if chunked:
+                return compute_permutation(keys, chunks, cached, natural, cancelled)
+            # 延迟加载的数据源在后台逐块解析，只解析还没有名次的排序键列
+            parts = []
+            if names:
+                for start, chunk in store.iter_chunks(columns=names):
+                    if cancelled is not None and cancelled():
+                        return None
+                    parts.append((start, chunk))
+            return compute_permutation(keys, parts, cached, natural, cancelled)
+
+        self._pending_sort = (keys, total, self.sorter.version)
+        if chunked and total <= self.SORT_INLINE_ROWS:  # 小数据量直接排序
             try:
-                ascending = order == 'ascending'
-                if len(self.df) > 100000:  # 大数据量使用线程排序
-                    self.sort_thread = DataSorterThread(self.df, column, ascending)
-                    self.sort_thread.finished.connect(self._on_sort_finished)
-                    self.sort_thread.start()
-                else:  # 小数据量直接排序
-                    self.df.sort_values(by=column, ascending=ascending, inplace=True)
-                    self.df.reset_index(drop=True, inplace=True)
-                    self.sort_changed.emit()
+                result = compute(None)
             except Exception as e:
                 print(f"排序错误: {str(e)}")
+                return
+            self._finish_sort(result)
+            return
+        self.sort_thread = SortThread(compute)
+        self.sort_thread.result_ready.connect(self._on_sort_ready)
+        self.sort_thread.start()
+
+    def _on_sort_ready(self, thread, result):
+        if thread is not self.sort_thread:
+            return
+        thread.wait()
+        self.sort_thread = None
+        if result is not None:
+            self._finish_sort(result)
+
+    def _finish_sort(self, result):
+        keys, total, version = self._pending_sort
+        permutation, ranks = result
+        self.sorter.store(keys, total, version, permutation, ranks)
+        self._set_permutation(permutation)
 
-    def _on_sort_finished(self, sorted_df, error):
-        """排序完成的处理"""
-        if error:
-            print(f"排序错误: {error}")
-        elif sorted_df is not None:
-            self.df = sorted_df
-            self.sort_changed.emit()
+    def _set_permutation(self, permutation):
+        self.sort_permutation = permutation
+        self._apply_sort()
+        self.sort_changed.emit()
+
+    def _cancel_sort(self):
+        thread = self.sort_thread
+        if thread is None:
+            return
+        self.sort_thread = None
+        thread.stop()
+        if thread.isRunning():
+            # 不等待正在计算的列完成，线程结束前保留引用
+            self._retired_threads.append(thread)
+            thread.finished.connect(lambda: self._retired_threads.remove(thread))
+
+    def _apply_sort(self):
+        """按行号排列和筛选结果计算显示顺序"""
+        permutation = self.sort_permutation
+        if permutation is None:
+            self.sort_rows = None
+            return
+        total = self.get_total_rows()
+        if self.view_rows is None:
+            order, tail = permutation, np.arange(len(permutation), total)
+        else:
+            rows = self.view_rows.rows
+            keep = np.zeros(total, dtype=bool)
+            keep[rows] = True
+            order = permutation[keep[permutation]]
+            tail = rows[np.searchsorted(rows, len(permutation)):]
+        self.sort_rows = RowVector(order)
+        self.sort_rows.extend(tail)
+
+    def get_sorted_data(self):
+        """按当前显示顺序（不筛选）获取完整的数据，用于保存"""
+        if self.sort_permutation is None:
+            return self.df
+        rows = np.concatenate([self.sort_permutation,
+                               np.arange(len(self.sort_permutation), self.get_total_rows())])
+        return self.store.take(rows).reset_index(drop=True)
 
     def get_data(self, start=None, end=None):
         """获取指定范围的数据"""
         if start is None or end is None:
             return self.df
-        return self.df.iloc[start:end]
+        return self.store.slice(start, end)
+
+    def get_rows(self, rows):
+        """按数据集行号取若干行（不合并数据块），索引为数据集中的行号"""
+        return self.store.take(rows)
 
     def get_total_rows(self):
         """获取总行数"""
-        return len(self.df)
+        return len(self.store)
+
+    def get_columns(self):
+        """获取列名"""
+        return self.store.columns
+
+    def get_display_formats(self):
+        """原生类型列的显示格式 {列名: DisplayFormat}"""
+        return getattr(self.store, 'display_formats', {})
+
+    def set_cell_value(self, row, col, value):
+        """修改数据集中的一个单元格
+
+        Returns:
+            bool: 该列是否还原为文本
+        """
+        if not hasattr(self.store, 'set_value'):
+            raise ValueError("延迟加载的文件不支持编辑")
+        old_text = self._cell_text(row, col)[1] if self.empty_columns_index is not None else None
+        demoted = self.store.set_value(row, col, value)
+        self.data_version += 1
+        if self.empty_columns_index is not None:
+            self.empty_columns_index.update_cell(col, old_text, self._cell_text(row, col)[1])
+        elif self.empty_columns_thread is not None:
+            self._start_empty_columns()  # 统计开始后数据已被修改，重新统计
+        # 已显示的顺序保持不变，只丢弃这一列的排序缓存
+        self.sorter.invalidate(self.get_columns()[col])
+        if self.highlighter.active or self.text_index is not None:
+            self._update_cell_indexes(row, col)
+        if self.text_index_thread is not None:
+            self._text_index_edits.append((row, col))
+        return demoted
+
+    def set_column_values(self, col, rows, values):
+        """批量修改一列中的若干单元格，每个数据块只复制一次
+
+        Returns:
+            bool: 该列是否还原为文本
+        """
+        if not hasattr(self.store, 'set_values'):
+            raise ValueError("延迟加载的文件不支持编辑")
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return False
+        cols = np.full(len(rows), col, dtype=np.int64)
+        old_texts = self.get_cell_texts(rows, cols) if self.empty_columns_index is not None else None
+        demoted = self.store.set_values(col, rows, values)
+        self.data_version += 1
+        index_texts = (self.empty_columns_index is not None or self.highlighter.active
+                       or self.text_index is not None)
+        new_texts = self.get_cell_texts(rows, cols) if index_texts else None
+        if self.empty_columns_index is not None:
+            for old_text, new_text in zip(old_texts, new_texts):
+                self.empty_columns_index.update_cell(col, old_text, new_text)
+        elif self.empty_columns_thread is not None:
+            self._start_empty_columns()  # 统计开始后数据已被修改，重新统计
+        name = self.get_columns()[col]
+        self.sorter.invalidate(name)
+        if self.highlighter.active or self.text_index is not None:
+            for row, text in zip(rows.tolist(), new_texts):
+                self.highlighter.update_cell(row, col, text)
+                if self.text_index is not None:
+                    self.text_index.update_cell(row, name, text)
+        if self.text_index_thread is not None:
+            self._text_index_edits.extend((row, col) for row in rows.tolist())
+        return demoted
+
+    def _cell_text(self, row, col):
+        """单元格的 (列名, 显示文本)"""
+        series = self.store.slice(row, row + 1).iloc[:, col]
+        return series.name, render_column(series, self.get_display_formats().get(series.name))[0]
+
+    def _update_cell_indexes(self, row, col):
+        """单元格修改后更新高亮索引和文本索引"""
+        name, text = self._cell_text(row, col)
+        self.highlighter.update_cell(row, col, text)
+        if self.text_index is not None:
+            self.text_index.update_cell(row, name, text)
+
+    def set_highlight_keywords(self, keywords):
+        """设置高亮关键词 {关键词: 颜色}，并为整个数据集建立颜色索引"""
+        self.highlighter.set_keywords(keywords)
+        if self.highlighter.active:
+            self.highlighter.rebuild(self.store.iter_chunks(), self.get_display_formats())
+
+    def _rebuild_indexes(self):
+        """数据整体替换或行号变化后重新建立高亮索引、文本索引、筛选结果和排序"""
+        self.data_version += 1
+        if self.highlighter.active:
+            self.highlighter.rebuild(self.store.iter_chunks(), self.get_display_formats())
+        self._text_index_path = None  # 数据已与文件内容不一致
+        self._width_path = None
+        self._width_samples = None
+        self._start_text_index()
+        self._start_empty_columns()
+        self.sorter.clear()
+        self.sort_permutation = None
+        self._refilter_async()
+        self._start_sort()
+
+    def _start_text_index(self):
+        """在后台建立（或从缓存读取）文本索引，加载过程中推迟到加载完成后"""
+        self._cancel_text_index()
+        if (not self.text_index_enabled or self.loading or not isinstance(self.store, ChunkedStore)
+                or self.get_total_rows() < self.TEXT_INDEX_MIN_ROWS):
+            return
+        self._text_index_total = self.get_total_rows()
+        self.text_index_thread = TextIndexThread(list(self.store.iter_chunks()), self.get_display_formats(),
+                                                 self._text_index_path)
+        self.text_index_thread.index_ready.connect(self._on_text_index_ready)
+        self.text_index_thread.start()
+
+    def _on_text_index_ready(self, thread, index):
+        if thread is not self.text_index_thread:
+            return
+        thread.wait()
+        self.text_index_thread = None
+        # 补上建立索引期间追加的行和修改的单元格
+        total = self.get_total_rows()
+        if total > self._text_index_total:
+            index.append(self.store.slice(self._text_index_total, total))
+        self.text_index = index
+        for row, col in self._text_index_edits:
+            self._update_cell_indexes(row, col)
+        self._text_index_edits = []
+
+    def _cancel_text_index(self):
+        self.text_index = None
+        self._text_index_edits = []
+        thread = self.text_index_thread
+        if thread is None:
+            return
+        self.text_index_thread = None
+        thread.stop()
+        if thread.isRunning():
+            # 不等待正在建立的列完成，线程结束前保留引用
+            self._retired_threads.append(thread)
+            thread.finished.connect(lambda: self._retired_threads.remove(thread))
+
+    def get_width_samples(self):
+        """各列用于估计列宽的候选显示文本 {列名: [文本]}
+
+        从均匀抽样的行中按文本长度的百分位选出，按文件和列缓存，重新打开同一文件时
+        直接读取。加载过程中只按已加载的行计算，不缓存。
+        """
+        if self.store.empty:
+            return {}
+        names = [str(name) for name in self.get_columns()]
+        samples = self._width_samples
+        if samples is None:
+            samples = {} if self.loading else (load_width_samples(self._width_path) or {})
+        missing = [name for name in names if name not in samples]
+        if missing:
+            frame = self.store.take(sample_rows(self.get_total_rows()))
+            frame = frame[[name for name in frame.columns if str(name) in missing]]
+            samples = {**samples, **sample_width_candidates(frame, self.get_display_formats())}
+            if not self.loading and self._width_path:
+                save_width_samples(self._width_path, samples)
+        if not self.loading:
+            self._width_samples = samples
+        return {name: samples.get(name, []) for name in names}
+
+    def get_empty_columns(self):
+        """整个数据集中整列空白的列号
+
+        Returns:
+            list: 列号列表，尚未统计完成时返回None（完成后发出 empty_columns_ready）
+        """
+        if self.empty_columns_index is not None:
+            return self.empty_columns_index.empty_columns()
+        if self.empty_columns_thread is None:
+            self._start_empty_columns(force=True)
+        return None
+
+    def _start_empty_columns(self, force=False):
+        """在后台统计各列的非空白单元格数
+
+        :param force: 延迟加载的数据源需要完整解析一遍文件，只在需要时才统计
+        """
+        self._cancel_empty_columns()
+        if self.loading or self.store.empty or not (force or isinstance(self.store, ChunkedStore)):
+            return
+        self._empty_columns_total = self.get_total_rows()
+        chunks = self.store.iter_chunks()
+        if isinstance(self.store, ChunkedStore):
+            chunks = list(chunks)  # 固定当前的数据块，之后追加的行在完成时补上
+        self.empty_columns_thread = EmptyColumnsThread(chunks, self.get_display_formats())
+        self.empty_columns_thread.index_ready.connect(self._on_empty_columns_ready)
+        self.empty_columns_thread.start()
+
+    def _on_empty_columns_ready(self, thread, index):
+        if thread is not self.empty_columns_thread:
+            return
+        thread.wait()
+        self.empty_columns_thread = None
+        # 补上统计期间追加的行
+        total = self.get_total_rows()
+        if total > self._empty_columns_total:
+            index.append(self.store.slice(self._empty_columns_total, total), self.get_display_formats())
+        self.empty_columns_index = index
+        self.empty_columns_ready.emit()
+
+    def _cancel_empty_columns(self):
+        self.empty_columns_index = None
+        thread = self.empty_columns_thread
+        if thread is None:
+            return
+        self.empty_columns_thread = None
+        thread.stop()
+        if thread.isRunning():
+            self._retired_threads.append(thread)
+            thread.finished.connect(lambda: self._retired_threads.remove(thread))
+
+    def get_profile(self):
+        """当前数据的各列统计量
+
+        Returns:
+            list: [(列名, 统计量)]，尚未统计完成时返回None（完成后发出 profile_ready）
+        """
+        if self.store.empty:
+            return []
+        if self.profile is not None and self.profile[0] == self.data_version:
+            return self.profile[1]
+        if self.loading:
+            self._profile_requested = True
+            return None
+        thread = self.profile_thread
+        if thread is None or thread.version != self.data_version:
+            self._start_profile()
+        return None
+
+    def get_sketch_profiles(self):
+        """加载过程中累积的各列估计统计量 [(列名, 统计量)]，没有摘要时返回None"""
+        if self.sketch is None:
+            return None
+        return self.sketch.profiles()
+
+    def _on_chunk_sketched(self, sketch):
+        if self.sketch is None:
+            self.sketch = sketch
+        else:
+            self.sketch.merge(sketch)
+
+    def _start_profile(self):
+        self._cancel_profile()
+        self._profile_requested = False
+        chunks = self.store.iter_chunks()
+        if isinstance(self.store, ChunkedStore):
+            chunks = list(chunks)  # 固定当前的数据块
+        self.profile_thread = ProfileThread((chunk for _, chunk in chunks), self.data_version,
+                                            self.parallel_workers)
+        self.profile_thread.profile_ready.connect(self._on_profile_ready)
+        self.profile_thread.start()
+
+    def _on_profile_ready(self, thread, profiles):
+        if thread is not self.profile_thread:
+            return
+        thread.wait()
+        self.profile_thread = None
+        # 统计期间数据发生了修改时，结果按开始时的版本缓存，下次请求时重新统计
+        self.profile = (thread.version, profiles)
+        self.profile_ready.emit()
+
+    def _cancel_profile(self):
+        thread = self.profile_thread
+        if thread is None:
+            return
+        self.profile_thread = None
+        thread.stop()
+        if thread.isRunning():
+            self._retired_threads.append(thread)
+            thread.finished.connect(lambda: self._retired_threads.remove(thread))
+
+    def _attach_text_index(self, predicates):
+        """让筛选条件使用当前的文本索引"""
+        for predicate in predicates:
+            matcher = getattr(predicate, 'matcher', None)
+            if matcher is not None:
+                matcher.attach(self.text_index)
+
+    def _refilter(self):
+        self._cancel_filter()
+        self._view_filters = dict(self.filters)
+        if not self.filters:
+            self.view_rows = None
+        else:
+            self._attach_text_index(self.filters.values())
+            self.view_rows = evaluate_filters(self.filters.values(), self.store.iter_chunks(),
+                                              self.get_display_formats())
+        self._apply_sort()
+
+    def _update_filters(self, key, predicate):
+        if predicate is None:
+            self.filters.pop(key, None)
+        else:
+            self.filters[key] = predicate
+
+    def _narrow_base(self, key, predicate):
+        """新条件只会缩小当前结果时（如搜索词在原来的基础上继续输入），返回只需检查的行号
+
+        Returns:
+            numpy.ndarray: 当前结果的行号，需要重新筛选整个数据集时返回None
+        """
+        previous = self._view_filters.get(key)
+        if self.view_rows is None or predicate is None or previous is None:
+            return None
+        others = {k: v for k, v in self.filters.items() if k != key}
+        if others != {k: v for k, v in self._view_filters.items() if k != key}:
+            return None
+        if not predicate.narrows(previous):
+            return None
+        return self.view_rows.rows.copy()
+
+    def set_filter(self, key, predicate):
+        """设置或移除（predicate 为 None）一个筛选条件，并对整个数据集重新筛选
+
+        Returns:
+            int: 满足所有条件的行数
+        """
+        self._update_filters(key, predicate)
+        rows = self._narrow_base(key, predicate)
+        if rows is None:
+            self._refilter()
+        else:
+            self._cancel_filter()
+            self._attach_text_index([predicate])
+            self.view_rows = narrow_rows([predicate], rows, self.store.take, self.get_display_formats())
+            self._view_filters = dict(self.filters)
+            self._apply_sort()
+        return self.get_view_row_count()
+
+    def set_filter_async(self, key, predicate):
+        """在后台设置筛选条件，完成后发出 filter_finished
+
+        新的调用会中止尚未完成的筛选；新条件只会缩小当前结果时只检查当前结果中的行。
+        """
+        self._update_filters(key, predicate)
+        rows = self._narrow_base(key, predicate)
+        self._cancel_filter()
+        if not self.filters:
+            self._refilter()
+            self.filter_finished.emit(self.get_view_row_count())
+            return
+        self._attach_text_index(self.filters.values())
+        if rows is None:
+            evaluate = self._evaluate_all()
+        else:
+            take = self.store.take
+            formats = self.get_display_formats()
+
+            def evaluate(cancelled):
+                return narrow_rows([predicate], rows, take, formats, cancelled)
+        self._start_filter(evaluate)
+
+    def _refilter_async(self):
+        """数据整体替换后在后台重新筛选，完成后发出 filter_finished"""
+        self._cancel_filter()
+        if not self.filters:
+            self._refilter()
+            return
+        # 原来的行号已经失效，筛选完成前不显示任何行
+        self.view_rows = RowVector()
+        self._view_filters = {}
+        self._apply_sort()
+        self._attach_text_index(self.filters.values())
+        self._start_filter(self._evaluate_all())
+
+    def _evaluate_all(self):
+        """对整个数据集按当前所有条件筛选的后台任务"""
+        chunks = self.store.iter_chunks()
+        if isinstance(self.store, ChunkedStore):
+            chunks = list(chunks)  # 固定当前的数据块，之后追加的行在完成时补上
+        predicates = list(self.filters.values())
+        formats = self.get_display_formats()
+
+        def evaluate(cancelled):
+            return evaluate_filters(predicates, chunks, formats, cancelled)
+        return evaluate
+
+    def _start_filter(self, evaluate):
+        """启动后台筛选，完成后由 _on_filter_ready 应用结果"""
+        self._pending_filters = dict(self.filters)
+        self._pending_total = self.get_total_rows()
+        self.filter_thread = FilterThread(evaluate)
+        self.filter_thread.result_ready.connect(self._on_filter_ready)
+        self.filter_thread.start()
+
+    def _on_filter_ready(self, thread, result):
+        if thread is not self.filter_thread:
+            return  # 已被新的筛选取代
+        thread.wait()
+        self.filter_thread = None
+        if result is not None:
+            total = self.get_total_rows()
+            if total > self._pending_total:
+                # 筛选期间追加的行
+                added = self.store.slice(self._pending_total, total)
+                matched = filter_mask(self._pending_filters.values(), added, self.get_display_formats())
+                result.extend(np.flatnonzero(matched) + self._pending_total)
+            self.view_rows = result
+            self._view_filters = self._pending_filters
+            self._apply_sort()
+        self.filter_finished.emit(self.get_view_row_count())
+
+    def _cancel_filter(self):
+        if self.filter_thread is not None:
+            self.filter_thread.stop()
+            self.filter_thread.wait()
+            self.filter_thread = None
+
+    def clear_filters(self):
+        self._cancel_filter()
+        self.filters = {}
+        self._view_filters = {}
+        self.view_rows = None
+        self._apply_sort()
+
+    def search(self, text, regex=False):
+        """在后台搜索显示文本匹配的单元格（不区分大小写），中止尚未完成的搜索
+
+        结果通过 search_results 分批发出，完成后发出 search_finished。
+        无效的正则表达式会抛出 re.error。
+        """
+        self.cancel_search()
+        matcher = TextMatcher(text, regex)
+        matcher.attach(self.text_index)
+        chunks = self.store.iter_chunks()
+        if isinstance(self.store, ChunkedStore):
+            chunks = list(chunks)
+        self.search_thread = SearchThread(matcher, chunks, self.get_total_rows(), self.get_display_formats())
+        self.search_thread.results_found.connect(self._on_search_results)
+        self.search_thread.progress.connect(self._on_search_progress)
+        self.search_thread.search_finished.connect(self._on_search_finished)
+        self.search_thread.start()
+
+    def _on_search_results(self, thread, batch):
+        if thread is self.search_thread:
+            self.search_results.emit(batch)
+
+    def _on_search_progress(self, thread, percent):
+        if thread is self.search_thread:
+            self.search_progress.emit(percent)
+
+    def _on_search_finished(self, thread, found):
+        if thread is not self.search_thread:
+            return
+        thread.wait()
+        self.search_thread = None
+        self.search_finished.emit(found)
+
+    def is_searching(self):
+        return self.search_thread is not None
+
+    def cancel_search(self):
+        """中止正在进行的全局搜索，已经发出的结果保留"""
+        if self.search_thread is not None:
+            self.search_thread.stop()
+            self.search_thread.wait()
+            self.search_thread = None
+
+    def get_cell_texts(self, rows, cols):
+        """若干单元格的显示文本（已不存在的行为空字符串）"""
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        texts = np.full(len(rows), '', dtype=object)
+        valid = (rows < self.get_total_rows()) & (cols < len(self.get_columns()))
+        if not valid.any():
+            return texts
+        unique_rows, positions = np.unique(rows[valid], return_inverse=True)
+        frame = self.store.take(unique_rows)
+        formats = self.get_display_formats()
+        valid_cols = cols[valid]
+        valid_texts = np.empty(len(valid_cols), dtype=object)
+        for col in np.unique(valid_cols):
+            mask = valid_cols == col
+            series = frame.iloc[positions[mask], col]
+            valid_texts[mask] = render_column(series, formats.get(series.name))
+        texts[valid] = valid_texts
+        return texts
+
+    def _view_order(self):
+        """按显示顺序排列的行号（RowVector），未排序也未筛选时为None"""
+        return self.sort_rows if self.sort_rows is not None else self.view_rows
+
+    def get_view_row_count(self):
+        """筛选后的行数"""
+        order = self._view_order()
+        if order is None:
+            return self.get_total_rows()
+        return len(order)
+
+    def get_view_data(self, start, end):
+        """获取显示顺序（排序、筛选后）中 [start, end) 位置的行，索引为数据集中的行号"""
+        order = self._view_order()
+        if order is None:
+            return self.store.slice(start, end)
+        return self.store.take(order.rows[start:end])
+
+    def view_to_row(self, position):
+        """显示顺序中的位置对应的数据集行号"""
+        order = self._view_order()
+        if order is None:
+            return position
+        return int(order.rows[position])
+
+    def row_to_view(self, row):
+        """数据集行号在显示顺序中的位置，不在筛选结果中时返回-1"""
+        if self.sort_rows is not None:
+            positions = np.flatnonzero(self.sort_rows.rows == row)
+            return int(positions[0]) if len(positions) else -1
+        if self.view_rows is None:
+            return row if row < self.get_total_rows() else -1
+        rows = self.view_rows.rows
+        position = int(np.searchsorted(rows, row))
+        if position < len(rows) and rows[position] == row:
+            return position
+        return -1
+
+    def iter_chunks(self):
+        """按顺序遍历数据块，返回 (起始行, 数据块)"""
+        return self.store.iter_chunks()
 
-    def create_sorter_thread(self, column_name: str, ascending: bool = True) -> 'DataSorterThread':
-        """创建排序线程"""
-        return DataSorterThread(self.df, column_name, ascending)
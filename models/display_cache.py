@@ -0,0 +1,110 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+BLOCK_ROWS = 256   # 每个缓存块包含的行数
+MAX_BLOCKS = 1024  # 最多缓存的 (行块, 列) 数量，超过后淘汰最久未使用的块
+
+
+def render_column(series, fmt=None):
+    """把一列整体渲染为显示字符串数组，缺失值为空字符串"""
+    if fmt is not None:
+        return fmt.render(series)
+    text = series.astype(str).to_numpy(dtype=object)
+    mask = series.isna().to_numpy()
+    if mask.any():
+        text[mask] = ''
+    return text
+
+
+def map_column_text(series, fmt, func, missing):
+    """对一列的小写显示文本做向量化计算，重复的值只渲染和计算一次
+
+    :param func: 小写文本 Series -> 等长的 numpy 数组
+    :param missing: 缺失值对应的结果
+    """
+    codes, uniques = pd.factorize(series)
+    texts = pd.Series(render_column(pd.Series(uniques), fmt)).str.lower()
+    # 缺失值的编号为 -1，对应末尾追加的 missing
+    lookup = func(texts)
+    lookup = np.append(lookup, np.array([missing], dtype=lookup.dtype))
+    return lookup[codes]
+
+
+class DisplayCache:
+    """表格显示字符串的分块缓存
+
+    以 (行块, 列) 为单位一次渲染一整块字符串，单元格取值只需一次数组索引。
+    缓存块数有上限，无论滚动多远内存占用都保持不变。
+    """
+
+    def __init__(self, fetch_rows, max_blocks=MAX_BLOCKS):
+        """
+        :param fetch_rows: 读取 [start, end) 行的函数，返回 DataFrame
+        """
+        self.fetch_rows = fetch_rows
+        self.max_blocks = max_blocks
+        self.formats = {}  # {列号: DisplayFormat}
+        self._blocks = OrderedDict()
+        self._frame_block = None
+        self._frame = None
+
+    def clear(self):
+        self._blocks.clear()
+        self._frame_block = None
+        self._frame = None
+
+    def invalidate_rows(self, start, end):
+        """丢弃与 [start, end) 行有交集的块"""
+        first = start // BLOCK_ROWS
+        last = (max(end, start + 1) - 1) // BLOCK_ROWS
+        for key in [key for key in self._blocks if first <= key[0] <= last]:
+            del self._blocks[key]
+        if self._frame_block is not None and first <= self._frame_block <= last:
+            self._frame_block = None
+            self._frame = None
+
+    def invalidate_column(self, col):
+        for key in [key for key in self._blocks if key[1] == col]:
+            del self._blocks[key]
+        self._frame_block = None
+        self._frame = None
+
+    def _block_frame(self, block):
+        """读取一个行块的所有列，同一行块的其他列渲染时复用"""
+        if self._frame_block != block:
+            start = block * BLOCK_ROWS
+            self._frame = self.fetch_rows(start, start + BLOCK_ROWS)
+            self._frame_block = block
+        return self._frame
+
+    def block(self, block, col):
+        """获取一个 (行块, 列) 的字符串数组，不存在时渲染并缓存"""
+        key = (block, col)
+        values = self._blocks.get(key)
+        if values is not None:
+            self._blocks.move_to_end(key)
+            return values
+        frame = self._block_frame(block)
+        values = render_column(frame.iloc[:, col], self.formats.get(col))
+        self._blocks[key] = values
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return values
+
+    def missing_blocks(self, start, end, cols):
+        """[start, end) 行在这些列中尚未渲染的 (行块, 列)"""
+        first = start // BLOCK_ROWS
+        last = (max(end, start + 1) - 1) // BLOCK_ROWS
+        return [(block, col) for block in range(first, last + 1) for col in cols
+                if (block, col) not in self._blocks]
+
+    def get(self, row, col):
+        """单元格的显示字符串"""
+        block, offset = divmod(row, BLOCK_ROWS)
+        values = self.block(block, col)
+        if offset >= len(values):
+            # 块是在追加新行之前渲染的
+            self.invalidate_rows(row, row + 1)
+            values = self.block(block, col)
+        return values[offset]
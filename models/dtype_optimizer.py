@@ -0,0 +1,255 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer_dtype, is_object_dtype
+from lovelyform.models.type_inference import get_display_formats, demote_column
+
+
+MAX_CATEGORIES = 1 << 16  # 分类列的类别数上限
+
+
+def is_categorical(series):
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def is_text_column(series):
+    """字符串列（object 或分类编码的字符串）"""
+    return is_object_dtype(series.dtype) or is_categorical(series)
+
+
+def _all_str(values):
+    return all(isinstance(v, str) for v in values)
+
+
+class DtypeOptimizer:
+    """加载时的数据类型优化
+
+    逐块处理：整数列向下转换为最小的整数类型，低基数的字符串列转换为分类编码。
+    分类列的类别始终按字典序排列，排序结果与原字符串列一致；浮点列保持不变，
+    保证显示内容完全相同。候选的分类列由第一个非空数据块挑选，之后每个数据块
+    增量合并已出现的类别，累计的类别数超过行数的 max_category_ratio 或 max_categories
+    时，该列之后的数据块保持为 object 列。
+    """
+
+    def __init__(self, max_category_ratio=0.5, max_categories=MAX_CATEGORIES):
+        self.max_category_ratio = max_category_ratio
+        self.max_categories = max_categories
+        self.categories = None  # {列名: 已出现的类别（已排序的 Index）}，处理第一个数据块前为None
+        self.rows = 0
+        self.report = {}  # 列名 -> 节省的字节数
+
+    def optimize(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """优化一个数据块的列类型"""
+        if len(chunk) == 0:
+            return chunk
+        if self.categories is None:
+            self.categories = {name: pd.Index([], dtype=object) for name in self._choose_categorical(chunk)}
+        self.rows += len(chunk)
+
+        converted = {}
+        for name in chunk.columns:
+            series = chunk[name]
+            if name in self.categories:
+                if is_categorical(series):
+                    continue
+                new = self._to_categorical(series)
+                if new is None:
+                    continue
+            elif is_integer_dtype(series.dtype):
+                new = pd.to_numeric(series, downcast='integer')
+            else:
+                continue
+            if new.dtype == series.dtype:
+                continue
+            saved = series.memory_usage(index=False, deep=True) - new.memory_usage(index=False, deep=True)
+            self.report[name] = self.report.get(name, 0) + int(saved)
+            converted[name] = new
+
+        if not converted:
+            return chunk
+        chunk = chunk.copy(deep=False)
+        for name, new in converted.items():
+            chunk[name] = new
+        return chunk
+
+    def _choose_categorical(self, chunk):
+        """根据第一个数据块挑选适合分类编码的字符串列"""
+        columns = set()
+        for name in chunk.columns:
+            series = chunk[name]
+            if not is_object_dtype(series.dtype):
+                continue
+            uniques = series.dropna().unique()
+            if len(uniques) == 0 or not _all_str(uniques):
+                continue
+            if len(uniques) <= len(series) * self.max_category_ratio:
+                columns.add(name)
+        return columns
+
+    def _to_categorical(self, series):
+        """按累计的类别转换为分类列，类别数超出限制时返回None，该列不再转换"""
+        values = series
+        uniques = series.dropna().unique()
+        if not _all_str(uniques):
+            # 后续数据块中同一列被解析成了数字，统一转换为字符串（显示内容不变）
+            values = series.where(series.isna(), series.astype(str))
+            uniques = values.dropna().unique()
+        known = self.categories[series.name]
+        added = pd.Index(uniques, dtype=object)
+        added = added[~added.isin(known)]
+        total = len(known) + len(added)
+        if total > self.rows * self.max_category_ratio or total > self.max_categories:
+            del self.categories[series.name]
+            return None
+        if len(added):
+            # 已有类别已排序，只排序新出现的类别再归并
+            known = known.union(added.sort_values()) if len(known) else added.sort_values()
+            self.categories[series.name] = known
+        return pd.Series(pd.Categorical(values, categories=known),
+                         index=series.index, name=series.name)
+
+    def merge(self, other, rows):
+        """合并在工作进程中处理了 rows 行后的状态：节省的字节数、累计的类别和不再转换的列"""
+        for name, saved in other.report.items():
+            self.report[name] = self.report.get(name, 0) + saved
+        self.rows += rows
+        if self.categories is None:
+            return
+        for name in list(self.categories):
+            theirs = other.categories.get(name)
+            if theirs is None:
+                del self.categories[name]
+                continue
+            known = self.categories[name]
+            if not theirs.isin(known).all():
+                known = known.union(theirs)
+            if len(known) > self.rows * self.max_category_ratio or len(known) > self.max_categories:
+                del self.categories[name]
+            else:
+                self.categories[name] = known
+
+    @property
+    def saved_bytes(self):
+        return sum(self.report.values())
+
+
+def unify_categories(chunks):
+    """统一各数据块中分类列的类别，避免拼接后退化为object列
+
+    加载时各数据块的类别是逐块累加的，最后一块的类别通常已包含其他各块的类别，
+    只有不被包含的类别才归并进来，不再对全部类别重新排序。
+    """
+    if len(chunks) < 2:
+        return chunks
+    unify = {}
+    for name in chunks[0].columns:
+        series_list = [chunk[name] for chunk in chunks]
+        if not all(is_categorical(s) for s in series_list):
+            continue
+        first = series_list[0].cat.categories
+        if all(s.cat.categories.equals(first) for s in series_list[1:]):
+            continue
+        categories = max((s.cat.categories for s in series_list), key=len)
+        for s in series_list:
+            other = s.cat.categories
+            if other is not categories and not other.isin(categories).all():
+                categories = categories.union(other)
+        unify[name] = categories
+    if not unify:
+        return chunks
+
+    result = []
+    for chunk in chunks:
+        chunk = chunk.copy(deep=False)
+        for name, categories in unify.items():
+            chunk[name] = chunk[name].cat.set_categories(categories)
+        result.append(chunk)
+    return result
+
+
+def prepare_assignment(df, col, value):
+    """写入单元格前确保该列的类型能容纳新值
+
+    原生类型列（十六进制地址、时间等）把文本解析为原生值，无法解析时该列还原为文本；
+    分类列补充新类别（保持字典序），向下转换过的整数列恢复为 int64。
+
+    Returns:
+        实际写入的值
+    """
+    series = df.iloc[:, col]
+    fmt = get_display_formats(df).get(df.columns[col])
+    if fmt is not None:
+        if pd.isna(value) or value == '':
+            if isinstance(series.dtype, np.dtype) and is_integer_dtype(series.dtype):
+                # 整数列改为可空类型以容纳缺失值
+                df.isetitem(col, series.astype('UInt64' if series.dtype.kind == 'u' else 'Int64'))
+            return None
+        try:
+            native = fmt.parse(value)
+            if fmt.render_value(native) == str(value):
+                if is_integer_dtype(series.dtype) and series.dtype.itemsize < 8:
+                    df.isetitem(col, series.astype('int64'))
+                return native
+        except (ValueError, TypeError, OverflowError):
+            pass
+        demote_column(df, col)
+        return value
+    if is_categorical(series):
+        categories = series.cat.categories
+        if pd.isna(value) or value in categories:
+            return value
+        try:
+            df.isetitem(col, series.cat.set_categories(sorted(list(categories) + [value])))
+        except TypeError:
+            df.isetitem(col, series.astype(object))
+    elif is_integer_dtype(series.dtype) and series.dtype.itemsize < 8:
+        df.isetitem(col, series.astype('int64'))
+    return value
+
+
+def prepare_column_assignment(df, col, values):
+    """批量写入一列中的若干单元格前确保该列的类型能容纳新值，规则与 prepare_assignment 相同
+
+    :param values: 新值数组，原生类型列（有显示格式）为显示文本
+    Returns:
+        实际写入的值数组
+    """
+    series = df.iloc[:, col]
+    values = np.asarray(values, dtype=object)
+    fmt = get_display_formats(df).get(df.columns[col])
+    if fmt is not None:
+        missing = pd.isna(values) | (values == '')
+        try:
+            natives = np.empty(len(values), dtype=object)
+            for text in pd.unique(values[~missing]):
+                native = fmt.parse(text)
+                if fmt.render_value(native) != str(text):
+                    raise ValueError(text)
+                natives[values == text] = native
+            natives[missing] = None
+            if missing.any() and isinstance(series.dtype, np.dtype) and is_integer_dtype(series.dtype):
+                df.isetitem(col, series.astype('UInt64' if series.dtype.kind == 'u' else 'Int64'))
+            elif is_integer_dtype(series.dtype) and series.dtype.itemsize < 8:
+                df.isetitem(col, series.astype('int64'))
+            return pd.array(natives, dtype=df.iloc[:, col].dtype)
+        except (ValueError, TypeError, OverflowError):
+            pass
+        demote_column(df, col)
+        return values
+    if is_categorical(series):
+        categories = series.cat.categories
+        added = pd.Index(pd.unique(values[~pd.isna(values)])).difference(categories, sort=False)
+        if len(added):
+            try:
+                df.isetitem(col, series.cat.set_categories(categories.union(added)))
+            except TypeError:
+                df.isetitem(col, series.astype(object))
+    elif not is_object_dtype(series.dtype):
+        if is_integer_dtype(series.dtype) and series.dtype.itemsize < 8:
+            series = series.astype('int64')
+            df.isetitem(col, series)
+        try:
+            return pd.array(values, dtype=series.dtype)
+        except (ValueError, TypeError, OverflowError):
+            # 原列不能容纳新值（如数值列写入文本）时还原为 object 列
+            df.isetitem(col, series.astype(object))
+    return values
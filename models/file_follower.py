@@ -0,0 +1,68 @@
+import io
+import mmap
+import os
+import pandas as pd
+from lovelyform.models.csv_index import scan_record_starts, SCAN_BLOCK_SIZE
+
+MAX_READ_BYTES = 16 * 1024 * 1024  # 每次轮询最多解析的字节数
+
+
+class FileTruncatedError(Exception):
+    """被跟踪的文件变小（被截断或重新写入）"""
+
+
+def last_record_end(file_path, end):
+    """返回 [0, end) 中最后一条完整记录的结束偏移（引号外最后一个换行符之后）"""
+    if end <= 0:
+        return 0
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        end = min(end, len(buf))
+        last = 0
+        in_quotes = False
+        pos = 0
+        while pos < end:
+            block_end = min(pos + SCAN_BLOCK_SIZE, end)
+            starts, in_quotes = scan_record_starts(buf, pos, block_end, in_quotes)
+            if len(starts):
+                last = int(starts[-1])
+            pos = block_end
+        return last
+
+
+class FileFollower:
+    """跟踪仍在写入的CSV文件
+
+    记录已解析到的字节偏移（总是位于完整记录的末尾），每次轮询只读取并解析
+    之后新增的完整记录，末尾尚未写完的记录留到下一次。
+    """
+
+    def __init__(self, file_path, columns, offset, read_options=None):
+        self.file_path = file_path
+        self.columns = list(columns)
+        self.offset = offset
+        self.read_options = dict(read_options or {})
+
+    def poll(self):
+        """解析新增的完整记录，没有新数据时返回None
+
+        Raises:
+            FileTruncatedError: 文件比已解析的部分还小
+        """
+        size = os.path.getsize(self.file_path)
+        if size < self.offset:
+            raise FileTruncatedError(self.file_path)
+        if size == self.offset:
+            return None
+
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(min(size - self.offset, MAX_READ_BYTES))
+        # offset 处是记录起点，不在引号内
+        starts, _ = scan_record_starts(data, 0, len(data), False)
+        if len(starts) == 0:
+            return None
+        end = int(starts[-1])
+        self.offset += end
+        if not data[:end].strip():
+            return None
+        return pd.read_csv(io.BytesIO(data[:end]), header=None, names=self.columns, **self.read_options)
@@ -0,0 +1,223 @@
+import re
+import numpy as np
+import pandas as pd
+from lovelyform.models.display_cache import map_column_text
+
+RANGE_SEPARATOR = '..'
+TAKE_BATCH = 65536  # 每批计算的行数
+
+
+class TextMatcher:
+    """不区分大小写的文本匹配，regex 为 True 时按正则表达式匹配"""
+
+    def __init__(self, text, regex=False):
+        self.text = text
+        self.regex = regex
+        self.keyword = text.lower()
+        if regex:
+            re.compile(text)  # 提前报告无效的正则表达式（re.error）
+        self.attach(None)
+
+    def attach(self, index):
+        """使用文本索引（TextIndex）查找文本列中匹配的行，None 表示逐块扫描"""
+        self.index = index
+        self._row_hits = {}  # {列名: 整个数据集中匹配的行（布尔数组），没有索引时为None}
+
+    def _indexed_hits(self, name, rows):
+        """由文本索引得到 rows 位置的匹配结果，索引不覆盖这些行时返回None"""
+        if self.index is None or rows is None:
+            return None
+        if name not in self._row_hits:
+            self._row_hits[name] = self.index.match(name, self)
+        hits = self._row_hits[name]
+        if hits is None:
+            return None
+        if isinstance(rows, slice):
+            covered = rows.stop <= len(hits)
+        else:
+            covered = len(rows) == 0 or rows.max() < len(hits)
+        return hits[rows] if covered else None
+
+    def __call__(self, lowered: pd.Series) -> np.ndarray:
+        if self.regex:
+            hits = lowered.str.contains(self.text, flags=re.IGNORECASE, regex=True, na=False)
+        else:
+            hits = lowered.str.contains(self.keyword, regex=False, na=False)
+        return hits.to_numpy(dtype=bool)
+
+    def column_mask(self, series, fmt=None, rows=None) -> np.ndarray:
+        """一列中显示文本匹配的单元格
+
+        :param rows: 这些单元格在数据集中的行（切片或行号数组），用于查询文本索引
+        """
+        # 显示文本不可能包含关键词的原生类型列（如十六进制地址中的字母）不必还原文本
+        if not self.regex and fmt is not None and not fmt.may_contain(self.keyword):
+            return np.zeros(len(series), dtype=bool)
+        hits = self._indexed_hits(series.name, rows)
+        if hits is not None:
+            return hits
+        return map_column_text(series, fmt, self, False)
+
+
+class ContainsFilter:
+    """显示文本包含关键词（不区分大小写），column 为 None 时任意一列包含即可"""
+
+    def __init__(self, text, column=None):
+        self.text = text
+        self.column = column
+        self.matcher = TextMatcher(text)
+
+    def evaluate(self, chunk: pd.DataFrame, formats, rows=None) -> np.ndarray:
+        if self.column is not None:
+            if self.column not in chunk.columns:
+                return np.zeros(len(chunk), dtype=bool)
+            return self.matcher.column_mask(chunk[self.column], formats.get(self.column), rows)
+        mask = np.zeros(len(chunk), dtype=bool)
+        for col, name in enumerate(chunk.columns):
+            mask |= self.matcher.column_mask(chunk.iloc[:, col], formats.get(name), rows)
+        return mask
+
+    def narrows(self, previous):
+        """本条件命中的行是否一定也被 previous 命中（关键词在原关键词基础上扩展）"""
+        return (isinstance(previous, ContainsFilter) and previous.column == self.column
+                and previous.text.lower() in self.text.lower())
+
+
+class RangeFilter:
+    """列值位于 [low, high] 之间（任意一端可以为空）
+
+    原生类型列（十六进制地址、时间等）把边界按列的显示格式解析后比较原生值，
+    其他列按数值比较。
+    """
+
+    def __init__(self, column, low, high, fmt=None):
+        self.column = column
+        self.low = self._parse(low, fmt)
+        self.high = self._parse(high, fmt)
+
+    @staticmethod
+    def _parse(text, fmt):
+        text = text.strip()
+        if not text:
+            return None
+        try:
+            return fmt.parse(text) if fmt is not None else float(text)
+        except (ValueError, TypeError, OverflowError):
+            raise ValueError(f"无法解析范围边界: {text}")
+
+    def narrows(self, previous):
+        return False
+
+    def evaluate(self, chunk: pd.DataFrame, formats, rows=None) -> np.ndarray:
+        if self.column not in chunk.columns:
+            return np.zeros(len(chunk), dtype=bool)
+        values = chunk[self.column]
+        if self.column not in formats:
+            values = pd.to_numeric(values, errors='coerce')
+        mask = values.notna()
+        if self.low is not None:
+            mask &= values >= self.low
+        if self.high is not None:
+            mask &= values <= self.high
+        return mask.to_numpy(dtype=bool, na_value=False)
+
+
+def parse_filter(text, column=None, fmt=None):
+    """根据输入创建筛选条件：指定列且包含 '..' 时为范围筛选，否则为包含筛选"""
+    if column is not None and RANGE_SEPARATOR in text:
+        low, high = text.split(RANGE_SEPARATOR, 1)
+        return RangeFilter(column, low, high, fmt)
+    return ContainsFilter(text, column)
+
+
+def filter_mask(filters, chunk, formats, rows=None):
+    """一个数据块中满足所有筛选条件的行
+
+    :param rows: 数据块在数据集中的行（切片或行号数组）
+    """
+    mask = np.ones(len(chunk), dtype=bool)
+    for predicate in filters:
+        mask &= predicate.evaluate(chunk, formats, rows)
+    return mask
+
+
+class RowVector:
+    """可追加的行号数组，按倍数扩容"""
+
+    def __init__(self, rows=None):
+        self._data = np.empty(0, dtype=np.int64)
+        self._size = 0
+        if rows is not None:
+            self.extend(rows)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def rows(self):
+        return self._data[:self._size]
+
+    def extend(self, rows):
+        end = self._size + len(rows)
+        if end > len(self._data):
+            grown = np.empty(max(end, len(self._data) * 2, 1024), dtype=np.int64)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:end] = rows
+        self._size = end
+
+
+def evaluate_filters(filters, chunks, formats, cancelled=None):
+    """逐块计算满足所有筛选条件的行号
+
+    :param chunks: (起始行, 数据块) 的迭代
+    :param cancelled: 每块之前检查的回调，返回True时中止并返回None
+    """
+    result = RowVector()
+    for start, chunk in chunks:
+        # 大数据块分批计算，以便及时响应中止
+        for begin in range(0, len(chunk), TAKE_BATCH):
+            if cancelled is not None and cancelled():
+                return None
+            part = chunk.iloc[begin:begin + TAKE_BATCH]
+            first = start + begin
+            mask = filter_mask(filters, part, formats, slice(first, first + len(part)))
+            result.extend(np.flatnonzero(mask) + first)
+    return result
+
+
+def narrow_rows(filters, rows, take, formats, cancelled=None):
+    """只在给定的行中计算满足筛选条件的行号
+
+    :param rows: 候选行号数组（递增）
+    :param take: 按行号数组取行的函数
+    """
+    result = RowVector()
+    for begin in range(0, len(rows), TAKE_BATCH):
+        if cancelled is not None and cancelled():
+            return None
+        batch = rows[begin:begin + TAKE_BATCH]
+        result.extend(batch[filter_mask(filters, take(batch), formats, batch)])
+    return result
+
+
+def search_cells(matcher, chunk, start, formats):
+    """搜索一个数据块中显示文本匹配的单元格，按行、列顺序排列
+
+    Returns:
+        tuple: (行号数组, 列号数组)
+    """
+    rows, cols = [], []
+    positions = slice(start, start + len(chunk))
+    for col, name in enumerate(chunk.columns):
+        series = chunk.iloc[:, col]
+        hits = np.flatnonzero(matcher.column_mask(series, formats.get(name), positions))
+        if len(hits):
+            rows.append(hits + start)
+            cols.append(np.full(len(hits), col, dtype=np.int64))
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    order = np.lexsort((cols, rows))
+    return rows[order], cols[order]
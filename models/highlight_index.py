@@ -0,0 +1,102 @@
+import re
+import numpy as np
+import pandas as pd
+from lovelyform.models.display_cache import map_column_text
+
+MIN_CAPACITY = 1024
+
+
+class HighlightIndex:
+    """关键词高亮的单元格颜色索引
+
+    为每个单元格记录第一个命中的关键词编号（0 表示不高亮），按列保存为紧凑的整数数组，
+    没有任何命中的列不分配数组。匹配规则与表格显示一致：对显示文本做不区分大小写的子串匹配，
+    按关键词顺序取第一个命中的颜色。
+    """
+
+    def __init__(self):
+        self.set_keywords({})
+
+    @property
+    def active(self):
+        return bool(self.keywords)
+
+    def set_keywords(self, keywords):
+        """设置 {关键词: 颜色}，已有的索引需要重新建立"""
+        self.keywords = [(keyword.lower(), color) for keyword, color in keywords.items() if keyword]
+        self.colors = [None] + [color for _, color in self.keywords]
+        self.dtype = np.uint8 if len(self.keywords) < 256 else np.uint16
+        # 先用一个合并的正则表达式找出候选单元格，再用前瞻匹配找出候选单元格中
+        # 每个位置上排在最前的关键词，其中编号最小的即为第一个命中的关键词
+        self._pattern = '|'.join(re.escape(keyword) for keyword, _ in self.keywords)
+        self._finder = re.compile(f'(?=({self._pattern}))')
+        self._numbers = {}
+        for number, (keyword, _) in enumerate(self.keywords, 1):
+            self._numbers.setdefault(keyword, number)
+        self.reset()
+
+    def reset(self):
+        """清空索引，保留关键词"""
+        self._columns = {}  # {列号: 关键词编号数组，容量可能大于行数}
+        self._rows = 0
+
+    def clear(self):
+        self.set_keywords({})
+
+    def _match(self, lowered: pd.Series) -> np.ndarray:
+        """计算每个文本第一个命中的关键词编号"""
+        codes = np.zeros(len(lowered), dtype=self.dtype)
+        hit = lowered.str.contains(self._pattern, regex=True, na=False).to_numpy(dtype=bool)
+        if not hit.any():
+            return codes
+        numbers = self._numbers
+        codes[hit] = [min(numbers[match] for match in matches)
+                      for matches in lowered[hit].str.findall(self._finder)]
+        return codes
+
+    def _ensure(self, col, size):
+        """确保该列的数组能容纳 size 行，按倍数扩容"""
+        codes = self._columns.get(col)
+        if codes is None:
+            codes = np.zeros(max(size, MIN_CAPACITY), dtype=self.dtype)
+            self._columns[col] = codes
+        elif len(codes) < size:
+            grown = np.zeros(max(size, len(codes) * 2), dtype=self.dtype)
+            grown[:len(codes)] = codes
+            codes = self._columns[col] = grown
+        return codes
+
+    def append(self, frame: pd.DataFrame, formats=None):
+        """追加一批行（必须紧接在已建立索引的行之后）"""
+        if not self.active:
+            return
+        formats = formats or {}
+        start, end = self._rows, self._rows + len(frame)
+        for col, name in enumerate(frame.columns):
+            codes = map_column_text(frame.iloc[:, col], formats.get(name), self._match, 0)
+            if codes.any() or col in self._columns:
+                self._ensure(col, end)[start:end] = codes
+        self._rows = end
+
+    def rebuild(self, chunks, formats=None):
+        """按 (起始行, 数据块) 的顺序重新建立整个索引"""
+        self.reset()
+        if not self.active:
+            return
+        for _, chunk in chunks:
+            self.append(chunk, formats)
+
+    def update_cell(self, row, col, text):
+        """单元格被修改后更新其关键词编号"""
+        if not self.active or row >= self._rows:
+            return
+        code = self._match(pd.Series([str(text).lower()]))[0]
+        if code or col in self._columns:
+            self._ensure(col, self._rows)[row] = code
+
+    def color(self, row, col):
+        """单元格的高亮颜色，没有命中时返回None"""
+        codes = self._columns.get(col)
+        if codes is None or row >= self._rows:
+            return None
+        return self.colors[codes[row]]
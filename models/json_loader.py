@@ -0,0 +1,217 @@
+import io
+import json
+import pandas as pd
+from lovelyform.models.compression import COMPRESSION_EXTENSIONS
+
+JSON_EXTENSIONS = ('.json',)
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+READ_BLOCK_SIZE = 4 * 1024 * 1024
+WHITESPACE = ' \t\r\n'
+_COLUMNS_ONLY = object()  # 只传递列名、不对应任何数据行的标记（null 记录是一行缺失值）
+
+
+def json_format(file_path):
+    """根据扩展名（忽略压缩扩展名）判断JSON格式，返回 'json'、'jsonl' 或 None"""
+    name = file_path.lower()
+    for ext, _ in COMPRESSION_EXTENSIONS:
+        if name.endswith(ext):
+            name = name[:-len(ext)]
+            break
+    if name.endswith(JSON_EXTENSIONS):
+        return 'json'
+    if name.endswith(JSON_LINES_EXTENSIONS):
+        return 'jsonl'
+    return None
+
+
+class JsonStreamReader:
+    """增量解析JSON文本
+
+    每次只在缓冲区中解析一个完整的值，缓冲区不足时继续读取，
+    整个文件不会一次性读入内存。
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """读取更多文本，已到文件末尾时返回False"""
+        if self.eof:
+            return False
+        if self.pos > READ_BLOCK_SIZE:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        text = self.stream.read(READ_BLOCK_SIZE)
+        if not text:
+            self.eof = True
+            return False
+        self.buf += text
+        return True
+
+    def peek(self):
+        """跳过空白并返回下一个字符，文件结束时返回空字符串"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"JSON格式错误: 位置 {self.pos} 处应为 '{char}'")
+        self.pos += 1
+
+    def value(self):
+        """解析下一个完整的值"""
+        self.peek()
+        decoder = json.JSONDecoder()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+                # 数字可能在缓冲区末尾被截断，需要读取更多内容确认
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self._fill():
+                value, end = decoder.raw_decode(self.buf, self.pos)
+                self.pos = end
+                return value
+
+    def array_items(self):
+        """逐个返回数组中的元素，调用前位置应位于 '[' 处"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"JSON格式错误: 位置 {self.pos - 1} 处应为 ',' 或 ']'")
+
+
+def _iter_json_rows(reader):
+    """解析 .json 文件，返回 (列名或None, 行) 的迭代，行为 _COLUMNS_ONLY 时只表示列名
+
+    支持 vol2 输出的 {"columns": [...], "rows": [[...], ...]}、记录数组 [{...}, ...]
+    和单个对象。
+    """
+    char = reader.peek()
+    if char == '[':
+        for item in reader.array_items():
+            yield None, item
+        return
+    if char != '{':
+        raise ValueError("不支持的JSON格式：顶层应为数组或对象")
+
+    # 逐个读取对象的字段，rows 字段按元素流式解析
+    reader.expect('{')
+    fields = {}
+    columns = None
+    pending = []
+    has_rows = False
+    if reader.peek() == '}':
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            if key == 'rows' and reader.peek() == '[':
+                has_rows = True
+                for row in reader.array_items():
+                    if columns is None:
+                        pending.append(row)  # columns 出现在 rows 之后时先缓存
+                    else:
+                        yield columns, row
+            else:
+                fields[key] = reader.value()
+                if key == 'columns' and isinstance(fields[key], list):
+                    columns = fields[key]
+            char = reader.peek()
+            reader.pos += 1
+            if char == '}':
+                break
+            if char != ',':
+                raise ValueError(f"JSON格式错误: 位置 {reader.pos - 1} 处应为 ',' 或 '}}'")
+
+    if has_rows:
+        for row in pending:
+            yield columns, row
+        # 没有数据行时也要保留列名
+        yield columns, _COLUMNS_ONLY
+    else:
+        # 普通对象作为单行数据
+        yield None, fields
+
+
+def _iter_json_lines(stream):
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield None, json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"第 {line_number} 行不是有效的JSON: {str(e)}")
+
+
+def _nested_to_text(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _build_chunk(rows, columns):
+    """把一批行转换为DataFrame，嵌套的对象和数组保存为JSON文本，null 记录为一行缺失值"""
+    records = [row for row in rows if row is not None]
+    if columns is not None:
+        chunk = pd.DataFrame.from_records([[None] * len(columns) if row is None else row for row in rows],
+                                          columns=columns)
+    elif records and all(isinstance(row, dict) for row in records):
+        chunk = pd.DataFrame.from_records([{} if row is None else row for row in rows])
+    else:
+        # 数组形式的行没有列名，使用位置编号
+        chunk = pd.DataFrame([row if isinstance(row, (list, tuple)) else [row] for row in rows])
+    for name in chunk.columns[chunk.dtypes == object]:
+        values = chunk[name]
+        if any(isinstance(v, (dict, list)) for v in values):
+            chunk[name] = values.map(_nested_to_text)
+    return chunk
+
+
+def iter_json_chunks(stream, fmt='json', encoding='utf-8', chunk_size=10000):
+    """从二进制数据流增量解析 JSON / JSON Lines，每次返回一个数据块"""
+    text = io.TextIOWrapper(stream, encoding=encoding or 'utf-8')
+    rows_iter = _iter_json_lines(text) if fmt == 'jsonl' else _iter_json_rows(JsonStreamReader(text))
+    batch = []
+    batch_columns = None
+    emitted = False
+    for columns, row in rows_iter:
+        if row is _COLUMNS_ONLY:
+            if not batch:
+                batch_columns = columns
+            continue
+        if batch and columns != batch_columns:
+            yield _build_chunk(batch, batch_columns)
+            emitted = True
+            batch = []
+        batch_columns = columns
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield _build_chunk(batch, batch_columns)
+            emitted = True
+            batch = []
+    if batch or not emitted:
+        yield _build_chunk(batch, batch_columns)
+    text.detach()
@@ -0,0 +1,184 @@
+import copy
+import io
+import mmap
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from lovelyform.models.csv_index import scan_record_starts, QUOTE
+from lovelyform.models.type_inference import get_display_formats
+
+FIRST_PART_SIZE = 4 * 1024 * 1024    # 第一段较小，尽快显示首页
+PART_SIZE = 32 * 1024 * 1024
+SCAN_WINDOW = 1024 * 1024
+PARALLEL_MIN_SIZE = 64 * 1024 * 1024
+# 这些参数会改变行与字节范围的对应关系，无法分段解析
+UNSUPPORTED_OPTIONS = ('header', 'names', 'skiprows', 'skipfooter', 'nrows', 'index_col', 'chunksize', 'iterator')
+
+
+def default_workers():
+    """默认的工作进程数，保留一个核心给界面线程"""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def supports_parallel(read_options):
+    """判断解析参数是否允许按字节范围分段解析"""
+    read_options = read_options or {}
+    if any(key in read_options for key in UNSUPPORTED_OPTIONS):
+        return False
+    encoding = read_options.get('encoding') or 'utf-8'
+    try:
+        # 换行符和引号必须是单字节的 ASCII 字符（排除 UTF-16 等编码）
+        return '\n'.encode(encoding) == b'\n' and '"'.encode(encoding) == b'"'
+    except LookupError:
+        return False
+
+
+def count_quotes(buf, start, end):
+    """统计 buf[start:end] 中双引号的数量"""
+    arr = np.frombuffer(buf, dtype=np.uint8, count=end - start, offset=start)
+    count = int(np.count_nonzero(arr == QUOTE))
+    del arr
+    return count
+
+
+def next_record_start(buf, size, pos, in_quotes):
+    """从pos开始找到第一个位于引号外的记录起始偏移，找不到时返回文件大小
+
+    :param in_quotes: pos 处是否位于引号内
+    """
+    while pos < size:
+        end = min(pos + SCAN_WINDOW, size)
+        starts, in_quotes = scan_record_starts(buf, pos, end, in_quotes)
+        if len(starts):
+            return int(starts[0])
+        pos = end
+    return size
+
+
+def iter_partitions(buf, size, data_start):
+    """把数据部分切分为对齐到记录边界的字节范围，返回 (起始偏移, 结束偏移)
+
+    每个分段的起点都是记录起点（位于引号外），因此只需统计分段内的引号数量
+    就能确定切分点处的引号状态，字段内的换行不会被切断。
+    """
+    pos = data_start
+    part_size = FIRST_PART_SIZE
+    while pos < size:
+        target = min(pos + part_size, size)
+        if target < size:
+            in_quotes = count_quotes(buf, pos, target) % 2 == 1
+            end = next_record_start(buf, size, target, in_quotes)
+        else:
+            end = size
+        yield pos, end
+        pos = end
+        part_size = PART_SIZE
+
+
+def parse_range(file_path, start, end, columns, read_options, inferencer=None, optimizer=None):
+    """在工作进程中解析 [start, end) 字节范围，并完成类型推断和类型优化
+
+    Returns:
+        tuple: (数据块, 处理该数据块后的类型优化器，没有时为None)
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    chunk = pd.read_csv(io.BytesIO(data), header=None, names=columns, **read_options)
+    if inferencer is not None:
+        chunk = copy.deepcopy(inferencer).apply(chunk)
+    if optimizer is not None:
+        optimizer = copy.copy(optimizer)
+        optimizer.report = {}
+        optimizer.categories = dict(optimizer.categories or {})
+        chunk = optimizer.optimize(chunk)
+    return chunk, optimizer
+
+
+def _merge_result(result, inferencer, optimizer):
+    """合并工作进程的结果：汇总优化报告和分类列的类别，放弃在该分段中无法转换的原生类型列"""
+    chunk, state = result
+    if optimizer is not None and state is not None:
+        optimizer.merge(state, len(chunk))
+    if inferencer is not None and inferencer.formats:
+        formats = get_display_formats(chunk)
+        for name in list(inferencer.formats):
+            if name not in formats:
+                del inferencer.formats[name]
+    return chunk
+
+
+def parallel_read_csv(file_path, read_options=None, workers=None, should_stop=None,
+                      inferencer=None, optimizer=None):
+    """多进程并行解析CSV文件
+
+    主线程按记录边界切分字节范围，工作进程各自解析，结果按原始行顺序返回。
+    第一个分段在本进程中确定类型推断和类型优化的规则，之后的分段连同规则一起
+    交给工作进程处理。同时提交的分段数量有上限，内存占用不会随文件大小增长。
+
+    Yields:
+        tuple: (数据块, 已解析到的字节偏移)
+    """
+    read_options = dict(read_options or {})
+    workers = workers or default_workers()
+    size = os.path.getsize(file_path)
+    if size == 0:
+        raise ValueError("文件为空")
+
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        data_start = next_record_start(buf, size, 0, False)
+        columns = list(pd.read_csv(io.BytesIO(buf[:data_start]), nrows=0, **read_options).columns)
+        if data_start >= size:
+            yield pd.DataFrame(columns=columns), size
+            return
+
+        partitions = iter_partitions(buf, size, data_start)
+        start, end = next(partitions)
+        chunk, _ = parse_range(file_path, start, end, columns, read_options)
+        if inferencer is not None:
+            chunk = inferencer.apply(chunk)
+        if optimizer is not None:
+            chunk = optimizer.optimize(chunk)
+        yield chunk, end
+
+        position = end
+        try:
+            for chunk, position in _pool_results(file_path, columns, read_options, workers, should_stop,
+                                                 inferencer, optimizer, iter_partitions(buf, size, position)):
+                yield chunk, position
+        except (OSError, RuntimeError) as e:
+            # 打包后的程序等环境中可能无法启动子进程（BrokenProcessPool 为 RuntimeError）
+            print(f"并行解析不可用，改为单进程解析: {str(e)}")
+            for start, end in iter_partitions(buf, size, position):
+                if should_stop is not None and should_stop():
+                    return
+                result = parse_range(file_path, start, end, columns, read_options, inferencer, optimizer)
+                yield _merge_result(result, inferencer, optimizer), end
+
+
+def _pool_results(file_path, columns, read_options, workers, should_stop, inferencer, optimizer, partitions):
+    """把分段交给进程池解析，按提交顺序返回 (数据块, 结束偏移)"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers * 2:
+                part = next(partitions, None)
+                if part is None:
+                    exhausted = True
+                    break
+                start, end = part
+                pending.append((end, pool.submit(parse_range, file_path, start, end, columns,
+                                                 read_options, inferencer, optimizer)))
+            if not pending:
+                break
+            if should_stop is not None and should_stop():
+                for _, future in pending:
+                    future.cancel()
+                return
+            end, future = pending.popleft()
+            yield _merge_result(future.result(), inferencer, optimizer), end
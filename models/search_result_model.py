@@ -0,0 +1,169 @@
+from collections import OrderedDict
+import numpy as np
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from lovelyform.models.filter_engine import RowVector
+from lovelyform.models.table_model import CELL_ALIGNMENT
+
+BLOCK_HITS = 256   # 每次读取显示文本的命中数
+MAX_BLOCKS = 64    # 最多缓存的显示文本块数
+
+
+class SearchResultModel(QAbstractTableModel):
+    """全局搜索结果的虚拟模型
+
+    命中的单元格只保存为 (行号, 列号) 两个整数数组，内容列的显示文本在视图请求时
+    按块从数据集中读取，结果条数不影响显示速度和内存占用。
+    可以按列号筛选结果（只显示部分列的命中），按行号或列名排序。
+    """
+    HEADERS = ["行号", "列名", "内容"]
+
+    def __init__(self, data_manager):
+        super().__init__()
+        self.data_manager = data_manager
+        self._rows = RowVector()
+        self._cols = RowVector()
+        self._columns = []
+        self._selected = None   # 只显示这些列号的命中，None 表示全部
+        self._sort_key = None   # (列, 是否升序)，None 表示按行、列顺序
+        self._order = None      # 显示位置 -> 命中编号，None 表示不调整顺序
+        self._blocks = OrderedDict()
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = RowVector()
+        self._cols = RowVector()
+        self._columns = list(self.data_manager.get_columns())
+        self._selected = None
+        self._order = None
+        self._blocks.clear()
+        self.endResetModel()
+
+    def append(self, rows, cols):
+        """追加一批命中的单元格"""
+        if not len(rows):
+            return
+        if self._order is None:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self._cols.extend(cols)
+            # 原来末尾的块不完整，下次访问时重新读取
+            self._blocks.pop(first // BLOCK_HITS, None)
+            self.endInsertRows()
+        else:
+            self._rows.extend(rows)
+            self._cols.extend(cols)
+            self._update_order()
+
+    @property
+    def hit_count(self):
+        return len(self._rows)
+
+    def column_counts(self):
+        """各列的命中数 {列名: 命中数}"""
+        counts = np.bincount(self._cols.rows, minlength=len(self._columns))
+        return {name: int(counts[i]) for i, name in enumerate(self._columns) if counts[i]}
+
+    def set_column_filter(self, names):
+        """只显示这些列的命中，names 为空时显示全部"""
+        self._selected = [self._columns.index(name) for name in names] if names else None
+        self._update_order()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """按行号或列名排序（内容列的文本按需读取，不参与排序）"""
+        if column not in (0, 1):
+            return
+        ascending = order == Qt.AscendingOrder
+        # 命中本来就按行、列顺序排列
+        self._sort_key = None if column == 0 and ascending else (column, ascending)
+        self._update_order()
+
+    def _update_order(self):
+        """重新计算显示顺序"""
+        self.layoutAboutToBeChanged.emit()
+        hits = None
+        if self._selected is not None:
+            hits = np.flatnonzero(np.isin(self._cols.rows, self._selected))
+        if self._sort_key is not None:
+            column, ascending = self._sort_key
+            if hits is None:
+                hits = np.arange(len(self._rows))
+            if column == 1:
+                # 按列名排序，同一列中保持行号顺序
+                ranks = np.empty(len(self._columns), dtype=np.int64)
+                ranks[np.argsort([str(name) for name in self._columns], kind='stable')] = np.arange(len(self._columns))
+                hits = hits[np.argsort(ranks[self._cols.rows[hits]], kind='stable')]
+            if not ascending:
+                hits = hits[::-1]
+        self._order = hits
+        self._blocks.clear()
+        self.layoutChanged.emit()
+
+    def _hit(self, position):
+        """显示位置对应的命中编号"""
+        return position if self._order is None else int(self._order[position])
+
+    def hit_at(self, position):
+        """显示位置对应的 (行号, 列号)"""
+        hit = self._hit(position)
+        return int(self._rows.rows[hit]), int(self._cols.rows[hit])
+
+    def _text(self, position):
+        """内容列的显示文本，按块读取并缓存"""
+        b = position // BLOCK_HITS
+        texts = self._blocks.get(b)
+        if texts is None:
+            start = b * BLOCK_HITS
+            end = min(start + BLOCK_HITS, self.rowCount())
+            hits = np.arange(start, end) if self._order is None else self._order[start:end]
+            texts = self.data_manager.get_cell_texts(self._rows.rows[hits], self._cols.rows[hits])
+            self._blocks[b] = texts
+            if len(self._blocks) > MAX_BLOCKS:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(b)
+        return texts[position - b * BLOCK_HITS]
+
+    def invalidate(self):
+        """数据集内容变化后重新读取显示文本"""
+        self._blocks.clear()
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0, 2), self.index(self.rowCount() - 1, 2))
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows) if self._order is None else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            row, col = self.hit_at(index.row())
+            if index.column() == 0:
+                return str(row + 1)  # 行号从1开始显示
+            if index.column() == 1:
+                return str(self._columns[col]) if col < len(self._columns) else ''
+            return self._text(index.row())
+        if role == Qt.TextAlignmentRole:
+            return CELL_ALIGNMENT
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == 2:
+            flags |= Qt.ItemIsEditable  # 允许在编辑框中选择和复制内容
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        return False
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
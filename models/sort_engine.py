@@ -0,0 +1,169 @@
+import re
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_datetime64_any_dtype, is_timedelta64_dtype
+from lovelyform.models.type_inference import HEX_RE
+
+NUMBER_RE = re.compile(r'\d+')
+NUMBER_WIDTH = 20     # 数字补齐的宽度，足以容纳64位整数
+MAX_PERMUTATIONS = 8  # 最多缓存的排序结果数
+
+
+def _pad_number(match):
+    return match.group().rjust(NUMBER_WIDTH, '0')
+
+
+def natural_key(value):
+    """自然排序的键：文本不区分大小写，其中的数字补齐到相同宽度以按数值比较，
+    十六进制地址按地址值比较
+
+    键是普通字符串，排序时的比较全部在C代码中完成。
+    """
+    text = str(value).strip()
+    match = HEX_RE.match(text)
+    if match:
+        return str(int(match.group(2), 16)).rjust(NUMBER_WIDTH, '0')
+    return NUMBER_RE.sub(_pad_number, text.lower())
+
+
+def column_values(chunks, name):
+    """把各数据块中的一列拼接为一个 Series（只复制这一列）"""
+    pieces = [chunk[name] for _, chunk in chunks]
+    if not pieces:
+        return pd.Series([], dtype=object)
+    if len(pieces) == 1:
+        return pieces[0]
+    return pd.concat(pieces, ignore_index=True)
+
+
+def column_ranks(series, natural=True):
+    """整列的排序名次，相同的值名次相同，缺失值为 -1
+
+    原生类型列（整数、十六进制地址、时间等）按数值排序；文本列只对不重复的值排序，
+    natural 为True时按自然顺序（file2 在 file10 之前，0xff 在 0x100 之前）。
+    """
+    dtype = series.dtype
+    if is_numeric_dtype(dtype) or is_datetime64_any_dtype(dtype) or is_timedelta64_dtype(dtype):
+        codes, _ = pd.factorize(series, sort=True)
+        return codes.astype(np.int64)
+    codes, uniques = pd.factorize(series)
+    uniques = np.asarray(uniques, dtype=object)
+    keys = [natural_key(value) if natural else str(value) for value in uniques]
+    order = sorted(range(len(uniques)), key=keys.__getitem__)
+    ranks = np.empty(len(uniques) + 1, dtype=np.int64)
+    ranks[order] = np.arange(len(uniques))
+    ranks[-1] = -1  # codes 中的 -1 对应最后一项
+    return ranks[codes]
+
+
+def sort_permutation(ranks, ascending):
+    """按若干列的名次计算排序后的行号排列（稳定排序，缺失值总在最后）
+
+    :param ranks: 各排序键的名次数组，第一个为主排序键
+    :param ascending: 各排序键是否升序
+    """
+    keys = []
+    for values, asc in zip(ranks, ascending):
+        top = values.max(initial=-1) + 1
+        keys.append(np.where(values < 0, top, values if asc else top - 1 - values))
+    if len(keys) == 1:
+        return np.argsort(keys[0], kind='stable')
+    return np.lexsort(keys[::-1])  # lexsort 以最后一个键为主键
+
+
+def reverse_permutation(permutation, ranks):
+    """由一列的稳定排序结果直接得到相反方向的稳定排序结果（缺失值仍在最后）"""
+    values = ranks[permutation]
+    n = len(values) - int(np.count_nonzero(values < 0))
+    head = permutation[:n][::-1]
+    values = values[:n][::-1]
+    # 整体反转后名次相同的行的先后顺序也被反转，再在每组内反转回来
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    lengths = np.diff(np.r_[starts, n])
+    group = np.repeat(np.arange(len(starts)), lengths)
+    positions = 2 * starts[group] + lengths[group] - 1 - np.arange(n)
+    return np.concatenate([head[positions], permutation[n:]])
+
+
+def compute_permutation(keys, chunks, cached_ranks, natural=True, cancelled=None):
+    """计算排序结果，可以在后台线程中调用
+
+    :param keys: ((列名, 是否升序), ...)
+    :param cached_ranks: 已经计算过的 {列名: 名次数组}
+    :param cancelled: 每列之前检查的回调，返回True时中止并返回None
+    Returns:
+        tuple: (行号排列, 用到的 {列名: 名次数组})
+    """
+    ranks = {}
+    for name, _ in keys:
+        if cancelled is not None and cancelled():
+            return None
+        ranks[name] = cached_ranks.get(name)
+        if ranks[name] is None:
+            ranks[name] = column_ranks(column_values(chunks, name), natural)
+    return sort_permutation([ranks[name] for name, _ in keys], [asc for _, asc in keys]), ranks
+
+
+class SortIndex:
+    """排序结果缓存
+
+    排序不移动数据，只保存行号排列。每列的名次数组和每组排序键的行号排列分别缓存，
+    在已经排过序的列（及其升降序）之间切换时不需要重新计算；数据变化后按列失效。
+    """
+
+    def __init__(self, natural=True):
+        self.natural = natural
+        self.rows = 0        # 缓存对应的数据行数
+        self.version = 0     # 缓存失效时递增，丢弃失效前开始的后台计算结果
+        self._ranks = {}
+        self._permutations = OrderedDict()
+
+    def clear(self):
+        self._ranks = {}
+        self._permutations.clear()
+        self.version += 1
+
+    def invalidate(self, name):
+        """一列的数据发生变化"""
+        self._ranks.pop(name, None)
+        for keys in [keys for keys in self._permutations if any(n == name for n, _ in keys)]:
+            del self._permutations[keys]
+        self.version += 1
+
+    def lookup(self, keys, rows):
+        """已缓存的行号排列，没有时返回None"""
+        if rows != self.rows:
+            return None
+        permutation = self._permutations.get(keys)
+        if permutation is not None:
+            self._permutations.move_to_end(keys)
+        elif len(keys) == 1:
+            # 同一列的相反方向已经排过序时不需要重新排序
+            name, ascending = keys[0]
+            opposite = self._permutations.get(((name, not ascending),))
+            if opposite is not None and name in self._ranks:
+                permutation = reverse_permutation(opposite, self._ranks[name])
+                self._remember(keys, permutation)
+        return permutation
+
+    def cached_ranks(self, rows):
+        return dict(self._ranks) if rows == self.rows else {}
+
+    def store(self, keys, rows, version, permutation, ranks):
+        """保存后台计算的结果，计算期间缓存已失效时不保存"""
+        if version != self.version:
+            return
+        if rows != self.rows:
+            self.clear()
+            self.rows = rows
+        self._ranks.update(ranks)
+        self._remember(keys, permutation)
+
+    def _remember(self, keys, permutation):
+        self._permutations[keys] = permutation
+        while len(self._permutations) > MAX_PERMUTATIONS:
+            self._permutations.popitem(last=False)
+        # 只保留仍被缓存的排序结果用到的列的名次
+        used = {name for keys in self._permutations for name, _ in keys}
+        self._ranks = {name: values for name, values in self._ranks.items() if name in used}
@@ -1,37 +1,81 @@
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
 from PySide6.QtGui import QColor
-import pandas as pd
+from lovelyform.models.display_cache import DisplayCache, BLOCK_ROWS
+
+CELL_ALIGNMENT = Qt.AlignLeft | Qt.AlignVCenter
 
 class PandasModel(QAbstractTableModel):
+    """整个数据集的虚拟表格模型
+
+    向视图报告数据集（筛选后为筛选结果）的总行数，只在视图请求时从 DataManager
+    的数据存储中读取需要的行，按 (行块, 列) 整块渲染显示字符串，不复制分页数据。
+    筛选结果只是一个行号数组，模型的行即该数组中的位置。
+    """
     dataChanged = Signal(QModelIndex, QModelIndex)
 
-    def __init__(self, data: pd.DataFrame, page_offset: int = 0):
+    def __init__(self, data_manager):
         super().__init__()
-        self._data = data
-        self.highlight_keywords = {}  # 改为字典，存储关键词和对应的颜色
-        self.page_offset = page_offset
-        # 缓存数据转换结果以提高性能
-        self._str_cache = {}
-        # 添加行号索引，使用DataFrame的原始索引
-        self._row_indices = list(data.index)
+        self.data_manager = data_manager
+        # 显示字符串的分块缓存，容量固定
+        self._display_cache = DisplayCache(self.data_manager.get_view_data)
+        self._sync()
+
+    def _sync(self):
+        """重新读取数据集的行数、列和显示格式"""
+        self._row_count = self.data_manager.get_view_row_count()
+        self._columns = self.data_manager.get_columns()
+        self._update_formats()
+        self._display_cache.clear()
+
+    def _update_formats(self):
+        """按列号记录原生类型列的显示格式"""
+        formats = self.data_manager.get_display_formats()
+        self._formats = {i: formats[name] for i, name in enumerate(self._columns) if name in formats}
+        self._display_cache.formats = self._formats
+
+    def refresh(self):
+        """数据集整体发生变化（加载、排序、插件修改）后重置模型"""
+        self.beginResetModel()
+        self._sync()
+        self.endResetModel()
+
+    def sync_rows(self):
+        """数据集末尾追加了新行，只通知视图新插入的行"""
+        total = self.data_manager.get_view_row_count()
+        columns = self.data_manager.get_columns()
+        formats = self._formats
+        if not columns.equals(self._columns):
+            self.refresh()
+            return
+        self._update_formats()
+        if total < self._row_count or self._formats.keys() != formats.keys():
+            self.refresh()
+            return
+        if total == self._row_count:
+            return
+        self.beginInsertRows(QModelIndex(), self._row_count, total - 1)
+        # 原来末尾的块不完整，下次访问时重新渲染
+        self._display_cache.invalidate_rows(self._row_count, total)
+        self._row_count = total
+        self.endInsertRows()
 
     def rowCount(self, parent=QModelIndex()):
-        return len(self._data)
+        if parent.isValid():
+            return 0
+        return self._row_count
 
     def columnCount(self, parent=QModelIndex()):
-        return len(self._data.columns)
+        if parent.isValid():
+            return 0
+        return len(self._columns)
 
     def _get_str_value(self, row, col):
-        """获取单元格的字符串值，使用缓存提高性能"""
-        cache_key = (row, col)
-        if cache_key not in self._str_cache:
-            value = self._data.iloc[row, col]
-            self._str_cache[cache_key] = str(value) if pd.notna(value) else ''
-        return self._str_cache[cache_key]
+        """获取单元格的字符串值"""
+        return self._display_cache.get(row, col)
 
     def get_absolute_row(self, row):
-        """获取实际的行索引（考虑页面偏移）"""
-        return row + self.page_offset
+        """获取数据集中的行号"""
+        return self.data_manager.view_to_row(row)
 
     def data(self, index, role=Qt.DisplayRole):
         if not index.isValid():
@@ -40,24 +84,24 @@ class PandasModel(QAbstractTableModel):
         if role == Qt.DisplayRole:
             return self._get_str_value(index.row(), index.column())
         elif role == Qt.TextAlignmentRole:
-            return Qt.AlignLeft | Qt.AlignVCenter
-        elif role == Qt.BackgroundRole and self.highlight_keywords:
-            text = self._get_str_value(index.row(), index.column()).lower()
-            for keyword, color in self.highlight_keywords.items():
-                if keyword.lower() in text:
-                    return color
+            return CELL_ALIGNMENT
+        elif role == Qt.BackgroundRole:
+            # 高亮颜色在 DataManager 中预先计算，这里只查表
+            highlighter = self.data_manager.highlighter
+            if highlighter.active:
+                return highlighter.color(self.get_absolute_row(index.row()), index.column())
         return None
 
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role == Qt.DisplayRole:
             if orientation == Qt.Horizontal:
-                return str(self._data.columns[section])
+                if 0 <= section < len(self._columns):
+                    return str(self._columns[section])
+                return None
             else:
-                # 使用原始索引获取行号
-                original_index = self._row_indices[section]
-                return str(original_index + 1)
+                return str(self.get_absolute_row(section) + 1)
         elif role == Qt.TextAlignmentRole:
-            return Qt.AlignLeft | Qt.AlignVCenter
+            return CELL_ALIGNMENT
         return None
 
     def flags(self, index):
@@ -70,10 +114,14 @@ class PandasModel(QAbstractTableModel):
             row = index.row()
             col = index.column()
             try:
-                # 更新DataFrame中的值
-                self._data.iloc[row, col] = value
-                # 清除该单元格的缓存
-                self._str_cache.pop((row, col), None)
+                # 直接写入数据存储
+                demoted = self.data_manager.set_cell_value(self.get_absolute_row(row), col, value)
+                if demoted:
+                    # 该列已还原为文本，整列缓存失效
+                    self._update_formats()
+                    self._display_cache.invalidate_column(col)
+                else:
+                    self._display_cache.invalidate_rows(row, row + 1)
                 # 发出数据改变信号
                 self.dataChanged.emit(index, index)
                 return True
@@ -82,18 +130,21 @@ class PandasModel(QAbstractTableModel):
                 return False
         return False
 
-    def update_data(self, new_data: pd.DataFrame):
-        """更新模型的数据"""
-        self.beginResetModel()
-        self._data = new_data
-        # 更新行号索引，保持原始索引
-        self._row_indices = list(new_data.index)
-        self._str_cache.clear()  # 清除缓存
-        self.endResetModel()
+    def missing_blocks(self, start, end, cols):
+        """[start, end) 行在这些列中尚未渲染的块"""
+        end = min(end, self._row_count)
+        if start >= end:
+            return []
+        return self._display_cache.missing_blocks(start, end, cols)
+
+    def render_block(self, block, col):
+        """预先渲染一个块，之后显示这些单元格时不需要再读取数据"""
+        if block * BLOCK_ROWS < self._row_count and col < len(self._columns):
+            self._display_cache.block(block, col)
 
     def clear_cache(self):
         """清除字符串缓存"""
-        self._str_cache.clear()
+        self._display_cache.clear()
 
     def sort(self, column, order):
         """排序功能 - 保持原始行号顺序，禁用排序"""
@@ -0,0 +1,366 @@
+import os
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
+from lovelyform.models.display_cache import render_column
+
+GRAM = 3
+CODE_BITS = 21             # Unicode 码位最多21位，三个码位编码为一个 int64
+BATCH_CHARS = 1 << 22      # 建立倒排表时每批转换的字符数上限
+PENDING_LIMIT = 4096       # 新增文本达到该数量后才建立倒排表，之前查询时逐个验证
+MAX_SEGMENTS = 8           # 倒排表分段数超过后合并除第一段以外的分段
+TEXT_SEPARATOR = '\x00'    # 持久化时文本之间的分隔符
+
+
+def gram_keys(text) -> np.ndarray:
+    """文本中所有不重复三元组的编码（已排序）"""
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    if len(codes) < GRAM:
+        return np.empty(0, dtype=np.int64)
+    return np.unique((codes[:-2] << 2 * CODE_BITS) | (codes[1:-1] << CODE_BITS) | codes[2:])
+
+
+class PostingSegment:
+    """一段倒排表（CSR 形式）
+
+    keys 为排序后的三元组编码，ids[offsets[i]:offsets[i+1]] 为包含第i个三元组的文本编号（递增）。
+    """
+
+    def __init__(self, keys, offsets, ids):
+        self.keys = keys
+        self.offsets = offsets
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, texts, first_id=0):
+        """为一批文本建立倒排表，第i个文本的编号为 first_id + i"""
+        if not texts:
+            return cls.empty()
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        # 把字符映射为出现过的字符表中的序号，三元组序号和文本编号能合成一个 int64 时
+        # 只需对一个整数数组排序，比按两个键排序快一个数量级
+        alphabet = np.array(sorted(map(ord, set(''.join(texts)))), dtype=np.int64)
+        ranks = np.zeros(alphabet[-1] + 1 if len(alphabet) else 1, dtype=np.int64)
+        ranks[alphabet] = np.arange(len(alphabet))
+        bits = max(int(len(alphabet) - 1).bit_length(), 1)
+        id_bits = max(int(first_id + len(texts) - 1).bit_length(), 1)
+        packed = GRAM * bits + id_bits <= 63
+
+        order = np.argsort(lengths, kind='stable')  # 按长度分批，减少定宽数组的填充
+        parts, part_ids = [], []
+        i = 0
+        while i < len(order):
+            width = lengths[order[min(i + 65536, len(order)) - 1]]
+            j = min(len(order), i + max(1, BATCH_CHARS // max(width, 1)), i + 65536)
+            batch = order[i:j]
+            width = lengths[batch[-1]]
+            i = j
+            if width < GRAM:
+                continue
+            chars = np.array([texts[k] for k in batch], dtype=f'U{width}')
+            chars = chars.view(np.uint32).reshape(len(batch), width)
+            if packed:
+                chars = ranks[chars]
+                shift = bits
+            else:
+                chars = chars.astype(np.int64)
+                shift = CODE_BITS
+            keys = (chars[:, :-2] << 2 * shift) | (chars[:, 1:-1] << shift) | chars[:, 2:]
+            # 按长度判断有效位置，文本中的 NUL 字符不会被当作填充
+            valid = np.arange(width - GRAM + 1)[None, :] < (lengths[batch] - GRAM + 1)[:, None]
+            rows, positions = np.nonzero(valid)
+            ids = batch[rows] + first_id
+            if packed:
+                parts.append((keys[rows, positions] << id_bits) | ids)
+            else:
+                parts.append(keys[rows, positions])
+                part_ids.append(ids)
+        if not parts:
+            return cls.empty()
+        if not packed:
+            return cls.from_pairs(np.concatenate(parts), np.concatenate(part_ids))
+
+        combined = np.concatenate(parts)
+        combined.sort()
+        keep = np.ones(len(combined), dtype=bool)
+        keep[1:] = combined[1:] != combined[:-1]
+        combined = combined[keep]
+        ids = (combined & ((1 << id_bits) - 1)).astype(np.int32)
+        keys = combined >> id_bits
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        keys = keys[starts]
+        # 字符序号还原为码位
+        mask = (1 << bits) - 1
+        keys = ((alphabet[keys >> 2 * bits] << 2 * CODE_BITS) | (alphabet[(keys >> bits) & mask] << CODE_BITS)
+                | alphabet[keys & mask])
+        return cls(keys, np.append(starts, len(combined)).astype(np.int64), ids)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32))
+
+    @classmethod
+    def from_pairs(cls, keys, ids):
+        """由 (三元组编码, 文本编号) 对建立倒排表，重复的对只保留一个"""
+        if len(keys) == 0:
+            return cls.empty()
+        order = np.lexsort((ids, keys))
+        keys, ids = keys[order], ids[order]
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = (keys[1:] != keys[:-1]) | (ids[1:] != ids[:-1])
+        keys, ids = keys[keep], ids[keep]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        offsets = np.append(starts, len(keys)).astype(np.int64)
+        return cls(keys[starts], offsets, ids.astype(np.int32))
+
+    def pairs(self):
+        return np.repeat(self.keys, np.diff(self.offsets)), self.ids.astype(np.int64)
+
+    def candidates(self, query_keys):
+        """包含全部三元组的文本编号"""
+        positions = np.searchsorted(self.keys, query_keys)
+        if len(self.keys) == 0 or (positions >= len(self.keys)).any():
+            return np.empty(0, dtype=np.int32)
+        if (self.keys[positions] != query_keys).any():
+            return np.empty(0, dtype=np.int32)
+        postings = sorted((self.ids[self.offsets[p]:self.offsets[p + 1]] for p in positions), key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+
+class GrowableArray:
+    """可追加的定长类型数组，按倍数扩容"""
+
+    def __init__(self, dtype, values=None):
+        self._data = np.empty(0, dtype=dtype)
+        self._size = 0
+        if values is not None:
+            self.extend(values)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def values(self):
+        return self._data[:self._size]
+
+    def extend(self, values):
+        end = self._size + len(values)
+        if end > len(self._data):
+            grown = np.empty(max(end, len(self._data) * 2, 1024), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:end] = values
+        self._size = end
+
+    def __setitem__(self, position, value):
+        self._data[position] = value
+
+
+class ColumnTextIndex:
+    """一列的三元组倒排索引
+
+    列中不重复的小写显示文本编号保存在 texts 中，codes 为每行文本的编号（缺失值为 -1），
+    倒排表记录每个三元组出现在哪些文本中。查询时先用倒排表求出候选文本，验证后再映射回行。
+    """
+
+    def __init__(self, texts, codes, segments=None, fmt=None):
+        self.fmt = fmt  # 原生类型列的显示格式
+        self.texts = GrowableArray(object, texts)
+        self.codes = GrowableArray(np.int32, codes)
+        if segments is None:
+            segments = [PostingSegment.build(texts)]
+        self.segments = segments
+        self.indexed = len(texts)  # 编号小于该值的文本已建立倒排表
+        self._lookup = None        # 已建立倒排表的文本 -> 编号
+        self._pending = {}         # 尚未建立倒排表的文本 -> 编号
+
+    @classmethod
+    def from_values(cls, values, fmt=None):
+        """由一列原始值建立索引"""
+        codes, texts = _factorize_texts(values, fmt)
+        return cls(texts, codes, fmt=fmt)
+
+    def _ids_for(self, texts):
+        """文本编号，新文本会被加入索引"""
+        if self._lookup is None:
+            self._lookup = pd.Index(self.texts.values[:self.indexed])
+        ids = self._lookup.get_indexer(texts)
+        for i in np.flatnonzero(ids < 0):
+            text = texts[i]
+            number = self._pending.get(text)
+            if number is None:
+                number = self._pending[text] = len(self.texts)
+                self.texts.extend([text])
+            ids[i] = number
+        if len(self._pending) >= PENDING_LIMIT:
+            self._flush_pending()
+        return ids
+
+    def _flush_pending(self):
+        """为新增的文本建立一段倒排表"""
+        first = self.indexed
+        self.segments.append(PostingSegment.build(list(self.texts.values[first:]), first))
+        self.indexed = len(self.texts)
+        self._lookup = None
+        self._pending = {}
+        if len(self.segments) > MAX_SEGMENTS:
+            pairs = [segment.pairs() for segment in self.segments[1:]]
+            merged = PostingSegment.from_pairs(np.concatenate([keys for keys, _ in pairs]),
+                                               np.concatenate([ids for _, ids in pairs]))
+            self.segments = [self.segments[0], merged]
+
+    def append(self, values):
+        """追加一批行的原始值"""
+        codes, texts = _factorize_texts(values, self.fmt)
+        if len(texts):
+            codes = np.where(codes >= 0, self._ids_for(texts)[codes], -1)
+        self.codes.extend(codes)
+
+    def update(self, row, text):
+        """单元格被修改后更新其文本编号（原文本的倒排记录保留，验证时自然排除）"""
+        if row < len(self.codes):
+            self.codes[row] = self._ids_for([text.lower()])[0] if text else -1
+
+    def match(self, matcher) -> np.ndarray:
+        """显示文本匹配的行（布尔数组，长度为已建立索引的行数）"""
+        codes = self.codes.values
+        texts = self.texts.values
+        if not matcher.regex and len(matcher.keyword) >= GRAM:
+            query = gram_keys(matcher.keyword)
+            candidates = [segment.candidates(query) for segment in list(self.segments)]
+            candidates.append(np.arange(self.indexed, len(texts)))
+            candidates = np.concatenate(candidates).astype(np.int64)
+            hits = candidates[matcher(pd.Series(texts[candidates], dtype=object))]
+        else:
+            hits = np.flatnonzero(matcher(pd.Series(texts, dtype=object)))
+        # 缺失值的编号为 -1，对应末尾追加的 False
+        lookup = np.zeros(len(texts) + 1, dtype=bool)
+        lookup[hits] = True
+        return lookup[codes]
+
+
+def is_indexed_column(series):
+    """只为字符串列（object、分类和 string 类型）建立索引
+
+    数值列和时间列的显示文本短且字符集小，三元组几乎不能排除候选行，
+    这些列的搜索和筛选直接逐值匹配。
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return is_object_dtype(dtype.categories.dtype) or is_string_dtype(dtype.categories.dtype)
+    return is_object_dtype(dtype) or is_string_dtype(dtype)
+
+
+def _factorize_texts(values, fmt=None):
+    """把原始值编号为不重复的小写显示文本
+
+    Returns:
+        tuple: (编号数组, 文本列表)，缺失值的编号为 -1
+    """
+    codes, uniques = pd.factorize(values)
+    texts = pd.Series(render_column(pd.Series(uniques), fmt), dtype=object).str.lower()
+    # 大小写不同的原始值对应同一个文本
+    text_codes, texts = pd.factorize(texts)
+    codes = np.where(codes >= 0, text_codes[codes] if len(text_codes) else codes, -1)
+    return codes.astype(np.int32), list(texts)
+
+
+class TextIndex:
+    """数据集显示文本的三元组倒排索引，用于搜索和筛选时快速找出候选单元格
+
+    只为字符串列建立索引（见 is_indexed_column），没有索引的列由调用方逐值匹配；
+    随追加的行和修改的单元格增量更新，可以保存为缓存文件。
+    """
+
+    def __init__(self, columns=None, rows=0):
+        self.columns = columns or {}  # {列名: ColumnTextIndex}
+        self.rows = rows
+
+    @classmethod
+    def build(cls, chunks, formats, cancelled=None):
+        """由 (起始行, 数据块) 建立索引，cancelled 返回True时中止并返回None"""
+        chunks = [chunk for _, chunk in chunks]
+        if not chunks:
+            return cls()
+        columns = {}
+        for name in chunks[0].columns:
+            if cancelled is not None and cancelled():
+                return None
+            if not is_indexed_column(chunks[0][name]):
+                continue
+            values = np.concatenate([chunk[name].to_numpy() for chunk in chunks])
+            columns[name] = ColumnTextIndex.from_values(values, formats.get(name))
+        return cls(columns, sum(len(chunk) for chunk in chunks))
+
+    def append(self, frame):
+        """追加一批行（必须紧接在已建立索引的行之后）"""
+        for name, column in self.columns.items():
+            if name in frame.columns:
+                column.append(frame[name].to_numpy())
+            else:
+                column.append(np.full(len(frame), None, dtype=object))
+        self.rows += len(frame)
+
+    def update_cell(self, row, name, text):
+        column = self.columns.get(name)
+        if column is not None:
+            column.update(row, text)
+
+    def match(self, name, matcher):
+        """列中显示文本匹配的行，该列没有索引时返回None"""
+        column = self.columns.get(name)
+        if column is None:
+            return None
+        return column.match(matcher)
+
+    def save(self, path):
+        """保存为 npz 文件，文本中包含分隔符时不保存
+
+        Returns:
+            bool: 是否已保存
+        """
+        arrays = {'rows': np.array([self.rows]), 'names': np.array(list(self.columns), dtype=str)}
+        for i, column in enumerate(self.columns.values()):
+            if len(column.segments) > 1 or column.indexed < len(column.texts):
+                return False  # 只保存刚建立的索引
+            texts = column.texts.values.tolist()
+            blob = TEXT_SEPARATOR.join(texts)
+            if blob.count(TEXT_SEPARATOR) != max(len(texts) - 1, 0):
+                return False
+            segment = column.segments[0]
+            arrays[f'texts{i}'] = np.frombuffer(blob.encode('utf-8'), dtype=np.uint8)
+            arrays[f'count{i}'] = np.array([len(texts)])
+            arrays[f'codes{i}'] = column.codes.values
+            arrays[f'keys{i}'] = segment.keys
+            arrays[f'offsets{i}'] = segment.offsets
+            arrays[f'ids{i}'] = segment.ids
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # 先写临时文件再替换，中途失败不会留下不完整的索引
+        tmp = path + '.tmp.npz'
+        try:
+            np.savez(tmp, **arrays)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return True
+
+    @classmethod
+    def load(cls, path, formats=None):
+        formats = formats or {}
+        with np.load(path, allow_pickle=False) as data:
+            columns = {}
+            for i, name in enumerate(data['names'].tolist()):
+                count = int(data[f'count{i}'][0])
+                texts = data[f'texts{i}'].tobytes().decode('utf-8').split(TEXT_SEPARATOR) if count else []
+                segment = PostingSegment(data[f'keys{i}'], data[f'offsets{i}'], data[f'ids{i}'])
+                columns[name] = ColumnTextIndex(texts, data[f'codes{i}'], [segment], formats.get(name))
+            return cls(columns, int(data['rows'][0]))
@@ -0,0 +1,366 @@
+import re
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer_dtype, is_object_dtype
+
+FORMATS_ATTR = 'display_formats'
+SAMPLE_SIZE = 1000
+
+HEX_RE = re.compile(r'^(0[xX])([0-9a-fA-F]+)$')
+INT_RE = re.compile(r'^-?(0|[1-9]\d*)$')
+EPOCH_NAME_RE = re.compile(r'time|date|timestamp', re.IGNORECASE)
+EPOCH_MIN = 10 ** 8          # 1973年
+EPOCH_MAX = 4 * 10 ** 9      # 2096年
+INT64_MAX = np.iinfo(np.int64).max
+
+DATETIME_PATTERNS = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S UTC+0000',
+    '%Y-%m-%d %H:%M:%S.%f UTC+0000',
+    '%Y-%m-%d %H:%M:%S+00:00',
+    '%Y-%m-%d %H:%M:%S.%f+00:00',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y-%m-%d',
+]
+
+# ISO 8601 文本（YYYY-MM-DDTHH:MM:SS.ffffff）中各 strftime 字段的位置
+ISO_FIELDS = {'Y': (0, 4), 'm': (5, 7), 'd': (8, 10), 'H': (11, 13), 'M': (14, 16), 'S': (17, 19), 'f': (20, 26)}
+ISO_TEMPLATE = '0000-01-01T00:00:00.000000'
+DIGITS = frozenset('0123456789')
+DIRECTIVE_RE = re.compile(r'%(.)')
+NUMERIC_DIRECTIVES = frozenset('YmdHMSfjyIUWwu')
+
+
+class FixedLayout:
+    """只含固定宽度字段的 strftime 格式
+
+    文本与 ISO 8601 文本之间的转换只是字符位置的重排，可以对整列字符矩阵一次完成。
+    """
+
+    def __init__(self, pattern):
+        self.literal = []    # (文本位置, 字符)
+        text_pos, iso_pos = [], []
+        fields = set()
+        pos = 0
+        for part in re.split(r'(%.)', pattern):
+            if not part:
+                continue
+            if part.startswith('%'):
+                if part[1] not in ISO_FIELDS:
+                    raise ValueError(f"不支持的格式: {part}")
+                a, b = ISO_FIELDS[part[1]]
+                text_pos.extend(range(pos, pos + b - a))
+                iso_pos.extend(range(a, b))
+                fields.add(part[1])
+                pos += b - a
+            else:
+                self.literal.extend((pos + i, c) for i, c in enumerate(part))
+                pos += len(part)
+        if not {'Y', 'm', 'd'} <= fields:
+            raise ValueError("格式缺少日期字段")
+        self.width = pos
+        self.text_pos = np.array(text_pos, dtype=np.intp)
+        self.iso_pos = np.array(iso_pos, dtype=np.intp)
+
+    def format(self, values):
+        """datetime64 数组 -> 文本数组"""
+        iso = np.datetime_as_string(values.astype('datetime64[us]'), unit='us')
+        chars = iso.astype('U26').view('U1').reshape(len(iso), 26)
+        out = np.empty((len(iso), self.width), dtype='U1')
+        for pos, char in self.literal:
+            out[:, pos] = char
+        out[:, self.text_pos] = chars[:, self.iso_pos]
+        return out.view(f'U{self.width}').ravel()
+
+    def parse(self, texts):
+        """文本列表 -> datetime64[ns] 数组，文本不符合格式时返回None"""
+        texts = np.array(texts, dtype=str)
+        if len(texts) == 0:
+            return np.array([], dtype='datetime64[ns]')
+        if texts.dtype.itemsize != self.width * 4 or np.char.str_len(texts).min() != self.width:
+            return None
+        chars = texts.view('U1').reshape(len(texts), self.width)
+        iso = np.empty((len(texts), 26), dtype='U1')
+        iso[:] = list(ISO_TEMPLATE)
+        iso[:, self.iso_pos] = chars[:, self.text_pos]
+        try:
+            return iso.view('U26').ravel().astype('datetime64[us]').astype('datetime64[ns]')
+        except (ValueError, OverflowError):
+            return None
+
+
+def fixed_layout(pattern):
+    """获取格式的固定宽度布局，格式中有其他字段时返回None"""
+    try:
+        return FixedLayout(pattern)
+    except ValueError:
+        return None
+
+
+class DisplayFormat:
+    """原生类型列的显示格式
+
+    列以原生类型（int64 / datetime64）保存以便排序和范围比较，显示、搜索和保存时
+    通过本格式还原为与原始文本完全一致的字符串。
+
+    kind:
+        hex      - 十六进制地址，如 0xfa8000e3c060
+        int      - 以文本形式出现的整数ID
+        datetime - 日期时间文本，pattern 为 strftime 格式
+        epoch    - UNIX 时间戳（秒）
+    """
+
+    def __init__(self, kind, prefix='0x', width=0, upper=False, pattern=None):
+        self.kind = kind
+        self.prefix = prefix
+        self.width = width
+        self.upper = upper
+        self.pattern = pattern
+
+    def __repr__(self):
+        return f"DisplayFormat({self.to_dict()})"
+
+    def to_dict(self):
+        return {'kind': self.kind, 'prefix': self.prefix, 'width': self.width,
+                'upper': self.upper, 'pattern': self.pattern}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    @property
+    def _int_template(self):
+        if self.kind == 'hex':
+            return f"{self.prefix}%0{self.width}{'X' if self.upper else 'x'}"
+        return '%d'
+
+    @property
+    def alphabet(self):
+        """显示文本（小写）中可能出现的全部字符，无法确定时为None"""
+        if self.kind == 'hex':
+            return DIGITS | frozenset('abcdef') | frozenset(self.prefix.lower())
+        if self.kind in ('int', 'epoch'):
+            return DIGITS | {'-'}
+        directives = DIRECTIVE_RE.findall(self.pattern or '')
+        if not set(directives) <= NUMERIC_DIRECTIVES:
+            return None
+        return DIGITS | frozenset(DIRECTIVE_RE.sub('', self.pattern).lower())
+
+    def may_contain(self, text):
+        """显示文本是否可能包含 text（不区分大小写），用于跳过不可能命中的列"""
+        alphabet = self.alphabet
+        return alphabet is None or set(text.lower()) <= alphabet
+
+    def _format_int(self, value):
+        return self._int_template % int(value)
+
+    def render_value(self, value):
+        """还原单个值，缺失值为空字符串"""
+        if pd.isna(value):
+            return ''
+        if self.kind in ('hex', 'int'):
+            return self._format_int(value)
+        if self.kind == 'datetime':
+            return pd.Timestamp(value).strftime(self.pattern)
+        return str(pd.Timestamp(value).value // 10 ** 9)
+
+    def to_text(self, series: pd.Series) -> pd.Series:
+        """把整列还原为原始文本，缺失值保持为NaN"""
+        mask = series.isna().to_numpy()
+        text = pd.Series(np.nan, index=series.index, dtype=object)
+        if mask.all():
+            return text.rename(series.name)
+        values = series[~mask]
+        if self.kind == 'datetime':
+            layout = fixed_layout(self.pattern)
+            if layout is None:
+                text[~mask] = values.dt.strftime(self.pattern).to_numpy(dtype=object)
+            else:
+                # 固定宽度格式直接重排 ISO 文本的字符，比 strftime 快一个数量级
+                text[~mask] = layout.format(values.to_numpy(dtype='datetime64[ns]')).astype(object)
+        elif self.kind == 'epoch':
+            seconds = values.to_numpy(dtype='datetime64[ns]').astype(np.int64) // 10 ** 9
+            text[~mask] = seconds.astype(str).astype(object)
+        else:
+            template = self._int_template
+            text[~mask] = np.array([template % v for v in values.to_numpy().tolist()], dtype=object)
+        return text.rename(series.name)
+
+    def render(self, series: pd.Series) -> np.ndarray:
+        """批量还原用于显示的字符串数组，缺失值为空字符串"""
+        return self.to_text(series).fillna('').to_numpy(dtype=object)
+
+    def parse(self, text):
+        """把文本解析为原生值，用于编辑和范围比较"""
+        text = str(text).strip()
+        if self.kind == 'hex':
+            return int(text, 16)
+        if self.kind == 'int':
+            return int(text)
+        if self.kind == 'datetime':
+            return pd.to_datetime(text, format=self.pattern)
+        return pd.to_datetime(int(text), unit='s')
+
+
+def get_display_formats(df):
+    """获取DataFrame携带的显示格式 {列名: DisplayFormat}"""
+    return df.attrs.get(FORMATS_ATTR, {})
+
+
+def set_display_formats(df, formats):
+    df.attrs[FORMATS_ATTR] = dict(formats)
+
+
+def to_display_frame(df):
+    """把原生类型列还原为原始文本，用于保存和逐值文本匹配"""
+    formats = get_display_formats(df)
+    formats = {name: fmt for name, fmt in formats.items() if name in df.columns}
+    if not formats:
+        return df
+    result = df.copy(deep=False)
+    for name, fmt in formats.items():
+        result[name] = fmt.to_text(df[name])
+    set_display_formats(result, {})
+    return result
+
+
+def demote_column(df, col):
+    """把第col列还原为文本并移除其显示格式"""
+    name = df.columns[col]
+    formats = get_display_formats(df)
+    fmt = formats.get(name)
+    if fmt is None:
+        return
+    df.isetitem(col, fmt.to_text(df.iloc[:, col]))
+    set_display_formats(df, {k: v for k, v in formats.items() if k != name})
+
+
+def _hex_format(sample):
+    """根据样本推断十六进制格式，无法统一时返回None"""
+    prefixes, widths, has_lower, has_upper = set(), set(), False, False
+    for value in sample:
+        match = HEX_RE.match(value)
+        if match is None:
+            return None
+        prefix, digits = match.groups()
+        prefixes.add(prefix)
+        widths.add(len(digits))
+        has_lower = has_lower or any(c in 'abcdef' for c in digits)
+        has_upper = has_upper or any(c in 'ABCDEF' for c in digits)
+    if len(prefixes) != 1 or (has_lower and has_upper):
+        return None
+    width = widths.pop() if len(widths) == 1 else 0
+    return DisplayFormat('hex', prefix=prefixes.pop(), width=width, upper=has_upper)
+
+
+def _datetime_format(sample):
+    for pattern in DATETIME_PATTERNS:
+        try:
+            pd.to_datetime(pd.Series(sample), format=pattern)
+            return DisplayFormat('datetime', pattern=pattern)
+        except (ValueError, TypeError):
+            continue
+    return None
+
+
+def infer_format(series: pd.Series):
+    """推断列的原生类型显示格式，不适用时返回None"""
+    values = series.dropna()
+    if len(values) == 0:
+        return None
+    if is_integer_dtype(series.dtype):
+        if EPOCH_NAME_RE.search(str(series.name)) and values.min() >= EPOCH_MIN and values.max() <= EPOCH_MAX:
+            return DisplayFormat('epoch')
+        return None
+    if not is_object_dtype(series.dtype):
+        return None
+    sample = values.iloc[:SAMPLE_SIZE].tolist()
+    if not all(isinstance(v, str) for v in sample):
+        return None
+    if all(INT_RE.match(v) for v in sample):
+        return DisplayFormat('int')
+    if HEX_RE.match(sample[0]):
+        return _hex_format(sample)
+    return _datetime_format(sample)
+
+
+def convert_column(series: pd.Series, fmt: DisplayFormat):
+    """按格式把列转换为原生类型，无法与原始文本逐一对应时返回None"""
+    mask = series.isna().to_numpy()
+    present = series[~mask]
+    try:
+        if fmt.kind == 'epoch':
+            if not is_integer_dtype(series.dtype):
+                return None
+            converted = pd.to_datetime(series, unit='s')
+        elif fmt.kind == 'datetime':
+            layout = fixed_layout(fmt.pattern)
+            values = layout.parse(present.tolist()) if layout is not None else None
+            if values is None:
+                converted = pd.to_datetime(series, format=fmt.pattern, errors='coerce')
+            else:
+                converted = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+                converted[~mask] = values
+        else:
+            base = 16 if fmt.kind == 'hex' else 10
+            ints = [int(v, base) for v in present.to_numpy(dtype=object).tolist()]
+            unsigned = bool(ints) and max(ints) > INT64_MAX
+            values = np.array(ints, dtype=np.uint64 if unsigned else np.int64)
+            if mask.any():
+                converted = pd.Series(pd.NA, index=series.index, dtype='UInt64' if unsigned else 'Int64')
+                converted[~mask] = values
+            else:
+                converted = pd.Series(values, index=series.index)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+    if not np.array_equal(converted.isna().to_numpy(), mask):
+        return None
+    # 只有能够逐一还原为原始文本时才转换
+    original = present.astype(str).to_numpy(dtype=object)
+    restored = fmt.to_text(converted)[~mask].to_numpy(dtype=object)
+    if not np.array_equal(original, restored):
+        return None
+    return converted.rename(series.name)
+
+
+class TypeInferencer:
+    """取证数据的类型推断
+
+    识别十六进制地址、以文本出现的整数ID、日期时间文本和UNIX时间戳，转换为原生的
+    int64 / datetime64 列，显示格式记录在 DataFrame.attrs 中以还原原始文本。
+    由第一个非空数据块决定需要转换的列，后续数据块中无法转换的列会被放弃。
+    """
+
+    def __init__(self):
+        self.formats = None
+
+    def apply(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """推断并转换一个数据块"""
+        if len(chunk) == 0:
+            return chunk
+        if self.formats is None:
+            self.formats = {}
+            for name in chunk.columns:
+                fmt = infer_format(chunk[name])
+                if fmt is not None:
+                    self.formats[name] = fmt
+
+        converted = {}
+        for name, fmt in list(self.formats.items()):
+            new = convert_column(chunk[name], fmt) if name in chunk.columns else None
+            if new is None:
+                # 该列在后续数据中出现了无法还原的值，之后不再转换
+                del self.formats[name]
+                continue
+            converted[name] = new
+
+        chunk = chunk.copy(deep=False)
+        for name, new in converted.items():
+            chunk[name] = new
+        set_display_formats(chunk, self.formats)
+        return chunk
@@ -111,8 +111,8 @@ class CellPlugin(BasePlugin):
         """处理选中的单元格
         
         Args:
-            df: 当前DataFrame
-            selected_cells: 选中的单元格列表，每个元素为 (row, col) 元组
+            df: 选中的单元格所在的行，索引为数据集中的行号
+            selected_cells: 选中的单元格列表，每个元素为 (row, col) 元组，row 为 df 中的行位置
         
         Returns:
             处理后的DataFrame
@@ -121,13 +121,17 @@ class CellPlugin(BasePlugin):
 
 class TablePlugin(BasePlugin):
     """表格操作插件基类"""
+
+    # 只需处理当前显示（排序、筛选后）的行时设为True，此时不合并数据块，修改的单元格写回数据集；
+    # 默认传入整个数据集，返回的表格整体替换原数据
+    uses_view_rows = False
     
     @abstractmethod
     def process_table(self, df: pd.DataFrame) -> pd.DataFrame:
         """处理整个表格
         
         Args:
-            df: 当前DataFrame
+            df: 当前DataFrame，索引为数据集中的行号
         
         Returns:
             处理后的DataFrame
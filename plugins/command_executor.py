@@ -15,6 +15,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal
 import subprocess
 from lovelyform.plugins import CellPlugin
+from lovelyform.models.type_inference import get_display_formats
 from plugin.csv_rules import pslist_context_menu
 
 class CommandConfig:
@@ -154,20 +155,18 @@ class CustomCommandPlugin(CellPlugin):
             source_model = proxy_model.sourceModel()
             
             for row, col in selected_cells:
-                # 获取页面信息
-                page_size = getattr(main_window, 'page_size', 100)
-                current_page = getattr(main_window, 'current_page', 0)
-                
-                # 计算在完整数据集中的行索引
-                absolute_row = current_page * page_size + row
+                # 传入的行是 df 中的行位置
+                absolute_row = row
                 
                 # 获取列名并检查是否启用
                 col_name = df.columns[col]
                 if not self.is_column_enabled(col_name):
                     continue
                     
-                # 使用绝对行索引获取值，并去除引号
-                value = str(df.iloc[absolute_row, col]).strip('"')
+                # 使用绝对行索引获取值，原生类型列按原始格式还原，并去除引号
+                value = df.iloc[absolute_row, col]
+                fmt = get_display_formats(df).get(col_name)
+                value = (fmt.render_value(value) if fmt is not None else str(value)).strip('"')
                 
                 # 获取选择的路径并替换变量
                 path = self._replace_variables(self.paths.get(self.command_config.path_name, ""))
@@ -1,21 +1,26 @@
 from calendar import c
 import imp
 from numpy import imag
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_object_dtype
 from typing import List
 import re
 import importlib,json
 from lovelyform.plugins import CellPlugin, TablePlugin
-from PySide6.QtWidgets import QApplication, QTableView, QInputDialog, QStyledItemDelegate, QWidget, QVBoxLayout, QLabel, QLineEdit, QMessageBox
+from lovelyform.models.dtype_optimizer import prepare_assignment
+from lovelyform.models.type_inference import get_display_formats, demote_column, to_display_frame
+from lovelyform.models.column_profiler import profile_chunks, statistics_table
+from PySide6.QtWidgets import QInputDialog, QStyledItemDelegate, QWidget, QVBoxLayout, QLabel, QLineEdit, QMessageBox
 from PySide6.QtCore import Qt,QObject,Signal,QThread
-from PySide6.QtWidgets import QDialog, QApplication, QTreeWidget, QTreeWidgetItem
+from PySide6.QtWidgets import QDialog, QTreeWidget, QTreeWidgetItem
 from PySide6.QtGui import QColor
 import yaml
 import os
 import subprocess
 import shutil
 from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QDialog, QApplication, QTreeWidget, QTreeWidgetItem, QVBoxLayout
+from PySide6.QtWidgets import QDialog, QTreeWidget, QTreeWidgetItem, QVBoxLayout
 from plugin.vol2 import Vol2
 
 def get_image_info_file():
@@ -36,50 +41,27 @@ def readconfig():
     gimppath = config['tools']['gimp']['path']
     return python27, volatility2, volatility2_plugin, gimppath
 
+def _cell_text(df: pd.DataFrame, row: int, col: int) -> str:
+    """单元格的显示文本，原生类型列按原始格式还原"""
+    value = df.iloc[row, col]
+    fmt = get_display_formats(df).get(df.columns[col])
+    if fmt is not None:
+        return fmt.render_value(value)
+    return str(value)
+
 def get_sorted_cell_value(df: pd.DataFrame, row: int, col: int) -> str:
     """
     获取表格中指定单元格的实际值
     
     Args:
-        df: DataFrame对象（仅作为备用）
-        row: 视图中的行索引
-        col: 视图中的列索引
+        df: DataFrame对象
+        row: df 中的行位置（调用方只传入选中的单元格所在的行）
+        col: 列索引
         
     Returns:
-        str: 单元格的值
+        str: 单元格的值，原生类型列按原始格式还原
     """
-    try:
-        # 获取主窗口实例
-        main_window = QApplication.activeWindow()
-        if not main_window:
-            return str(df.iloc[row, col])
-            
-        # 获取表格视图
-        table_view = main_window.findChild(QTableView)
-        if not table_view:
-            return str(df.iloc[row, col])
-        
-        # 获取模型
-        model = table_view.model()
-        if not model:
-            return str(df.iloc[row, col])
-            
-        # 检查索引是否有效
-        if row < 0 or row >= model.rowCount() or col < 0 or col >= model.columnCount():
-            return str(df.iloc[row, col])
-        
-        # 直接从视图模型中获取值
-        index = model.index(row, col)
-        value = model.data(index)
-        
-        # 确保返回有效的值
-        if value is None or value == '':
-            return str(df.iloc[row, col])
-            
-        return str(value)
-    except Exception:
-        # 如果出现任何错误，回退到使用 DataFrame
-        return str(df.iloc[row, col])
+    return _cell_text(df, row, col)
 
 def set_sorted_cell_value(df: pd.DataFrame, row: int, col: int, value: str) -> None:
     """
@@ -87,47 +69,12 @@ def set_sorted_cell_value(df: pd.DataFrame, row: int, col: int, value: str) -> N
     
     Args:
         df: DataFrame对象
-        row: 视图中的行索引
-        col: 视图中的列索引
+        row: df 中的行位置
+        col: 列索引
         value: 要设置的值
     """
-    # 获取主窗口实例
-    main_window = QApplication.activeWindow()
-    if not main_window:
-        df.iloc[row, col] = value
-        return
-        
-    # 获取表格视图和代理模型
-    table_view = main_window.findChild(QTableView)
-    if not table_view:
-        df.iloc[row, col] = value
-        return
-        
-    proxy_model = table_view.model()
-    if not proxy_model:
-        df.iloc[row, col] = value
-        return
-        
-    source_model = proxy_model.sourceModel()
-    if not source_model:
-        df.iloc[row, col] = value
-        return
-        
-    # 获取页面偏移量
-    page_size = getattr(main_window, 'page_size', 100)
-    current_page = getattr(main_window, 'current_page', 0)
-    page_offset = current_page * page_size
-    
-    # 计算实际行索引（考虑分页）
-    absolute_row = row + page_offset
-    
-    # 将视图索引转换为源模型索引（考虑排序）
-    proxy_index = proxy_model.index(row, col)
-    source_index = proxy_model.mapToSource(proxy_index)
-    source_col = source_index.column()
-    
-    # 使用绝对行索引和源模型列索引设置值
-    df.iloc[absolute_row, source_col] = value
+    value = prepare_assignment(df, col, value)
+    df.iloc[row, col] = value
 
 class TimelinePlugin(CellPlugin):
     @property
@@ -151,17 +98,34 @@ class TimelinePlugin(CellPlugin):
         return ["*Time*", "*Date*", "Timestamp"]  # 只处理时间相关的列
 
     def process_cells(self, df: pd.DataFrame, selected_cells: List[tuple]) -> pd.DataFrame:
-        from datetime import datetime
+        from dateutil.tz import tzlocal
+        # 按列分组后整列向量化转换
+        by_column = {}
         for row, col in selected_cells:
-            try:
-                # 获取值并转换
-                value = get_sorted_cell_value(df, row, col)
-                timestamp = float(value)
-                dt = datetime.fromtimestamp(timestamp)
-                # 设置转换后的值
-                set_sorted_cell_value(df, row, col, dt.strftime("%Y-%m-%d %H:%M:%S"))
-            except (ValueError, TypeError):
-                pass  # 如果转换失败，保持原值不变
+            by_column.setdefault(col, []).append(row)
+
+        for col, rows in by_column.items():
+            rows = np.unique(rows)
+            series = df.iloc[rows, col]
+            fmt = get_display_formats(df).get(df.columns[col])
+            if fmt is not None and fmt.kind == 'datetime':
+                continue  # 已经是可读时间
+            if fmt is not None and fmt.kind == 'epoch':
+                times = series
+            else:
+                # 数值列直接使用原生值，文本列统一解析，无法转换的值保持不变
+                times = pd.to_datetime(pd.to_numeric(series, errors='coerce'), unit='s', errors='coerce')
+            valid = times.notna().to_numpy()
+            if not valid.any():
+                continue
+            text = times[valid].dt.tz_localize('UTC').dt.tz_convert(tzlocal()).dt.strftime("%Y-%m-%d %H:%M:%S")
+
+            # 转换后的列包含文本，先还原为 object 列再写入
+            if fmt is not None:
+                demote_column(df, col)
+            elif not is_object_dtype(df.iloc[:, col].dtype):
+                df.isetitem(col, df.iloc[:, col].astype(object))
+            df.iloc[rows[valid], col] = text.to_numpy(dtype=object)
         return df
 
 # 进程转储 >exe vol2
@@ -605,6 +569,9 @@ class MemprocfsNTFSExplorerPlugin(CellPlugin):
 # 权限信息
 
 class DataStatisticsPlugin(TablePlugin):
+    # 主窗口直接使用 DataManager 按数据版本缓存的统计结果，在后台统计
+    uses_data_profile = True
+
     @property
     def name(self) -> str:
         return "数据统计"
@@ -625,72 +592,8 @@ class DataStatisticsPlugin(TablePlugin):
         return None
         
     def process_table(self, df: pd.DataFrame) -> pd.DataFrame:
-        # 分离数值列和字符串列
-        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
-        string_cols = df.select_dtypes(include=['object', 'string']).columns
-        
-        result_dfs = []
-        
-        # 处理数值列
-        if len(numeric_cols) > 0:
-            # 计算基本统计信息
-            numeric_stats = df[numeric_cols].describe()
-            
-            # 添加更多统计信息
-            additional_numeric_stats = pd.DataFrame({
-                col: {
-                    '非空值数': df[col].count(),
-                    '空值数': df[col].isna().sum(),
-                    '空值比例': f"{(df[col].isna().sum() / len(df) * 100):.2f}%",
-                    '唯一值数': df[col].nunique(),
-                    '众数': df[col].mode().iloc[0] if not df[col].mode().empty else None,
-                    '变异系数': f"{(df[col].std() / df[col].mean() * 100):.2f}%" if df[col].mean() != 0 else "N/A",
-                } for col in numeric_cols
-            })
-            
-            # 合并数值列统计信息
-            numeric_final = pd.concat([numeric_stats, additional_numeric_stats])
-            numeric_final.insert(0, '统计类型', '数值统计')
-            result_dfs.append(numeric_final)
-        
-        # 处理字符串列
-        if len(string_cols) > 0:
-            string_stats = pd.DataFrame({
-                col: {
-                    '非空值数': df[col].count(),
-                    '空值数': df[col].isna().sum(),
-                    '空值比例': f"{(df[col].isna().sum() / len(df) * 100):.2f}%",
-                    '唯一值数': df[col].nunique(),
-                    '最常见值': df[col].mode().iloc[0] if not df[col].mode().empty else None,
-                    '最常见值出现次数': df[col].value_counts().iloc[0] if not df[col].value_counts().empty else 0,
-                    '最长字符串长度': df[col].str.len().max() if df[col].dtype == 'object' else None,
-                    '最短字符串长度': df[col].str.len().min() if df[col].dtype == 'object' else None,
-                    '平均字符串长度': f"{df[col].str.len().mean():.1f}" if df[col].dtype == 'object' else None,
-                } for col in string_cols
-            })
-            string_stats.insert(0, '统计类型', '字符串统计')
-            result_dfs.append(string_stats)
-        
-        if not result_dfs:
-            return pd.DataFrame({"消息": ["没有找到可以统计的列"]})
-            
-        # 合并所有统计结果
-        final_stats = pd.concat(result_dfs)
-        
-        # 对索引进行重命名，使其更易读
-        index_map = {
-            'count': '计数',
-            'mean': '平均值',
-            'std': '标准差',
-            'min': '最小值',
-            '25%': '25%分位数',
-            '50%': '中位数',
-            '75%': '75%分位数',
-            'max': '最大值',
-        }
-        final_stats.index = final_stats.index.map(lambda x: index_map.get(x, x))
-        
-        return final_stats
+        # 每列只遍历一次，各列并行统计
+        return statistics_table(profile_chunks([df]))
 
 # 全局插件，替换指定关键词
 class ReplaceKeywordPlugin(TablePlugin):
@@ -727,6 +630,14 @@ class ReplaceKeywordPlugin(TablePlugin):
         if not ok or not target_text:
             return df
             
+        # 原生类型列按原始文本匹配，含有关键词的列先还原为文本再替换
+        formats = get_display_formats(df)
+        df = df.copy(deep=False)
+        for col, name in enumerate(df.columns):
+            fmt = formats.get(name)
+            if fmt is not None and fmt.may_contain(source_text) and (fmt.to_text(df.iloc[:, col]) == source_text).any():
+                demote_column(df, col)
+
         # 在原表格内直接替换关键词
         df = df.replace(source_text, target_text)
         return df
@@ -799,6 +710,9 @@ class HighlightKeywordPlugin(TablePlugin):
                 
             # 清空之前的高亮关键词
             self.highlight_keywords.clear()
+
+            # 原生类型列按原始文本匹配
+            df = to_display_frame(df)
                 
             # 遍历所有配置的关键词
             for config in highlight_config:
@@ -0,0 +1,17 @@
+import importlib.machinery
+import os
+import sys
+import types
+
+# 仓库根目录即 lovelyform 包。把它直接登记为 lovelyform 包，检出目录不必叫 lovelyform，
+# 也不执行包的 __init__（它会导入界面和项目根目录下的 ui、plugin 包）
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if 'lovelyform' not in sys.modules:
+    package = types.ModuleType('lovelyform')
+    package.__path__ = [ROOT]
+    package.__spec__ = importlib.machinery.ModuleSpec('lovelyform', None, is_package=True)
+    package.__spec__.submodule_search_locations = [ROOT]
+    sys.modules['lovelyform'] = package
+# pytest 按目录名导入根目录的 __init__.py，同样使用上面登记的包
+sys.modules.setdefault(os.path.basename(ROOT), sys.modules['lovelyform'])
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+from lovelyform.models.chunk_store import ChunkedStore
+from lovelyform.models.type_inference import TypeInferencer, get_display_formats
+
+
+def make_chunks(count=4, rows=50, seed=0):
+    rng = np.random.default_rng(seed)
+    inferencer = TypeInferencer()
+    chunks = []
+    for i in range(count):
+        chunk = pd.DataFrame({
+            'PID': rng.integers(0, 1000, rows),
+            'Name': rng.choice(['lsass.exe', 'svchost.exe', 'cmd.exe'], rows),
+            'Offset(V)': ['0x%08x' % v for v in rng.integers(0x1000, 0xffffffff, rows)],
+        })
+        chunks.append(inferencer.apply(chunk))
+    return chunks
+
+
+@pytest.fixture
+def store():
+    store = ChunkedStore()
+    for chunk in make_chunks():
+        store.append(chunk)
+    return store
+
+
+def format_dicts(df):
+    return {name: fmt.to_dict() for name, fmt in get_display_formats(df).items()}
+
+
+def expected_frame(store):
+    return pd.concat([chunk for _, chunk in store.iter_chunks()], ignore_index=True)
+
+
+def test_append_keeps_chunks_and_offsets(store):
+    assert len(store) == 200
+    assert store.chunk_count == 4
+    assert [start for start, _ in store.iter_chunks()] == [0, 50, 100, 150]
+    assert list(store.columns) == ['PID', 'Name', 'Offset(V)']
+    assert 'Offset(V)' in store.display_formats
+
+
+def test_append_drops_header_only_chunk():
+    store = ChunkedStore()
+    store.append(pd.DataFrame(columns=['a', 'b']))
+    store.append(pd.DataFrame({'a': [1], 'b': [2]}))
+    assert store.chunk_count == 1
+    assert len(store) == 1
+
+
+def test_slice_across_chunks(store):
+    expected = expected_frame(store)
+    result = store.slice(30, 170)
+    assert list(result.index) == list(range(30, 170))
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.iloc[30:170].reset_index(drop=True))
+
+
+def test_take_unordered_rows(store):
+    expected = expected_frame(store)
+    rows = np.array([199, 3, 120, 50, 49, 3, 151])
+    result = store.take(rows)
+    assert list(result.index) == rows.tolist()
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.iloc[rows].reset_index(drop=True))
+    assert format_dicts(result) == format_dicts(expected)
+
+
+def test_set_value_updates_one_cell(store):
+    expected = expected_frame(store)
+    assert store.set_value(120, 1, 'explorer.exe') is False
+    expected.iloc[120, 1] = 'explorer.exe'
+    result = store.consolidate()
+    assert (result['Name'].astype(object) == expected['Name'].astype(object)).all()
+
+
+def test_set_value_parses_native_columns(store):
+    assert store.set_value(75, 2, '0x0000abcd') is False
+    assert store.take([75]).iloc[0, 2] == 0xabcd
+    assert 'Offset(V)' in store.display_formats
+
+
+def test_set_value_demotes_unparsable_column(store):
+    assert store.set_value(75, 2, 'not an address') is True
+    assert 'Offset(V)' not in store.display_formats
+    for _, chunk in store.iter_chunks():
+        assert chunk['Offset(V)'].dtype == object
+    assert store.take([75]).iloc[0, 2] == 'not an address'
+
+
+def test_set_value_leaves_snapshots_untouched(store):
+    snapshot = list(store.iter_chunks())
+    copies = [chunk.copy() for _, chunk in snapshot]
+    store.set_value(10, 1, 'explorer.exe')
+    store.set_value(160, 2, 'not an address')
+    for (_, chunk), copy in zip(snapshot, copies):
+        pd.testing.assert_frame_equal(chunk, copy)
+        assert format_dicts(chunk) == format_dicts(copy)
+
+
+def test_set_values_writes_cells_across_chunks(store):
+    rows = np.array([3, 60, 61, 199])
+    assert store.set_values(2, rows, ['0x00000010', '0x00000020', '', '0x00000030']) is False
+    assert store.set_values(0, rows, [1, 2, 3, 4]) is False
+    assert store.set_values(1, rows[:2], ['new.exe', 'cmd.exe']) is False
+    result = store.take(rows)
+    assert result['Offset(V)'].tolist()[:2] == [0x10, 0x20] and pd.isna(result['Offset(V)'].iloc[2])
+    assert result['PID'].tolist() == [1, 2, 3, 4]
+    assert result['Name'].astype(object).tolist()[:2] == ['new.exe', 'cmd.exe']
+    assert 'Offset(V)' in store.display_formats
+
+
+def test_set_values_demotes_unparsable_column_in_every_chunk(store):
+    snapshot = list(store.iter_chunks())
+    copies = [chunk.copy() for _, chunk in snapshot]
+    assert store.set_values(2, [10, 170], ['0x00000010', 'not an address']) is True
+    assert 'Offset(V)' not in store.display_formats
+    assert store.take([10, 170])['Offset(V)'].tolist() == ['0x00000010', 'not an address']
+    assert store.set_values(0, [20], ['text']) is False
+    assert store.take([20, 21])['PID'].tolist()[0] == 'text'
+    for (_, chunk), copy in zip(snapshot, copies):
+        pd.testing.assert_frame_equal(chunk, copy)
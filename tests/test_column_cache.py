@@ -0,0 +1,92 @@
+import os
+import pandas as pd
+import pytest
+from lovelyform.models.column_cache import ColumnarCache, file_signature
+from lovelyform.models.type_inference import TypeInferencer, get_display_formats
+
+OPTIONS = {'encoding': 'utf-8'}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ColumnarCache(cache_dir=str(tmp_path / 'cache'))
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('PID,Offset(V)\n4,0x0000fa80\n8,0x0000fb00\n', encoding='utf-8')
+    return str(path)
+
+
+def parsed(path):
+    return TypeInferencer().apply(pd.read_csv(path, dtype={'Offset(V)': object}))
+
+
+def rewrite(path, text):
+    """修改文件内容，并确保修改时间与之前不同"""
+    stat = os.stat(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_store_and_lookup(cache, csv_file):
+    df = parsed(csv_file)
+    path = cache.store(csv_file, OPTIONS, df)
+    assert cache.lookup(csv_file, OPTIONS) == path
+    loaded = cache.load(path)
+    pd.testing.assert_frame_equal(loaded, df.reset_index(drop=True))
+    assert {k: v.to_dict() for k, v in get_display_formats(loaded).items()} == \
+        {k: v.to_dict() for k, v in get_display_formats(df).items()}
+
+
+def test_read_options_are_part_of_key(cache, csv_file):
+    cache.store(csv_file, OPTIONS, parsed(csv_file))
+    assert cache.lookup(csv_file, {'encoding': 'gbk'}) is None
+
+
+def test_modified_file_misses_cache(cache, csv_file):
+    cache.store(csv_file, OPTIONS, parsed(csv_file))
+    rewrite(csv_file, 'PID,Offset(V)\n4,0x0000fa80\n')
+    assert cache.lookup(csv_file, OPTIONS) is None
+
+
+def test_signature_taken_before_reading(cache, csv_file):
+    signature = file_signature(csv_file)
+    df = parsed(csv_file)
+    rewrite(csv_file, 'PID,Offset(V)\n1,0x1\n2,0x2\n3,0x3\n')
+    # 读取期间文件被修改：按读取前的状态保存的缓存不会被新文件命中
+    cache.store(csv_file, OPTIONS, df, signature)
+    assert cache.lookup(csv_file, OPTIONS) is None
+    assert cache.lookup(csv_file, OPTIONS, signature) is not None
+
+
+def test_store_replaces_stale_entries(cache, csv_file):
+    old = cache.store(csv_file, OPTIONS, parsed(csv_file))
+    sidecar = cache.sidecar_path(csv_file, OPTIONS)
+    open(sidecar, 'wb').close()
+    rewrite(csv_file, 'PID,Offset(V)\n4,0x0000fa80\n')
+    new = cache.store(csv_file, OPTIONS, parsed(csv_file))
+    assert new != old
+    assert not os.path.exists(old)
+    assert not os.path.exists(sidecar)
+    assert cache.lookup(csv_file, OPTIONS) == new
+
+
+def test_invalidate(cache, csv_file, tmp_path):
+    other = tmp_path / 'other.csv'
+    other.write_text('a\n1\n', encoding='utf-8')
+    cache.store(csv_file, OPTIONS, parsed(csv_file))
+    cache.store(str(other), OPTIONS, pd.read_csv(other))
+    assert cache.invalidate(csv_file) == 1
+    assert cache.lookup(csv_file, OPTIONS) is None
+    assert cache.lookup(str(other), OPTIONS) is not None
+    cache.invalidate()
+    assert cache.lookup(str(other), OPTIONS) is None
+
+
+def test_size_limit_evicts_oldest(tmp_path, csv_file):
+    cache = ColumnarCache(cache_dir=str(tmp_path / 'cache'), max_bytes=1)
+    cache.store(csv_file, OPTIONS, parsed(csv_file))
+    assert cache.lookup(csv_file, OPTIONS) is None
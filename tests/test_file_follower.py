@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+from lovelyform.models import file_follower
+from lovelyform.models.file_follower import FileFollower, FileTruncatedError, last_record_end
+
+HEADER = b'PID,Name,Note\n'
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'live.csv'
+    path.write_bytes(HEADER)
+    return path
+
+
+def append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def follower(path):
+    return FileFollower(str(path), ['PID', 'Name', 'Note'], len(HEADER), {'encoding': 'utf-8'})
+
+
+def test_poll_returns_only_new_complete_records(path):
+    tail = follower(path)
+    assert tail.poll() is None
+    append(path, b'4,System,a\n8,smss')
+    chunk = tail.poll()
+    assert chunk.values.tolist() == [[4, 'System', 'a']]
+    assert tail.poll() is None  # 未写完的记录留到下一次
+    append(path, b'.exe,b\n12,csrss.exe,c\n')
+    chunk = tail.poll()
+    assert chunk.values.tolist() == [[8, 'smss.exe', 'b'], [12, 'csrss.exe', 'c']]
+    assert tail.offset == path.stat().st_size
+
+
+def test_quoted_newline_waits_for_closing_quote(path):
+    tail = follower(path)
+    append(path, b'4,System,"first\nsecond')
+    assert tail.poll() is None
+    append(path, b'"\n8,smss.exe,x\n')
+    chunk = tail.poll()
+    assert chunk['Note'].tolist() == ['first\nsecond', 'x']
+
+
+def test_large_append_is_read_in_batches(path, monkeypatch):
+    monkeypatch.setattr(file_follower, 'MAX_READ_BYTES', 64)
+    append(path, b''.join(b'%d,proc%d.exe,note\n' % (i, i) for i in range(50)))
+    tail = follower(path)
+    chunks = []
+    while (chunk := tail.poll()) is not None:
+        chunks.append(chunk)
+    assert len(chunks) > 1
+    assert pd.concat(chunks)['PID'].tolist() == list(range(50))
+
+
+def test_truncated_file_raises(path):
+    append(path, b'4,System,a\n')
+    tail = follower(path)
+    tail.poll()
+    path.write_bytes(HEADER)
+    with pytest.raises(FileTruncatedError):
+        tail.poll()
+
+
+def test_last_record_end(path):
+    append(path, b'4,System,"a\nb"\n8,smss')
+    size = path.stat().st_size
+    assert last_record_end(str(path), size) == size - len(b'8,smss')
+    assert last_record_end(str(path), len(HEADER) + 12) == len(HEADER)  # 停在引号内的换行之后
+    assert last_record_end(str(path), 0) == 0
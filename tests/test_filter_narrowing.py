@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from lovelyform.models import filter_engine
+from lovelyform.models.chunk_store import ChunkedStore
+from lovelyform.models.filter_engine import ContainsFilter, RangeFilter, evaluate_filters, narrow_rows
+from lovelyform.models.type_inference import TypeInferencer
+
+
+@pytest.fixture
+def store():
+    rng = np.random.default_rng(5)
+    inferencer = TypeInferencer()
+    store = ChunkedStore()
+    for _ in range(4):
+        chunk = pd.DataFrame({
+            'PID': rng.integers(0, 5000, 300),
+            'Name': rng.choice(['lsass.exe', 'svchost.exe', 'explorer.exe', 'cmd.exe'], 300),
+            'Offset(V)': ['0x%012x' % v for v in rng.integers(0xfa8000000000, 0xfa80ffffffff, 300)],
+        })
+        store.append(inferencer.apply(chunk))
+    return store
+
+
+def full_scan(store, predicate):
+    return evaluate_filters([predicate], store.iter_chunks(), store.display_formats).rows
+
+
+@pytest.mark.parametrize('previous, typed', [
+    ('s', 'sv'), ('sv', 'svchost'), ('EXE', '.exe'), ('0xfa8', '0xfa80a'), ('1', '12'),
+])
+def test_narrowing_matches_full_scan(store, monkeypatch, previous, typed):
+    monkeypatch.setattr(filter_engine, 'TAKE_BATCH', 100)
+    old = ContainsFilter(previous)
+    new = ContainsFilter(typed)
+    assert new.narrows(old)
+    narrowed = narrow_rows([new], full_scan(store, old), store.take, store.display_formats)
+    assert narrowed.rows.tolist() == full_scan(store, new).tolist()
+
+
+@pytest.mark.parametrize('previous, new', [
+    (ContainsFilter('svc'), ContainsFilter('sv')),                  # 删除了字符
+    (ContainsFilter('exe'), ContainsFilter('cmd')),                 # 换了关键词
+    (ContainsFilter('exe', 'Name'), ContainsFilter('exe.', None)),  # 换了列
+    (RangeFilter('PID', '1', '10'), RangeFilter('PID', '2', '9')),
+])
+def test_does_not_narrow(previous, new):
+    assert not new.narrows(previous)
+
+
+def test_narrow_rows_can_be_cancelled(store, monkeypatch):
+    monkeypatch.setattr(filter_engine, 'TAKE_BATCH', 100)
+    rows = np.arange(len(store))
+    calls = []
+
+    def cancelled():
+        calls.append(1)
+        return len(calls) > 2
+
+    assert narrow_rows([ContainsFilter('exe')], rows, store.take, store.display_formats, cancelled) is None
+    assert len(calls) == 3
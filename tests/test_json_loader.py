@@ -0,0 +1,75 @@
+import gzip
+import io
+import json
+import pandas as pd
+import pytest
+from lovelyform.models.compression import open_csv_stream
+from lovelyform.models.json_loader import iter_json_chunks, json_format
+
+
+def load(text, fmt='json', chunk_size=10000):
+    chunks = list(iter_json_chunks(io.BytesIO(text.encode('utf-8')), fmt, 'utf-8', chunk_size))
+    return pd.concat(chunks, ignore_index=True), chunks
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('pslist.json', 'json'), ('PSLIST.JSON.gz', 'json'), ('events.jsonl', 'jsonl'),
+    ('events.ndjson.bz2', 'jsonl'), ('pslist.csv', None),
+])
+def test_json_format(name, expected):
+    assert json_format(name) == expected
+
+
+def test_records_array_with_nested_values():
+    frame, _ = load('[{"PID": 4, "Name": "System", "Args": ["-k", "x"]}, {"PID": 8, "Extra": {"a": 1}}]')
+    assert list(frame.columns) == ['PID', 'Name', 'Args', 'Extra']
+    assert frame['PID'].tolist() == [4, 8]
+    assert frame['Args'][0] == '["-k", "x"]'
+    assert frame['Extra'][1] == '{"a": 1}'
+
+
+def test_columns_and_rows_object_in_chunks():
+    rows = [[i, 'proc%d' % i] for i in range(25)]
+    text = json.dumps({'rows': rows, 'columns': ['PID', 'Name']})  # columns 在 rows 之后
+    frame, chunks = load(text, chunk_size=10)
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert list(frame.columns) == ['PID', 'Name']
+    assert frame.values.tolist() == rows
+
+
+def test_columns_without_rows_keep_header():
+    frame, chunks = load('{"columns": ["PID", "Name"], "rows": []}')
+    assert len(chunks) == 1
+    assert list(frame.columns) == ['PID', 'Name']
+    assert len(frame) == 0
+
+
+@pytest.mark.parametrize('text, fmt', [
+    ('[{"PID": 4}, null, {"PID": 8}]', 'json'),
+    ('{"columns": ["PID"], "rows": [[4], null, [8]]}', 'json'),
+    ('{"PID": 4}\nnull\n{"PID": 8}\n', 'jsonl'),
+])
+def test_null_record_is_missing_row(text, fmt):
+    frame, _ = load(text, fmt)
+    assert list(frame.columns) == ['PID']
+    assert len(frame) == 3
+    assert frame['PID'].isna().tolist() == [False, True, False]
+
+
+def test_json_lines_skip_blank_lines_and_report_bad_line():
+    frame, _ = load('{"a": 1}\n\n{"a": 2, "b": "x"}\n', 'jsonl')
+    assert frame['a'].tolist() == [1, 2]
+    with pytest.raises(ValueError, match='第 2 行'):
+        load('{"a": 1}\n{"a": \n', 'jsonl')
+
+
+def test_compressed_json_lines(tmp_path):
+    path = tmp_path / 'events.jsonl.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for i in range(100):
+            f.write(json.dumps({'id': i, 'name': '事件%d' % i}) + '\n')
+    with open_csv_stream(str(path)) as (stream, _):
+        chunks = list(iter_json_chunks(stream, json_format(str(path)), 'utf-8', 30))
+    frame = pd.concat(chunks, ignore_index=True)
+    assert [len(chunk) for chunk in chunks] == [30, 30, 30, 10]
+    assert frame['name'].tolist() == ['事件%d' % i for i in range(100)]
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from lovelyform.models import parallel_loader
+from lovelyform.models.parallel_loader import (iter_partitions, next_record_start, parse_range,
+                                               parallel_read_csv, supports_parallel)
+from lovelyform.models.type_inference import TypeInferencer, get_display_formats
+
+
+@pytest.fixture
+def small_parts(monkeypatch):
+    # 分段远小于字段内容，切分点会大量落在带引号的多行字段中
+    monkeypatch.setattr(parallel_loader, 'FIRST_PART_SIZE', 64)
+    monkeypatch.setattr(parallel_loader, 'PART_SIZE', 97)
+    monkeypatch.setattr(parallel_loader, 'SCAN_WINDOW', 16)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    rng = np.random.default_rng(3)
+    n = 300
+    notes = rng.choice(['plain', 'line\nbreak', 'say ""hi""\nnext', 'a,b\n\nc', '"'], n)
+    frame = pd.DataFrame({
+        'PID': np.arange(n),
+        'Offset(V)': ['0x%012x' % v for v in rng.integers(0xfa8000000000, 0xfa80ffffffff, n)],
+        'Note': [note.replace('""', '"') for note in notes],
+    })
+    path = tmp_path / 'data.csv'
+    frame.to_csv(path, index=False)
+    return str(path), frame
+
+
+def test_partitions_align_to_records(small_parts, csv_file):
+    path, frame = csv_file
+    data = open(path, 'rb').read()
+    data_start = next_record_start(data, len(data), 0, False)
+    parts = list(iter_partitions(data, len(data), data_start))
+    assert len(parts) > 10
+    assert parts[0][0] == data_start and parts[-1][1] == len(data)
+    assert all(end == start for (_, end), (start, _) in zip(parts, parts[1:]))
+    columns = list(frame.columns)
+    chunks = [parse_range(path, start, end, columns, {})[0] for start, end in parts]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), frame)
+
+
+def test_next_record_start_skips_quoted_newlines():
+    data = b'a,b\n1,"x\ny"\n2,z\n'
+    assert next_record_start(data, len(data), 0, False) == 4
+    assert next_record_start(data, len(data), 7, True) == 12
+    assert next_record_start(data, len(data), 16, False) == len(data)
+
+
+def test_parallel_read_falls_back_in_process(small_parts, monkeypatch, csv_file):
+    path, frame = csv_file
+
+    def unavailable(*args):
+        raise RuntimeError('no worker processes')
+        yield
+
+    monkeypatch.setattr(parallel_loader, '_pool_results', unavailable)
+    inferencer = TypeInferencer()
+    results = list(parallel_read_csv(path, {'encoding': 'utf-8'}, workers=2, inferencer=inferencer))
+    positions = [position for _, position in results]
+    assert positions == sorted(positions) and positions[-1] == len(open(path, 'rb').read())
+    chunks = [chunk for chunk, _ in results]
+    assert all('Offset(V)' in get_display_formats(chunk) for chunk in chunks)
+    result = pd.concat(chunks, ignore_index=True)
+    assert result['Note'].tolist() == frame['Note'].tolist()
+    assert get_display_formats(chunks[0])['Offset(V)'].render(result['Offset(V)']).tolist() == \
+        frame['Offset(V)'].tolist()
+
+
+@pytest.mark.parametrize('options, expected', [
+    ({}, True), ({'encoding': 'gbk'}, True), ({'encoding': 'utf-16'}, False),
+    ({'skiprows': 2}, False), ({'names': ['a']}, False),
+])
+def test_supports_parallel(options, expected):
+    assert supports_parallel(options) == expected
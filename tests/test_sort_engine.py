@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from lovelyform.models.csv_index import LazyCsvStore
+from lovelyform.models.sort_engine import SortIndex, compute_permutation
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(1)
+    n = 500
+    number = rng.integers(0, 20, n).astype(float)
+    number[rng.random(n) < 0.1] = np.nan
+    text = rng.choice(['alpha', 'Beta', 'gamma', 'delta', None], n)
+    return pd.DataFrame({'number': number, 'text': text, 'id': np.arange(n)})
+
+
+def chunked(frame, size=128):
+    return [(start, frame.iloc[start:start + size]) for start in range(0, len(frame), size)]
+
+
+def sort(frame, keys):
+    permutation, _ = compute_permutation(keys, chunked(frame), {}, natural=False)
+    return permutation
+
+
+@pytest.mark.parametrize('ascending', [True, False])
+def test_single_key_matches_sort_values(frame, ascending):
+    permutation = sort(frame, (('number', ascending),))
+    expected = frame.sort_values('number', ascending=ascending, kind='stable', na_position='last')
+    assert permutation.tolist() == expected.index.tolist()
+
+
+@pytest.mark.parametrize('ascending', [True, False])
+def test_text_key_matches_sort_values(frame, ascending):
+    permutation = sort(frame, (('text', ascending),))
+    expected = frame.sort_values('text', ascending=ascending, kind='stable', na_position='last')
+    assert permutation.tolist() == expected.index.tolist()
+
+
+@pytest.mark.parametrize('ascending', [(True, True), (True, False), (False, True), (False, False)])
+def test_multiple_keys_match_sort_values(frame, ascending):
+    keys = (('text', ascending[0]), ('number', ascending[1]))
+    permutation = sort(frame, keys)
+    expected = frame.sort_values(['text', 'number'], ascending=list(ascending), kind='stable', na_position='last')
+    assert permutation.tolist() == expected.index.tolist()
+
+
+def test_reverse_from_cached_permutation(frame):
+    index = SortIndex(natural=False)
+    keys = (('number', True),)
+    permutation, ranks = compute_permutation(keys, chunked(frame), {}, natural=False)
+    index.store(keys, len(frame), index.version, permutation, ranks)
+    reverse = index.lookup((('number', False),), len(frame))
+    expected = frame.sort_values('number', ascending=False, kind='stable', na_position='last')
+    assert reverse.tolist() == expected.index.tolist()
+
+
+def test_invalidate_drops_column(frame):
+    index = SortIndex(natural=False)
+    keys = (('number', True),)
+    permutation, ranks = compute_permutation(keys, chunked(frame), {}, natural=False)
+    index.store(keys, len(frame), index.version, permutation, ranks)
+    assert index.lookup(keys, len(frame)) is not None
+    index.invalidate('number')
+    assert index.lookup(keys, len(frame)) is None
+    assert index.cached_ranks(len(frame)) == {}
+
+
+def test_natural_order():
+    frame = pd.DataFrame({'name': ['file10', 'file2', 'File1', '0x100', '0xff']})
+    permutation, _ = compute_permutation((('name', True),), chunked(frame), {}, natural=True)
+    assert frame['name'].iloc[permutation].tolist() == ['0xff', '0x100', 'File1', 'file2', 'file10']
+
+
+def test_lazy_store_parses_only_key_columns(tmp_path, frame):
+    path = tmp_path / 'data.csv'
+    frame.to_csv(path, index=False)
+    store = LazyCsvStore.open(str(path))
+    try:
+        chunks = list(store.iter_chunks(rows_per_chunk=128, columns=['number']))
+        permutation, _ = compute_permutation((('number', True),), chunks, {}, natural=False)
+    finally:
+        store.close()
+    assert all(list(chunk.columns) == ['number'] for _, chunk in chunks)
+    expected = frame.sort_values('number', kind='stable', na_position='last')
+    assert permutation.tolist() == expected.index.tolist()
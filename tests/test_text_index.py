@@ -0,0 +1,92 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from lovelyform.models.filter_engine import TextMatcher
+from lovelyform.models.text_index import TextIndex, PENDING_LIMIT, gram_keys
+from lovelyform.models.type_inference import TypeInferencer, get_display_formats
+
+KEYWORDS = ['exe', 'SVC', 'host.e', 'ls', 'x', 'system32\\', 'nomatch', 'ab', 'e.E']
+
+
+def make_frame(rows=3000, seed=2):
+    rng = np.random.default_rng(seed)
+    words = ['lsass.exe', 'svchost.exe', 'Explorer.EXE', 'cmd', 'C:\\Windows\\System32\\', 'ab', '']
+    path = rng.choice(words, rows).astype(object)
+    path[rng.random(rows) < 0.05] = None
+    suffix = rng.integers(0, 500, rows).astype(str)
+    name = np.char.add(rng.choice(['svc', 'host', 'proc'], rows), suffix)
+    frame = pd.DataFrame({
+        'Path': path,
+        'Name': pd.Categorical(name),
+        'Offset(V)': ['0x%08x' % v for v in rng.integers(0x1000, 0xffffffff, rows)],
+        'PID': rng.integers(0, 5000, rows),
+    })
+    return TypeInferencer().apply(frame)
+
+
+def brute_force(series, keyword):
+    return series.astype(object).str.lower().str.contains(keyword.lower(), regex=False, na=False).to_numpy(dtype=bool)
+
+
+@pytest.fixture
+def frame():
+    return make_frame()
+
+
+@pytest.fixture
+def index(frame):
+    chunks = [(start, frame.iloc[start:start + 1000]) for start in range(0, len(frame), 1000)]
+    return TextIndex.build(chunks, get_display_formats(frame))
+
+
+def test_only_string_columns_are_indexed(index):
+    assert set(index.columns) == {'Path', 'Name'}
+    assert index.match('PID', TextMatcher('1')) is None
+    assert index.match('Offset(V)', TextMatcher('0x')) is None
+
+
+@pytest.mark.parametrize('keyword', KEYWORDS)
+def test_match_equals_brute_force(frame, index, keyword):
+    for name in ('Path', 'Name'):
+        hits = index.match(name, TextMatcher(keyword))
+        assert hits.tolist() == brute_force(frame[name], keyword).tolist()
+
+
+def test_candidates_cover_matching_texts(index):
+    column = index.columns['Name']
+    texts = column.texts.values.tolist()
+    for keyword in ('svc', 'host1', 'proc49', 'zzz'):
+        candidates = set(column.segments[0].candidates(gram_keys(keyword)).tolist())
+        expected = {i for i, text in enumerate(texts) if keyword in text}
+        assert expected <= candidates
+        assert len(candidates) < len(texts)
+
+
+def test_regex_match(frame, index):
+    hits = index.match('Path', TextMatcher(r'^(?:ls|svc).*\.exe$', regex=True))
+    expected = frame['Path'].str.contains(r'^(?:ls|svc).*\.exe$', case=False, regex=True, na=False)
+    assert hits.tolist() == expected.tolist()
+
+
+def test_append_and_update_cell(frame, index):
+    more = make_frame(rows=PENDING_LIMIT + 500, seed=3)
+    index.append(more)
+    combined = pd.concat([frame, more], ignore_index=True)
+    index.update_cell(5, 'Path', 'Renamed.EXE')
+    combined.loc[5, 'Path'] = 'Renamed.EXE'
+    index.update_cell(len(frame) + 1, 'Path', '')
+    combined.loc[len(frame) + 1, 'Path'] = None
+    for keyword in KEYWORDS + ['renamed']:
+        hits = index.match('Path', TextMatcher(keyword))
+        assert hits.tolist() == brute_force(combined['Path'], keyword).tolist()
+
+
+def test_save_and_load(tmp_path, frame, index):
+    path = str(tmp_path / 'missing' / 'index.npz')
+    assert index.save(path)
+    loaded = TextIndex.load(path, get_display_formats(frame))
+    assert loaded.rows == len(frame)
+    for keyword in KEYWORDS:
+        assert loaded.match('Path', TextMatcher(keyword)).tolist() == brute_force(frame['Path'], keyword).tolist()
+    assert os.listdir(tmp_path / 'missing') == ['index.npz']
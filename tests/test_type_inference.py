@@ -0,0 +1,75 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from lovelyform.models.type_inference import (TypeInferencer, get_display_formats, to_display_frame,
+                                              demote_column)
+
+CSV_TEXT = '''PID,Offset(V),Base,CreateTime,LoadTime,Name,Timestamp
+4,0xfa8000e3c060,0x00001000,2023-01-05 10:00:01 UTC+0000,2023-01-05T10:00:01.250000,System,1672912801
+368,0xfa8001a2b040,0x0000ffff,2023-01-05 10:00:03 UTC+0000,2023-01-05T10:00:03.000001,smss.exe,1672912803
+472,0xfa80ffffffff,,,2023-01-05T10:00:09.999999,csrss.exe,1672912809
+520,0xffffffffffffffff,0x7fff0000,2023-01-05 10:00:11 UTC+0000,,wininit.exe,1672912811
+'''
+
+
+def read(text):
+    return pd.read_csv(io.StringIO(text))
+
+
+def kinds(df):
+    return {name: fmt.kind for name, fmt in get_display_formats(df).items()}
+
+
+def test_infers_native_columns():
+    df = TypeInferencer().apply(read(CSV_TEXT))
+    assert kinds(df) == {'Offset(V)': 'hex', 'Base': 'hex', 'CreateTime': 'datetime',
+                         'LoadTime': 'datetime', 'Timestamp': 'epoch'}
+    assert df['Offset(V)'].dtype == np.uint64  # 超出 int64 的地址使用无符号类型
+    assert str(df['Base'].dtype) == 'Int64'    # 有缺失值时使用可空整数
+    assert df['CreateTime'].dtype == 'datetime64[ns]'
+    assert df['Timestamp'].dtype == 'datetime64[ns]'
+    assert df['Name'].dtype == object
+
+
+def test_text_round_trip():
+    df = TypeInferencer().apply(read(CSV_TEXT))
+    assert to_display_frame(df).to_csv(index=False, lineterminator='\n') == CSV_TEXT
+
+
+def test_render_matches_original_text():
+    original = read(CSV_TEXT)
+    df = TypeInferencer().apply(original)
+    for name, fmt in get_display_formats(df).items():
+        expected = original[name].fillna('').astype(str).tolist()
+        assert fmt.render(df[name]).tolist() == expected
+        assert [fmt.render_value(v) for v in df[name]] == expected
+
+
+@pytest.mark.parametrize('values', [
+    ['0xAB', '0xcd'],        # 大小写混用
+    ['0x10', '0X20'],        # 前缀不一致
+    ['01', '2'],             # 前导零无法还原
+])
+def test_ambiguous_text_stays_text(values):
+    df = TypeInferencer().apply(pd.DataFrame({'value': values}))
+    assert get_display_formats(df) == {}
+    assert df['value'].tolist() == values
+
+
+def test_later_chunk_with_other_text_drops_format():
+    inferencer = TypeInferencer()
+    first = inferencer.apply(pd.DataFrame({'Offset': ['0x10', '0x20'], 'Name': ['a', 'b']}))
+    second = inferencer.apply(pd.DataFrame({'Offset': ['0x30', 'n/a'], 'Name': ['c', 'd']}))
+    assert kinds(first) == {'Offset': 'hex'}
+    assert get_display_formats(second) == {}
+    assert second['Offset'].tolist() == ['0x30', 'n/a']
+
+
+def test_parse_and_demote():
+    df = TypeInferencer().apply(read(CSV_TEXT))
+    fmt = get_display_formats(df)['Offset(V)']
+    assert fmt.parse('0xfa8000e3c060') == df['Offset(V)'][0]
+    demote_column(df, df.columns.get_loc('Offset(V)'))
+    assert 'Offset(V)' not in get_display_formats(df)
+    assert df['Offset(V)'].tolist() == read(CSV_TEXT)['Offset(V)'].tolist()
@@ -1,12 +1,27 @@
 from PySide6.QtWidgets import QFileDialog, QMessageBox
 from PySide6.QtCore import Qt
+from lovelyform.models.type_inference import to_display_frame
+from lovelyform.models.compression import COMPRESSION_EXTENSIONS, compression_for_path
+
+# 打开文件时可以直接选择压缩的CSV文件和JSON文件
+OPEN_FILE_FILTER = ("数据文件 (*.csv *.json *.jsonl *.ndjson *.gz *.bz2 *.xz *.zip);;"
+                    "CSV文件 (*.csv *.csv.gz *.csv.bz2 *.csv.xz *.zip);;"
+                    "JSON文件 (*.json *.jsonl *.ndjson *.json.gz *.jsonl.gz);;所有文件 (*)")
+# 保存格式 (过滤器, 扩展名)
+SAVE_FILE_FILTERS = [
+    ("CSV文件 (*.csv)", ".csv"),
+    ("gzip 压缩 (*.csv.gz)", ".csv.gz"),
+    ("bzip2 压缩 (*.csv.bz2)", ".csv.bz2"),
+    ("xz 压缩 (*.csv.xz)", ".csv.xz"),
+    ("zip 压缩 (*.zip)", ".zip"),
+]
 
 class FileOperationsMixin:
     def load_csv_file(self, file_path=None):
         """加载CSV文件"""
         if not file_path:
             file_path, _ = QFileDialog.getOpenFileName(
-                self, "选择CSV文件", "", "CSV files (*.csv)"
+                self, "选择CSV文件", "", OPEN_FILE_FILTER
             )
             if not file_path:
                 return
@@ -37,20 +52,44 @@ class FileOperationsMixin:
         self.update_table()
         self.update_page_jump_range()
 
+    def show_load_summary(self, file_path):
+        """在状态栏显示加载结果和类型优化节省的内存"""
+        message = f"已加载文件: {file_path}"
+        report = self.data_manager.get_memory_report()
+        saved = sum(report.values())
+        if saved > 0:
+            details = ", ".join(f"{col} {size / 1024 / 1024:.1f}MB"
+                                for col, size in sorted(report.items(), key=lambda x: -x[1])[:5])
+            message += f"（类型优化节省 {saved / 1024 / 1024:.1f}MB: {details}）"
+        self.status_bar.showMessage(message)
+
     def save_csv(self):
         """保存CSV文件"""
-        if not hasattr(self, 'data_manager') or self.data_manager.df.empty:
+        if not hasattr(self, 'data_manager') or self.data_manager.get_total_rows() == 0:
             QMessageBox.warning(self, "警告", "没有数据可以保存")
             return
             
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "保存CSV文件", "", "CSV files (*.csv)"
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "保存CSV文件", "", ";;".join(f for f, _ in SAVE_FILE_FILTERS)
         )
         
         if file_path:
+            # 没有输入扩展名时按所选格式补全
+            if not file_path.lower().endswith(('.csv',) + tuple(ext for ext, _ in COMPRESSION_EXTENSIONS)):
+                file_path += dict(SAVE_FILE_FILTERS).get(selected_filter, ".csv")
             try:
-                self.data_manager.df.to_csv(file_path, index=False, encoding='utf-8-sig')
+                # 按当前排序顺序保存，按扩展名压缩（.gz/.bz2/.xz/.zip）
+                to_display_frame(self.data_manager.get_sorted_data()).to_csv(
+                    file_path, index=False, encoding='utf-8-sig', compression=compression_for_path(file_path))
                 self.status_bar.showMessage(f"文件已保存到: {file_path}")
             except Exception as e:
                 QMessageBox.critical(self, "保存错误", f"保存文件时发生错误: {str(e)}")
                 self.status_bar.showMessage("保存失败")
+
+    def clear_file_cache(self):
+        """清除当前文件的列式缓存"""
+        if not self.current_file:
+            QMessageBox.warning(self, "警告", "没有打开的文件")
+            return
+        removed = self.data_manager.invalidate_cache(self.current_file)
+        self.status_bar.showMessage(f"已清除 {removed} 个缓存文件", 3000)
@@ -7,7 +7,7 @@ from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QHeaderView, QAbstractItemView, QMessageBox, QMenu, QFileDialog, QToolBar,
                              QCheckBox, QInputDialog, QDialog, QGroupBox, QFrame,
                              QProgressBar, QSplitter, QApplication)
-from PySide6.QtCore import Qt, QSortFilterProxyModel
+from PySide6.QtCore import Qt, QSortFilterProxyModel, QTimer
 from PySide6.QtGui import QAction, QIcon, QGuiApplication
 
 import os
@@ -26,7 +26,7 @@ from lovelyform.plugins.command_executor import CommandConfigDialog
 # 导入拆分出的模块
 from lovelyform.views.ui_components import UIComponentMixin
 from lovelyform.views.table_operations import TableOperationsMixin
-from lovelyform.views.file_operations import FileOperationsMixin
+from lovelyform.views.file_operations import FileOperationsMixin, OPEN_FILE_FILTER
 from lovelyform.views.search_filter import SearchFilterMixin
 from lovelyform.views.theme_manager import ThemeManagerMixin
 from lovelyform.views.pagination import PaginationMixin
@@ -71,6 +71,28 @@ class CSVViewer(QMainWindow, UIComponentMixin, TableOperationsMixin,
         self._init_ui()  # 只调用本类的_init_ui方法
         self.update_all_styles()
 
+        # 数据变化时刷新表格；加载过程中新增的行合并后再更新分页控件
+        self._append_timer = QTimer(self)
+        self._append_timer.setSingleShot(True)
+        self._append_timer.setInterval(200)
+        self._append_timer.timeout.connect(self.flush_appended_rows)
+        # 翻页后在空闲时预渲染相邻的页
+        self._prefetch_queue = []
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(0)
+        self._prefetch_timer.timeout.connect(self.prefetch_pages)
+        self.data_manager.data_changed.connect(self.update_table)
+        self.data_manager.sort_changed.connect(self.on_data_sorted)
+        self.data_manager.rows_appended.connect(self.on_rows_appended)
+        self.data_manager.empty_columns_ready.connect(self.on_empty_columns_ready)
+        self.data_manager.profile_ready.connect(self.on_profile_ready)
+        self.data_manager.filter_finished.connect(self.on_filter_finished)
+        self.data_manager.search_results.connect(self.on_search_results)
+        self.data_manager.search_progress.connect(self.progress_bar.setValue)
+        self.data_manager.search_finished.connect(self.on_search_finished)
+        self.data_manager.load_finished.connect(lambda: self.show_load_summary(self.data_manager.file_path))
+
     def _init_ui(self):
         """初始化UI"""
         # 创建主布局
@@ -127,6 +149,13 @@ class CSVViewer(QMainWindow, UIComponentMixin, TableOperationsMixin,
         save_btn.clicked.connect(self.save_csv)
         toolbar_layout.addWidget(save_btn)
         
+        # 清除当前文件的列式缓存
+        clear_cache_btn = QPushButton("清除缓存")
+        clear_cache_btn.setMinimumWidth(80)
+        clear_cache_btn.setToolTip("删除当前文件的解析缓存，下次打开时重新解析")
+        clear_cache_btn.clicked.connect(self.clear_file_cache)
+        toolbar_layout.addWidget(clear_cache_btn)
+        
         # 添加命令编辑按钮
         command_btn = QPushButton("命令编辑")
         command_btn.setMinimumWidth(80)
@@ -138,18 +167,35 @@ class CSVViewer(QMainWindow, UIComponentMixin, TableOperationsMixin,
         self.global_search_input = QLineEdit()
         self.global_search_input.setPlaceholderText("在整个表格中搜索内容...")
         self.global_search_input.setMinimumWidth(200)
+        self.global_search_input.returnPressed.connect(self.search_table)
+        self.global_search_input.textChanged.connect(self.on_global_search_text_changed)
         toolbar_layout.addWidget(self.global_search_input)
+        # 搜索进行中修改搜索内容时，停止输入后重新搜索
+        self.global_search_timer = QTimer(self)
+        self.global_search_timer.setSingleShot(True)
+        self.global_search_timer.setInterval(500)
+        self.global_search_timer.timeout.connect(self.search_table)
+        
+        self.global_regex_checkbox = QCheckBox("正则")
+        self.global_regex_checkbox.setToolTip("按正则表达式搜索（不区分大小写）")
+        toolbar_layout.addWidget(self.global_regex_checkbox)
         
-        search_btn = QPushButton("全局搜索")
-        search_btn.setMinimumWidth(60)
-        search_btn.clicked.connect(lambda: self.search_table())
-        toolbar_layout.addWidget(search_btn)
+        self.global_search_btn = QPushButton("全局搜索")
+        self.global_search_btn.setMinimumWidth(60)
+        self.global_search_btn.clicked.connect(self.on_global_search_clicked)
+        toolbar_layout.addWidget(self.global_search_btn)
         
         # 隐藏空白列复选框
         toolbar_layout.addSpacing(20)
         self.hide_empty_checkbox = QCheckBox("隐藏空白列")
         self.hide_empty_checkbox.stateChanged.connect(self.on_hide_empty_changed)
         toolbar_layout.addWidget(self.hide_empty_checkbox)
+
+        # 跟踪文件复选框：文件仍在写入时自动追加新行
+        self.follow_checkbox = QCheckBox("跟踪文件")
+        self.follow_checkbox.setToolTip("定时读取文件末尾新写入的行（不支持压缩文件和JSON文件）")
+        self.follow_checkbox.toggled.connect(self.on_follow_toggled)
+        toolbar_layout.addWidget(self.follow_checkbox)
         
         # 添加插件菜单按钮
         plugins_menu = QMenu(self)
@@ -182,9 +228,11 @@ class CSVViewer(QMainWindow, UIComponentMixin, TableOperationsMixin,
         content_layout.addWidget(self.table_container)
         
         # 搜索结果视图
-        self.search_result_view = SearchResultView(self)
+        self.search_result_view = SearchResultView(self.data_manager, self)
         self.search_result_view.setVisible(False)
         self.search_result_view.item_double_clicked.connect(self.on_search_result_double_clicked)
+        # 搜索结果的内容按需读取，数据变化后重新读取
+        self.data_manager.data_changed.connect(self.search_result_view.result_model.invalidate)
         content_layout.addWidget(self.search_result_view)
         
         # 分页控件
@@ -228,34 +276,6 @@ class CSVViewer(QMainWindow, UIComponentMixin, TableOperationsMixin,
         if hasattr(self, '_drag_pos'):
             del self._drag_pos
 
-    def prev_page(self):
-        if self.current_page > 0:
-            self.current_page -= 1
-            self.update_table()
-
-    def next_page(self):
-        page_size = self.page_size_spin.value() if hasattr(self, 'page_size_spin') else self.page_size
-        total_pages = (len(self.data_manager.df) - 1) // page_size + 1
-        if self.current_page < total_pages - 1:
-            self.current_page += 1
-            self.update_table()
-
-    def update_page_size(self):
-        """更新每页显示的行数"""
-        self.page_size = self.page_size_spin.value()
-        self.current_page = 0
-        self.update_table()
-
-    def update_page_label(self):
-        """更新页码显示标签"""
-        if not hasattr(self, 'page_label') or self.data_manager.df.empty:
-            return
-            
-        page_size = self.page_size_spin.value() if hasattr(self, 'page_size_spin') else self.page_size
-        total_pages = (len(self.data_manager.df) - 1) // page_size + 1
-        current_page = self.current_page + 1
-        self.page_label.setText(f"页码: {current_page}/{total_pages}")
-
     def update_title(self, filename=None):
         """更新窗口标题"""
         if filename:
@@ -266,29 +286,33 @@ class CSVViewer(QMainWindow, UIComponentMixin, TableOperationsMixin,
             self.title_label.setText("LovelyForm")
 
     def on_hide_empty_changed(self, state):
-        """空白列隐藏状态改变时的处理函数"""
-        self.update_table()
+        """空白列隐藏状态改变时的处理函数，空白列按整个数据集的统计结果直接显示或隐藏"""
+        if self.hide_empty_checkbox.isChecked():
+            self.hide_empty_columns()
+        else:
+            for col in range(self.data_model.columnCount()):
+                self.table_view.showColumn(col)
+
+    def on_follow_toggled(self, checked):
+        """开启或关闭跟踪模式"""
+        if not self.data_manager.set_follow(checked) and self.data_manager.file_path:
+            self.status_bar.showMessage("当前文件不支持跟踪模式", 3000)
 
     def on_search_result_double_clicked(self, row_num):
         """处理搜索结果双击事件"""
         # 确保搜索结果视图可见
         self.search_result_view.setVisible(True)
         
-        # 计算目标页码
-        page = row_num // self.page_size
-        
-        # 跳转到对应页
-        if page != self.current_page:
-            self.current_page = page
-            self.update_table()
-            
-        # 计算在当前页中的行号
-        row_in_page = row_num % self.page_size
-        
-        # 选中对应的行并滚动到可见区域
-        model_index = self.table_view.model().index(row_in_page, 0)
+        # 表格覆盖整个数据集，直接滚动到该行（页码随滚动更新）
+        view_row = self.data_manager.row_to_view(row_num)
+        if view_row < 0:
+            self.status_bar.showMessage("该行不在当前筛选结果中", 3000)
+            return
+        model_index = self.proxy_model.mapFromSource(self.data_model.index(view_row, 0))
+        if not model_index.isValid():
+            return
         self.table_view.scrollTo(model_index, QAbstractItemView.ScrollHint.PositionAtCenter)
-        self.table_view.selectRow(row_in_page)
+        self.table_view.selectRow(model_index.row())
         self.table_view.setFocus()
 
         
@@ -317,7 +341,7 @@ class CSVViewer(QMainWindow, UIComponentMixin, TableOperationsMixin,
             file_path: 可选，直接指定要加载的文件路径。如果不指定，则弹出文件选择对话框。
         """
         if not file_path:
-            file_path, _ = QFileDialog.getOpenFileName(self, "打开CSV文件", "", "CSV文件 (*.csv)")
+            file_path, _ = QFileDialog.getOpenFileName(self, "打开CSV文件", "", OPEN_FILE_FILTER)
             
         if file_path:
             try:
@@ -329,12 +353,13 @@ class CSVViewer(QMainWindow, UIComponentMixin, TableOperationsMixin,
                 load_thread = self.data_manager.load_file(file_path)
                 load_thread.error.connect(lambda e: QMessageBox.critical(self, "错误", f"加载文件失败(文件可能为空))"))
                 load_thread.progress.connect(lambda p: self.status_bar.showMessage(f"正在加载文件: {p}%"))
-                load_thread.finished.connect(lambda: self.status_bar.showMessage(f"已加载文件: {file_path}"))
                 
                 self.current_file = file_path
+                self.current_page = 0
+                self._column_widths_adjusted = False  # 新文件按其内容重新调整列宽
                 
-                # 更新表格和搜索结果
-                self.data_manager.data_changed.connect(self.update_table)
+                # 表格随 data_changed 更新，这里只清空搜索结果（加载时已中止未完成的搜索）
+                self._end_search()
                 self.search_result_view.clear()
                 
             except Exception as e:
@@ -1,43 +1,146 @@
+import time
+from PySide6.QtWidgets import QAbstractItemView
+
+PREFETCH_BUDGET = 0.008  # 每次空闲时预渲染的最长时间（秒），不影响界面响应
+
 class PaginationMixin:
+    """分页控件只作为定位手段：表格始终显示整个数据集，翻页即滚动到该页的第一行"""
+
+    def _current_page_size(self):
+        return self.page_size_spin.value() if getattr(self, 'page_size_spin', None) else self.page_size
+
+    def _total_pages(self):
+        """总页数（筛选后按筛选结果分页）"""
+        return max(self.data_manager.get_view_row_count() - 1, 0) // self._current_page_size() + 1
+
     def prev_page(self):
         """前一页"""
         if self.current_page > 0:
             self.current_page -= 1
-            self.update_table()
+            self.scroll_to_page()
 
     def next_page(self):
         """后一页"""
-        page_size = self.page_size_spin.value() if hasattr(self, 'page_size_spin') else self.page_size
-        total_pages = (len(self.data_manager.df) - 1) // page_size + 1
-        if self.current_page < total_pages - 1:
+        if self.current_page < self._total_pages() - 1:
             self.current_page += 1
-            self.update_table()
+            self.scroll_to_page()
 
     def update_page_size(self):
         """更新每页显示的行数"""
         self.page_size = self.page_size_spin.value()
         self.current_page = 0
-        self.update_table()
+        self.scroll_to_page()
+
+    def scroll_to_page(self):
+        """把当前页的第一行滚动到表格顶部"""
+        model = self.table_view.model()
+        if model is not None and model.rowCount() > 0:
+            row = min(self.current_page * self._current_page_size(), model.rowCount() - 1)
+            self._scrolling_to_page = True
+            try:
+                self.table_view.scrollTo(model.index(row, 0), QAbstractItemView.PositionAtTop)
+            finally:
+                self._scrolling_to_page = False
+        self.update_page_controls()
+        self.schedule_prefetch()
+
+    def schedule_prefetch(self):
+        """在空闲时预先渲染前后两页顶部可见的行，翻页时直接使用显示缓存"""
+        model = getattr(self, 'data_model', None)
+        if model is None or model.rowCount() == 0:
+            return
+        page_size = self._current_page_size()
+        viewport = self.table_view.viewport()
+        visible_rows = viewport.height() // max(self.table_view.verticalHeader().defaultSectionSize(), 1) + 1
+        # 只预渲染当前可见的列
+        first_col = max(self.table_view.columnAt(0), 0)
+        last_col = self.table_view.columnAt(viewport.width() - 1)
+        if last_col < 0:
+            last_col = model.columnCount() - 1
+        cols = [col for col in range(first_col, last_col + 1) if not self.table_view.isColumnHidden(col)]
+        queue = []
+        for page in (self.current_page + 1, self.current_page - 1):
+            if 0 <= page < self._total_pages():
+                start = page * page_size
+                queue.extend(model.missing_blocks(start, start + min(visible_rows, page_size), cols))
+        self._prefetch_queue = queue
+        if queue:
+            self._prefetch_timer.start()
+
+    def prefetch_pages(self):
+        """渲染一部分待预渲染的块，剩余的在下一次空闲时继续"""
+        queue = getattr(self, '_prefetch_queue', [])
+        deadline = time.perf_counter() + PREFETCH_BUDGET
+        while queue and time.perf_counter() < deadline:
+            self.data_model.render_block(*queue.pop(0))
+        if queue:
+            self._prefetch_timer.start()
+
+    def on_table_scrolled(self, value):
+        """滚动表格时根据顶部可见行更新当前页码"""
+        if getattr(self, '_scrolling_to_page', False):
+            return
+        model = self.table_view.model()
+        if model is None or model.rowCount() == 0:
+            return
+        scroll_bar = self.table_view.verticalScrollBar()
+        if value >= scroll_bar.maximum():
+            # 已滚动到底部时最后一页可能无法滚动到顶部
+            row = model.rowCount() - 1
+        else:
+            row = max(self.table_view.rowAt(0), 0)
+        page = row // self._current_page_size()
+        if page != self.current_page:
+            self.current_page = page
+            self.update_page_controls()
+
+    def update_page_controls(self):
+        """更新页码标签、翻页按钮和跳转范围"""
+        self.update_page_label()
+        total_pages = self._total_pages()
+        if getattr(self, 'prev_btn', None):
+            self.prev_btn.setEnabled(self.current_page > 0)
+        if getattr(self, 'next_btn', None):
+            self.next_btn.setEnabled(self.current_page < total_pages - 1)
+        if getattr(self, 'page_jump_spin', None):
+            self.page_jump_spin.setMaximum(max(total_pages, 1))
 
     def update_page_label(self):
         """更新页码显示标签"""
-        if not hasattr(self, 'page_label') or self.data_manager.df.empty:
+        if not getattr(self, 'page_label', None) or self.data_manager.get_total_rows() == 0:
+            return
+        if self.data_manager.get_view_row_count() == 0:
+            self.page_label.setText("页码: 0/0")
             return
             
-        page_size = self.page_size_spin.value() if hasattr(self, 'page_size_spin') else self.page_size
-        total_pages = (len(self.data_manager.df) - 1) // page_size + 1
         current_page = self.current_page + 1
-        self.page_label.setText(f"页码: {current_page}/{total_pages}")
+        self.page_label.setText(f"页码: {current_page}/{self._total_pages()}")
+
+    def on_rows_appended(self, start, count):
+        """加载过程中有新行追加，合并多次通知后再刷新"""
+        pending = getattr(self, '_pending_append_start', None)
+        self._pending_append_start = start if pending is None else min(pending, start)
+        if not self._append_timer.isActive():
+            self._append_timer.start()
+
+    def flush_appended_rows(self):
+        """通知模型插入新行，已显示的行和滚动位置保持不变"""
+        start = getattr(self, '_pending_append_start', None)
+        self._pending_append_start = None
+        if start is None:
+            return
+        self.data_model.sync_rows()
+        if getattr(self, 'hide_empty_checkbox', None) and self.hide_empty_checkbox.isChecked():
+            self.hide_empty_columns()  # 新增的行可能使空白列不再空白
+        self.update_page_controls()
 
     def update_page_jump_range(self):
         """更新页码跳转范围"""
-        if self.data_manager.df.empty:
+        if self.data_manager.get_view_row_count() == 0:
             self.page_jump_spin.setRange(1, 1)
             return
             
-        page_size = self.page_size_spin.value()
-        total_pages = (len(self.data_manager.df) - 1) // page_size + 1
-        self.page_jump_spin.setRange(1, total_pages)
+        self.page_jump_spin.setRange(1, self._total_pages())
         self.page_jump_spin.setValue(self.current_page + 1)
 
     def jump_to_page(self):
@@ -45,4 +148,4 @@ class PaginationMixin:
         target_page = self.page_jump_spin.value() - 1
         if target_page != self.current_page:
             self.current_page = target_page
-            self.update_table()
+            self.scroll_to_page()
@@ -1,122 +1,67 @@
-from PySide6.QtWidgets import (QDialog, QVBoxLayout, QLineEdit, QDialogButtonBox,
-                             QMessageBox, QMenu, QApplication)
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QAction
+import re
+from PySide6.QtWidgets import QMessageBox
 
 class SearchFilterMixin:
     def search_table(self):
-        """搜索表格内容"""
-        if not hasattr(self, 'data_manager') or self.data_manager.df.empty:
+        """在后台搜索整个表格，结果分批显示；重新搜索会中止尚未完成的搜索"""
+        if not hasattr(self, 'data_manager') or self.data_manager.get_total_rows() == 0:
             return
             
         search_text = self.global_search_input.text().strip()
         if not search_text:
+            self.cancel_search()
             return
             
         try:
-            self.status_bar.showMessage("正在搜索...")
-            results = []
-            total_rows = len(self.data_manager.df)
-            
-            # 更新进度条
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setRange(0, total_rows)
-            self.progress_bar.setValue(0)
-            
-            for idx, row in enumerate(self.data_manager.df.itertuples()):
-                if idx % 100 == 0:
-                    self.progress_bar.setValue(idx)
-                    QApplication.processEvents()
-                
-                for col_idx, val in enumerate(row[1:]):
-                    if search_text.lower() in str(val).lower():
-                        col_name = self.data_manager.df.columns[col_idx]
-                        results.append((idx, col_name, val))
-            
-            self.progress_bar.setVisible(False)
-            
-            # 显示搜索结果
-            self.search_result_view.update_results(results)
-            self.status_bar.showMessage(f"搜索完成：找到 {len(results)} 个匹配项")
-            
+            self.data_manager.search(search_text, regex=self.global_regex_checkbox.isChecked())
+        except re.error as e:
+            QMessageBox.warning(self, "搜索错误", f"无效的正则表达式：{str(e)}")
+            return
         except Exception as e:
-            self.progress_bar.setVisible(False)
             QMessageBox.warning(self, "搜索错误", f"搜索时发生错误：{str(e)}")
             self.status_bar.showMessage("搜索出错")
-
-    def show_filter_dialog(self, column):
-        """显示筛选对话框"""
-        if not hasattr(self, 'data_manager') or self.data_manager.df.empty:
             return
             
-        column_name = self.data_manager.df.columns[column]
-        
-        dialog = QDialog(self)
-        dialog.setWindowTitle(f"列筛选 - {column_name}")
-        layout = QVBoxLayout()
-        
-        filter_input = QLineEdit()
-        filter_input.setPlaceholderText("输入筛选条件，只显示当前列中匹配的行...")
-        layout.addWidget(filter_input)
-        
-        button_box = QDialogButtonBox(
-            QDialogButtonBox.Ok | QDialogButtonBox.Cancel
-        )
-        button_box.accepted.connect(dialog.accept)
-        button_box.rejected.connect(dialog.reject)
-        layout.addWidget(button_box)
-        
-        dialog.setLayout(layout)
-        
-        if dialog.exec_() == QDialog.Accepted:
-            filter_text = filter_input.text().strip()
-            if filter_text:
-                self.apply_filter(column, filter_text)
+        self.status_bar.showMessage("正在搜索...")
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        self.global_search_btn.setText("停止搜索")
+        self.search_result_view.begin_results()
 
-    def apply_filter(self, column, filter_text):
-        """应用筛选条件"""
-        if not hasattr(self, 'data_manager') or self.data_manager.df.empty:
-            return
-            
-        column_name = self.data_manager.df.columns[column]
-        try:
-            mask = self.data_manager.df[column_name].astype(str).str.contains(filter_text, case=False, na=False)
-            self.proxy_model.setFilterKeyColumn(column)
-            self.proxy_model.setFilterRegExp(filter_text)
-            
-            matched_count = mask.sum()
-            self.status_bar.showMessage(f"筛选 {column_name}: 匹配 {matched_count} 行")
-            
-        except Exception as e:
-            QMessageBox.warning(self, "筛选错误", str(e))
+    def on_global_search_clicked(self):
+        """搜索按钮：搜索进行中时中止搜索"""
+        if self.data_manager.is_searching():
+            self.cancel_search()
+        else:
+            self.search_table()
 
-    def clear_filter(self, column):
-        """清除筛选条件"""
-        if hasattr(self, 'proxy_model'):
-            self.proxy_model.setFilterRegExp("")
-            self.status_bar.showMessage("已清除筛选", 3000)
+    def on_global_search_text_changed(self, text):
+        """搜索进行中修改了搜索内容时，中止过期的搜索，停止输入后用新内容重新搜索"""
+        if self.data_manager.is_searching() or self.global_search_timer.isActive():
+            self.data_manager.cancel_search()
+            self.global_search_timer.start()
 
-    def show_header_menu(self, pos):
-        """显示列头的上下文菜单"""
-        if not self.enable_filter_checkbox.isChecked():
-            return
-            
-        header = self.table_view.horizontalHeader()
-        column = header.logicalIndexAt(pos)
-        
-        if column < 0:
+    def cancel_search(self):
+        """中止全局搜索，保留已经找到的结果"""
+        if not self.data_manager.is_searching():
             return
-            
-        column_name = self.table_view.model().headerData(column, Qt.Horizontal, Qt.DisplayRole)
-        
-        menu = QMenu(self)
-        
-        filter_action = QAction("设置筛选条件", menu)
-        filter_action.triggered.connect(lambda: self.show_filter_dialog(column))
-        menu.addAction(filter_action)
-        
-        clear_action = QAction("清除筛选", menu)
-        clear_action.triggered.connect(lambda: self.clear_filter(column))
-        menu.addAction(clear_action)
-        
-        menu.exec_(header.mapToGlobal(pos))
+        self.data_manager.cancel_search()
+        self._end_search()
+        self.search_result_view.finish_results(self.search_result_view.result_model.hit_count)
+        self.status_bar.showMessage("搜索已中止", 3000)
+
+    def on_search_results(self, batch):
+        """追加一批搜索结果"""
+        self.search_result_view.append_results(batch)
+
+    def on_search_finished(self, found):
+        """全局搜索完成"""
+        self._end_search()
+        self.search_result_view.finish_results(found)
+        self.status_bar.showMessage(f"搜索完成：找到 {found} 个匹配项")
+
+    def _end_search(self):
+        self.progress_bar.setVisible(False)
+        self.global_search_btn.setText("全局搜索")
+        self.global_search_timer.stop()
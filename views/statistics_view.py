@@ -3,10 +3,14 @@ from PySide6.QtWidgets import (QWidget, QTableWidget, QTableWidgetItem, QHeaderV
 from PySide6.QtCore import Qt
 import pandas as pd
 
+APPROXIMATE_NOTE = "注：数据仍在加载或统计中，不重复值个数、高频值和分位数为估计值，完整统计完成后自动更新"
+EXACT_NOTE = "注：统计结果包含基本统计量和空值分析"
+
 class StatisticsView(QDialog):
-    def __init__(self, df: pd.DataFrame, parent=None):
+    def __init__(self, df: pd.DataFrame, parent=None, approximate=False):
         super().__init__(parent)
         self.df = df
+        self.approximate = approximate
         self._init_ui()
         
     def _init_ui(self):
@@ -17,27 +21,7 @@ class StatisticsView(QDialog):
         # 创建表格
         self.table = QTableWidget()
         self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        
-        # 设置数据
-        rows, cols = self.df.shape
-        self.table.setRowCount(rows)
-        self.table.setColumnCount(cols)
-        
-        # 设置表头
-        self.table.setHorizontalHeaderLabels(self.df.columns)
-        self.table.setVerticalHeaderLabels(self.df.index)
-        
-        # 填充数据
-        for i in range(rows):
-            for j in range(cols):
-                value = self.df.iloc[i, j]
-                if isinstance(value, float):
-                    # 格式化浮点数，保留4位小数
-                    item = QTableWidgetItem(f"{value:.4f}")
-                else:
-                    item = QTableWidgetItem(str(value))
-                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(i, j, item)
+        self._fill_table()
         
         # 设置表格样式
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
@@ -67,7 +51,8 @@ class StatisticsView(QDialog):
         """)
         
         # 添加说明标签
-        info_label = QLabel("注：统计结果包含基本统计量和空值分析")
+        info_label = QLabel(APPROXIMATE_NOTE if self.approximate else EXACT_NOTE)
+        self.info_label = info_label
         info_label.setStyleSheet("""
             QLabel {
                 color: #666;
@@ -87,3 +72,33 @@ class StatisticsView(QDialog):
                 background-color: #f5f5f5;
             }
         """)
+
+    def _fill_table(self):
+        # 设置数据
+        rows, cols = self.df.shape
+        self.table.setRowCount(rows)
+        self.table.setColumnCount(cols)
+        
+        # 设置表头
+        self.table.setHorizontalHeaderLabels(self.df.columns)
+        self.table.setVerticalHeaderLabels(self.df.index)
+
+        # 填充数据
+        for i in range(rows):
+            for j in range(cols):
+                value = self.df.iloc[i, j]
+                if isinstance(value, float):
+                    # 格式化浮点数，保留4位小数
+                    item = QTableWidgetItem(f"{value:.4f}")
+                else:
+                    item = QTableWidgetItem(str(value))
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(i, j, item)
+
+    def set_data(self, df: pd.DataFrame, approximate=False):
+        """用新的统计结果（如完整统计替换估计值）刷新表格"""
+        self.df = df
+        self.approximate = approximate
+        self.table.clear()
+        self._fill_table()
+        self.info_label.setText(APPROXIMATE_NOTE if approximate else EXACT_NOTE)
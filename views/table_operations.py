@@ -1,16 +1,56 @@
-from PySide6.QtWidgets import (QTableView, QHeaderView, QMessageBox, QMenu,
+from PySide6.QtWidgets import (QApplication, QTableView, QHeaderView, QMessageBox, QMenu,
                              QLineEdit, QVBoxLayout, QDialog, QPushButton, QHBoxLayout, QWidget, QLabel, QComboBox)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QAction
 from lovelyform.models.table_model import PandasModel
+from lovelyform.models.filter_engine import ContainsFilter, parse_filter
+from lovelyform.models.column_profiler import statistics_table
 from lovelyform.plugins import CellPlugin
 from lovelyform.views.statistics_view import StatisticsView
 from lovelyform.views.column_visibility_dialog import ColumnVisibilityDialog
 from lovelyform.models.item_delegate import TableItemDelegate
+from lovelyform.models.display_cache import render_column
+from lovelyform.models.type_inference import get_display_formats
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_object_dtype
 import ui.styles
 import os
 
+
+def _render_result(series, fmt):
+    """插件返回的列的显示文本，插件在原生类型列中写入的文本原样保留"""
+    if fmt is None or not is_object_dtype(series.dtype):
+        return render_column(series, fmt)
+    return np.array([v if isinstance(v, str) else fmt.render_value(v) for v in series.tolist()], dtype=object)
+
+
+def _changed_cells(before, after, columns):
+    """插件修改过的单元格 {列号: 行位置数组}
+
+    类型和显示格式都未变的列直接按值比较，其余列才比较显示文本。
+    """
+    before_formats = get_display_formats(before)
+    after_formats = get_display_formats(after)
+    changed = {}
+    for col in columns:
+        old = before.iloc[:, col].reset_index(drop=True)
+        new = after.iloc[:, col].reset_index(drop=True)
+        old_fmt = before_formats.get(old.name)
+        new_fmt = after_formats.get(new.name)
+        same_format = (old_fmt.to_dict() if old_fmt else None) == (new_fmt.to_dict() if new_fmt else None)
+        if old.dtype == new.dtype and same_format:
+            diff = ((old != new) & ~(old.isna() & new.isna())).fillna(True).to_numpy(dtype=bool)
+        else:
+            diff = render_column(old, old_fmt) != _render_result(new, new_fmt)
+        positions = np.flatnonzero(diff)
+        if len(positions):
+            changed[col] = positions
+    return changed
+
+
+SEARCH_DELAY = 250  # 实时搜索在停止输入多久后执行（毫秒）
+
 class TableOperationsMixin:
     def setup_table_view(self):
         """设置表格视图"""
@@ -32,6 +72,11 @@ class TableOperationsMixin:
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("输入搜索内容...")
         self.search_input.textChanged.connect(self.on_search_text_changed)
+        # 合并连续的按键，停止输入后才开始筛选
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY)
+        self.search_timer.timeout.connect(self.apply_search)
         
         # 创建列选择下拉框
         self.column_combo = QComboBox()
@@ -50,11 +95,12 @@ class TableOperationsMixin:
         self.table_view = QTableView()
         main_layout.addWidget(self.table_view)
         
-        # 创建并设置数据模型
-        self.data_model = PandasModel(pd.DataFrame())
+        # 创建并设置数据模型，模型覆盖整个数据集，分页只用于定位
+        self.data_model = PandasModel(self.data_manager)
         self.proxy_model.setSourceModel(self.data_model)
         
         self.table_view.setModel(self.proxy_model)
+        self.table_view.verticalScrollBar().valueChanged.connect(self.on_table_scrolled)
         self.table_view.setAlternatingRowColors(False)
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
@@ -105,41 +151,35 @@ class TableOperationsMixin:
         """)
 
     def update_table(self):
-        """更新表格显示"""
-        if self.data_manager is None or self.data_manager.df is None or self.data_manager.df.empty:
+        """更新表格显示
+
+        模型覆盖整个数据集，这里只通知模型重新读取数据，并把视图定位到当前页。
+        """
+        if self.data_manager is None:
             return
             
         # 清除当前选择状态
         self.table_view.clearSelection()
-            
-        # 计算当前页的数据范围
-        page_size = self.page_size_spin.value() if hasattr(self, 'page_size_spin') else self.page_size
-        start = self.current_page * page_size
-        end = min(start + page_size, len(self.data_manager.df))
         
-        # 更新模型，保持原始索引
-        current_df = self.data_manager.df.iloc[start:end].copy()
-        current_df.index = range(start, end)  # 设置连续的索引，这样会保持原始行号
-        model = PandasModel(current_df, page_offset=start)
-        
-        # 保持高亮文本
-        if hasattr(self, 'data_model') and hasattr(self.data_model, 'highlight_text'):
-            model.highlight_text = self.data_model.highlight_text
-        self.data_model = model
-        
-        self.proxy_model.setSourceModel(model)
+        model = self.data_model
+        model.refresh()
+        if self.data_manager.get_total_rows() == 0:
+            return
         
         # 确保proxy_model不会进行排序
         self.proxy_model.setDynamicSortFilter(False)
         self.proxy_model.sort(-1, Qt.AscendingOrder)  # 清除任何现有的排序
         
-        # 更新列选择下拉框
-        self.column_combo.blockSignals(True)
-        self.column_combo.clear()
-        self.column_combo.addItem("全部列")
-        for col in range(model.columnCount()):
-            self.column_combo.addItem(model.headerData(col, Qt.Horizontal))
-        self.column_combo.blockSignals(False)
+        # 列发生变化时才重建列选择下拉框
+        columns = [model.headerData(col, Qt.Horizontal) for col in range(model.columnCount())]
+        if columns != getattr(self, '_combo_columns', None):
+            self._combo_columns = columns
+            self.column_combo.blockSignals(True)
+            self.column_combo.clear()
+            self.column_combo.addItem("全部列")
+            for name in columns:
+                self.column_combo.addItem(name)
+            self.column_combo.blockSignals(False)
         
         # 确保所有列都是可见的
         for i in range(model.columnCount()):
@@ -153,31 +193,21 @@ class TableOperationsMixin:
         if not self._column_widths_adjusted:
             self.adjust_column_widths()
         
-        # 更新分页状态
-        total_pages = (len(self.data_manager.df) - 1) // page_size + 1
-        self.update_page_label()
-        
-        # 更新按钮状态
-        if hasattr(self, 'prev_btn'):
-            self.prev_btn.setEnabled(self.current_page > 0)
-        if hasattr(self, 'next_btn'):
-            self.next_btn.setEnabled(self.current_page < total_pages - 1)
+        # 定位到当前页并更新分页状态
+        self.scroll_to_page()
 
     def hide_empty_columns(self):
-        """隐藏空白列"""
+        """隐藏整个数据集中的空白列（所有页一致）"""
         source_model = self.proxy_model.sourceModel()
         last_visible_column = -1
+        empty_columns = self.data_manager.get_empty_columns()
+        if empty_columns is None:
+            return  # 统计完成后由 on_empty_columns_ready 再次调用
+        empty_columns = set(empty_columns)
         
         # 首先隐藏空白列并记录最后一个可见列
         for col in range(source_model.columnCount()):
-            is_empty = True
-            for row in range(source_model.rowCount()):
-                value = source_model.data(source_model.index(row, col), Qt.DisplayRole)
-                if value and str(value).strip():
-                    is_empty = False
-                    break
-            
-            if is_empty:
+            if col in empty_columns:
                 self.table_view.hideColumn(col)
             else:
                 self.table_view.showColumn(col)
@@ -186,67 +216,92 @@ class TableOperationsMixin:
         # 设置最后一个可见列为Stretch模式
         if last_visible_column >= 0:
             header = self.table_view.horizontalHeader()
-            # 先将所有列设置为Interactive模式
-            for col in range(source_model.columnCount()):
-                header.setSectionResizeMode(col, QHeaderView.Interactive)
-            # 将最后一个可见列设置为Stretch模式
-            header.setSectionResizeMode(last_visible_column, QHeaderView.Stretch)
+            self._fitting_columns = True
+            try:
+                # 先将所有列设置为Interactive模式
+                for col in range(source_model.columnCount()):
+                    header.setSectionResizeMode(col, QHeaderView.Interactive)
+                # 将最后一个可见列设置为Stretch模式
+                header.setSectionResizeMode(last_visible_column, QHeaderView.Stretch)
+            finally:
+                self._fitting_columns = False
+
+    def on_empty_columns_ready(self):
+        """空白列统计完成"""
+        if self.hide_empty_checkbox.isChecked():
+            self.hide_empty_columns()
 
     def adjust_column_widths(self):
-        """自适应列宽"""
+        """按各列抽样文本的长度分布自适应列宽，只测量每列少数几个候选文本"""
         header = self.table_view.horizontalHeader()
         font_metrics = self.table_view.fontMetrics()
+        samples = self.data_manager.get_width_samples()
         
-        for column in range(self.proxy_model.columnCount()):
-            header_text = self.proxy_model.headerData(column, Qt.Horizontal, Qt.DisplayRole)
-            max_width = font_metrics.horizontalAdvance(str(header_text)) + 20
-            
-            for row in range(self.proxy_model.rowCount()):
-                index = self.proxy_model.index(row, column)
-                content = str(self.proxy_model.data(index, Qt.DisplayRole))
-                content_width = font_metrics.horizontalAdvance(content) + 20
-                max_width = max(max_width, content_width)
-            
-            max_width = min(max(max_width, 50), 300)
-            self.table_view.setColumnWidth(column, max_width)
-            header.setSectionResizeMode(column, QHeaderView.Interactive)
+        self._fitting_columns = True
+        try:
+            for column in range(self.proxy_model.columnCount()):
+                header_text = str(self.proxy_model.headerData(column, Qt.Horizontal, Qt.DisplayRole))
+                max_width = max(font_metrics.horizontalAdvance(text) + 20
+                                for text in [header_text] + samples.get(header_text, []))
+                
+                max_width = min(max(max_width, 50), 300)
+                self.table_view.setColumnWidth(column, max_width)
+                header.setSectionResizeMode(column, QHeaderView.Interactive)
+        finally:
+            self._fitting_columns = False
+        # 加载完成后再按整个文件的抽样调整一次
+        if not self.data_manager.loading:
+            self._column_widths_adjusted = True
 
-    def on_sort_changed(self, logical_index, order):
-        """处理排序变化"""
-        if self.data_manager.df.empty:
+    def on_sort_changed(self, logical_index, order, append=False):
+        """处理排序变化
+
+        :param append: 是否作为次要排序键追加到当前排序键之后（已有该列时只改变升降序）
+        """
+        if self.data_manager.get_total_rows() == 0:
             return
             
-        column_name = self.data_manager.df.columns[logical_index]
+        column_name = self.data_manager.get_columns()[logical_index]
         if not column_name:
             return
             
         ascending = order == Qt.AscendingOrder
-        self.status_bar.showMessage(f"正在排序 {column_name} 列...")
-        
-        try:
-            # 对整个数据集进行排序
-            sorted_df = self.data_manager.df.sort_values(by=column_name, ascending=ascending)
-            # 重置索引，这样DataFrame的顺序将与显示顺序一致
-            self.data_manager.df = sorted_df.reset_index(drop=True)
-            
-            # 重置到第一页
-            self.current_page = 0
-            
-            # 更新显示
-            self.update_table()
-            
-            # 更新分页控件
-            self.update_page_label()
-            if hasattr(self, 'prev_btn'):
-                self.prev_btn.setEnabled(False)  # 回到第一页，禁用上一页按钮
-            if hasattr(self, 'next_btn'):
-                total_pages = (len(self.data_manager.df) - 1) // self.page_size + 1
-                self.next_btn.setEnabled(total_pages > 1)
-            
-            self.status_bar.showMessage(f"排序完成：{column_name} 列 {'升序' if ascending else '降序'}", 3000)
-            
-        except Exception as e:
-            self.status_bar.showMessage(f"排序失败：{str(e)}", 3000)
+        keys = [(column_name, ascending)]
+        if append:
+            keys = [key for key in self.data_manager.sort_keys if key[0] != column_name]
+            keys.insert(self._sort_key_position(column_name), (column_name, ascending))
+        
+        # 排序只改变显示顺序，排序完成后 on_data_sorted 更新显示
+        self.status_bar.showMessage(f"正在排序 {self._describe_sort(keys)}...")
+        self.data_manager.set_sort(keys)
+
+    def _sort_key_position(self, column_name):
+        """列在当前排序键中的位置，不在其中时为末尾"""
+        names = [name for name, _ in self.data_manager.sort_keys]
+        return names.index(column_name) if column_name in names else len(names)
+
+    @staticmethod
+    def _describe_sort(keys):
+        return "、".join(f"{name} 列{'升序' if ascending else '降序'}" for name, ascending in keys)
+
+    def on_data_sorted(self):
+        """排序结果生效后回到第一页并更新显示"""
+        self.current_page = 0
+        self.update_table()
+        keys = self.data_manager.sort_keys
+        if keys:
+            self.status_bar.showMessage(f"排序完成：{self._describe_sort(keys)}", 3000)
+        else:
+            self.status_bar.showMessage("已恢复原始顺序", 3000)
+
+    def clear_sort(self):
+        """恢复原始顺序"""
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.data_manager.set_sort([])
+
+    def toggle_natural_sort(self, checked):
+        """文本列按自然顺序排序（数字部分按数值比较）"""
+        self.data_manager.set_natural_sort(checked)
 
     def create_context_menu(self, pos):
         """创建右键菜单"""
@@ -371,7 +426,7 @@ class TableOperationsMixin:
         if not hasattr(self, 'data_manager') or not hasattr(self, 'table_view'):
             return
             
-        if self.data_manager is None or self.data_manager.df is None:
+        if self.data_manager is None or self.data_manager.get_total_rows() == 0:
             return
             
         indexes = self.table_view.selectedIndexes()
@@ -385,25 +440,27 @@ class TableOperationsMixin:
         if source_model is None:
             return
             
-        # 获取当前页的偏移量
-        page_size = self.page_size_spin.value() if hasattr(self, 'page_size_spin') else self.page_size
-        page_offset = self.current_page * page_size
-            
         for index in indexes:
             # 将代理模型的索引转换为源模型的索引
             source_index = proxy_model.mapToSource(index)
             col_index = source_index.column()
             col_name = source_model.headerData(col_index, Qt.Horizontal, Qt.DisplayRole)
             if plugin.match_column(col_name):
-                # 使用源模型的行索引加上页面偏移量
-                absolute_row = source_index.row() + page_offset
+                # 源模型的行即数据集中的行
+                absolute_row = source_model.get_absolute_row(source_index.row())
                 filtered_cells.append((absolute_row, col_index))
                 
         if filtered_cells:
             try:
-                result = plugin.process_cells(self.data_manager.df, filtered_cells)
+                # 只取出选中的单元格所在的行交给插件，不合并整个数据集
+                rows = np.unique([row for row, _ in filtered_cells])
+                frame = self.data_manager.get_rows(rows)
+                positions = {row: i for i, row in enumerate(rows.tolist())}
+                cells = [(positions[row], col) for row, col in filtered_cells]
+                before = frame.copy()
+                result = plugin.process_cells(frame, cells)
                 if result is not None:
-                    self.data_manager.df = result
+                    self._write_back_rows(rows, before, result, sorted({col for _, col in cells}))
                 self.update_table()
             except Exception as e:
                 from PySide6.QtWidgets import QMessageBox
@@ -416,21 +473,89 @@ class TableOperationsMixin:
 
     def handle_table_plugin(self, plugin):
         """处理表格插件"""
+        if getattr(plugin, 'uses_data_profile', False):
+            self.show_statistics()
+            return
         if hasattr(self, 'data_manager'):
-            result = plugin.process_table(self.data_manager.df)
-            # 直接更新原表格数据
+            if getattr(plugin, 'uses_view_rows', False):
+                # 插件声明只处理当前显示的行时不合并数据块，修改的单元格按列批量写回
+                frame = self.data_manager.get_view_data(0, self.data_manager.get_view_row_count())
+                before = frame.copy()
+                result = plugin.process_table(frame)
+                if isinstance(result, pd.DataFrame):
+                    self._write_back_rows(frame.index.to_numpy(), before, result, range(len(before.columns)))
+            else:
+                result = plugin.process_table(self.data_manager.df)
+                # 直接更新原表格数据
+                if isinstance(result, pd.DataFrame):
+                    self.data_manager.df = result
             if isinstance(result, pd.DataFrame):
-                self.data_manager.df = result
                 if hasattr(plugin, 'highlight_keywords') and plugin.highlight_keywords:
-                    # 设置高亮关键词和颜色
-                    self.data_model.highlight_keywords = plugin.highlight_keywords.copy()
-                    # 强制刷新显示
-                    self.proxy_model.layoutChanged.emit()
+                    # 设置高亮关键词和颜色，整个数据集的颜色索引一次算好
+                    self.data_manager.set_highlight_keywords(plugin.highlight_keywords.copy())
+                    self.update_table()
                 else:
                     self.update_table()  # 刷新表格显示
             else:
                 QMessageBox.information(self, "处理结果", str(result))
 
+    def _write_back_rows(self, rows, before, result, columns):
+        """把插件修改后的行写回数据集，每列中变化的单元格一次写入
+
+        :param rows: result 中各行在数据集中的行号
+        :param before: 交给插件前的数据副本
+        :param columns: 需要检查的列号
+        """
+        if len(result) != len(rows) or list(result.columns) != list(before.columns):
+            QMessageBox.warning(
+                self,
+                "插件执行结果",
+                f"插件返回的表格行数或列与原数据不一致（{len(result)} 行 × {len(result.columns)} 列，"
+                f"应为 {len(rows)} 行 × {len(before.columns)} 列），结果未写回",
+                QMessageBox.Ok
+            )
+            return
+        formats = get_display_formats(result)
+        for col, positions in _changed_cells(before, result, columns).items():
+            series = result.iloc[positions, col]
+            fmt = formats.get(series.name)
+            # 原生类型列按显示文本写入，其余列直接写入新值
+            values = _render_result(series, fmt) if fmt is not None else series.to_numpy(dtype=object)
+            self.data_manager.set_column_values(col, rows[positions], values)
+
+    def show_statistics(self):
+        """显示各列统计结果，数据未修改时直接使用上次的结果
+
+        完整统计尚未完成时先显示加载过程中累积的估计值，完成后自动替换。
+        """
+        profiles = self.data_manager.get_profile()
+        if profiles is not None:
+            self._statistics_pending = False
+            self._open_statistics_view(profiles)
+            return
+        self._statistics_pending = True
+        self.status_bar.showMessage("正在统计数据...")
+        sketches = self.data_manager.get_sketch_profiles()
+        if sketches:
+            self._open_statistics_view(sketches, approximate=True)
+
+    def on_profile_ready(self):
+        """后台统计完成，用完整统计替换估计值"""
+        if not getattr(self, '_statistics_pending', False):
+            return
+        self._statistics_pending = False
+        self.status_bar.showMessage("统计完成", 3000)
+        self._open_statistics_view(self.data_manager.profile[1])
+
+    def _open_statistics_view(self, profiles, approximate=False):
+        view = getattr(self, '_statistics_view', None)
+        if view is not None and view.isVisible():
+            view.set_data(statistics_table(profiles), approximate)
+        else:
+            self._statistics_view = StatisticsView(statistics_table(profiles), self, approximate)
+            self._statistics_view.show()
+        self._statistics_view.raise_()
+
     def show_header_menu(self, pos):
         """显示表头右键菜单"""
         header = self.table_view.horizontalHeader()
@@ -447,6 +572,27 @@ class TableOperationsMixin:
         clear_filter_action.triggered.connect(lambda: self.clear_filter(column))
         menu.addAction(clear_filter_action)
         
+        menu.addSeparator()
+        for text, order in (("升序排序", Qt.AscendingOrder), ("降序排序", Qt.DescendingOrder)):
+            action = QAction(text, menu)
+            action.triggered.connect(lambda checked=False, o=order: self.on_sort_changed(column, o))
+            menu.addAction(action)
+        if self.data_manager.sort_keys:
+            # 主排序键相同的行再按该列排序
+            for text, order in (("追加升序排序键", Qt.AscendingOrder), ("追加降序排序键", Qt.DescendingOrder)):
+                action = QAction(text, menu)
+                action.triggered.connect(lambda checked=False, o=order: self.on_sort_changed(column, o, append=True))
+                menu.addAction(action)
+            clear_sort_action = QAction("恢复原始顺序", menu)
+            clear_sort_action.triggered.connect(self.clear_sort)
+            menu.addAction(clear_sort_action)
+        natural_action = QAction("自然排序", menu)
+        natural_action.setCheckable(True)
+        natural_action.setChecked(self.data_manager.sorter.natural)
+        natural_action.setStatusTip("文本中的数字按数值比较，十六进制地址按地址值比较")
+        natural_action.toggled.connect(self.toggle_natural_sort)
+        menu.addAction(natural_action)
+        
         menu.exec_(header.viewport().mapToGlobal(pos))
 
     def show_filter_dialog(self, column):
@@ -460,7 +606,7 @@ class TableOperationsMixin:
         
         # 创建筛选输入框
         filter_input = QLineEdit()
-        filter_input.setPlaceholderText(f"输入要筛选的{column_name}值...")
+        filter_input.setPlaceholderText(f"输入要筛选的{column_name}值，或用 起始..结束 筛选范围...")
         layout.addWidget(filter_input)
         
         # 创建确定和取消按钮
@@ -487,14 +633,14 @@ class TableOperationsMixin:
             
         try:
             # 获取列名
-            column_name = self.proxy_model.headerData(column, Qt.Horizontal, Qt.DisplayRole)
-            
-            # 应用筛选
-            self.proxy_model.setFilterKeyColumn(column)
-            self.proxy_model.setFilterFixedString(filter_text)  # 使用setFilterFixedString替代setFilterRegExp
+            column_name = self.data_manager.get_columns()[column]
+            fmt = self.data_manager.get_display_formats().get(column_name)
             
-            # 更新状态栏
+            # 对整个数据集应用筛选，多个列的筛选条件同时生效
             self.status_bar.showMessage(f"筛选开始...")
+            matched_rows = self.data_manager.set_filter(column_name, parse_filter(filter_text, column_name, fmt))
+            self._show_filtered_rows()
+            self.status_bar.showMessage(f"筛选 {column_name}：显示 {matched_rows}/{self.data_manager.get_total_rows()} 行")
             dialog.accept()
             
         except Exception as e:
@@ -502,46 +648,52 @@ class TableOperationsMixin:
             
     def clear_filter(self, column):
         """清除筛选"""
-        self.proxy_model.setFilterKeyColumn(column)
-        self.proxy_model.setFilterFixedString("")  # 使用setFilterFixedString替代setFilterRegExp
+        column_name = self.data_manager.get_columns()[column]
+        self.data_manager.set_filter(column_name, None)
+        self._show_filtered_rows()
         self.status_bar.showMessage("筛选结束")
 
+    def _show_filtered_rows(self):
+        """筛选结果变化后从第一页开始显示"""
+        self.current_page = 0
+        self.update_table()
+
     def _on_column_resized(self, logical_index, old_size, new_size):
-        """处理列宽调整事件"""
-        self._column_widths_adjusted = True
+        """处理列宽调整事件，手动调整过列宽后不再自动调整"""
+        if not getattr(self, '_fitting_columns', False):
+            self._column_widths_adjusted = True
 
     def on_search_text_changed(self, text):
         """处理搜索文本变化"""
+        self.search_timer.start()
+
+    def apply_search(self):
+        """在后台对整个数据集应用实时搜索，"全部列"时任意一列包含即可"""
+        text = self.search_input.text()
         if not text:
-            self.proxy_model.setFilterFixedString("")
+            self.data_manager.set_filter('search', None)
+            self._show_filtered_rows()
             self.status_bar.showMessage("已清除筛选", 3000)  # 显示3秒后消失
             return
-            
+
         self.status_bar.showMessage("正在筛选...")
         selected_column = self.column_combo.currentText()
-        source_model = self.proxy_model.sourceModel()
-        
-        if selected_column == "全部列":
-            # 搜索所有列
-            self.proxy_model.setFilterKeyColumn(-1)
-        else:
-            # 获取列索引
-            for col in range(source_model.columnCount()):
-                if source_model.headerData(col, Qt.Horizontal) == selected_column:
-                    self.proxy_model.setFilterKeyColumn(col)
-                    break
-                    
-        self.proxy_model.setFilterFixedString(text)
-        
-        # 计算匹配的行数
-        matched_rows = self.proxy_model.rowCount()
-        total_rows = source_model.rowCount()
+        column = None if selected_column == "全部列" else selected_column
+        self.data_manager.set_filter_async('search', ContainsFilter(text, column))
+
+    def on_filter_finished(self, matched_rows):
+        """后台筛选完成"""
+        self._show_filtered_rows()
+
+        # 显示匹配的行数
+        total_rows = self.data_manager.get_total_rows()
         self.status_bar.showMessage(f"筛选完成：显示 {matched_rows}/{total_rows} 行")
-        
+
     def on_search_column_changed(self, index):
         """处理搜索列变化"""
         # 重新应用当前的搜索文本
-        self.on_search_text_changed(self.search_input.text())
+        self.search_timer.stop()
+        self.apply_search()
 
     def show_column_visibility_dialog(self):
         """显示列可见性设置对话框"""
@@ -575,11 +727,20 @@ class TableOperationsMixin:
                 self.table_view.setColumnHidden(i, column not in visible_columns)
 
     def on_header_clicked(self, logical_index):
-        """处理表头点击事件"""
+        """处理表头点击事件，按住 Shift 点击时作为次要排序键"""
         # 获取当前排序状态
         order = self.table_view.horizontalHeader().sortIndicatorOrder()
         # 获取当前排序列
         current_sort_column = self.table_view.horizontalHeader().sortIndicatorSection()
+        append = bool(QApplication.keyboardModifiers() & Qt.ShiftModifier) and bool(self.data_manager.sort_keys)
+        
+        if append:
+            # 已是排序键的列切换升降序，否则按升序追加
+            column_name = self.data_manager.get_columns()[logical_index]
+            current = dict(self.data_manager.sort_keys).get(column_name)
+            order = Qt.DescendingOrder if current else Qt.AscendingOrder
+            self.on_sort_changed(logical_index, order, append=True)
+            return
         
         # 如果点击的列是当前排序列，则切换排序顺序
         if logical_index == current_sort_column: